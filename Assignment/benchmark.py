@@ -0,0 +1,143 @@
+from common import CachedHasher, fnv1a_hash, hash_many, str_hash
+from dsa import HashTable, OpenHashTable
+from network import evolve_network, read_event_file, read_network_file
+from network_generator import random_network
+import simulation_mode
+
+import numpy
+import os
+import random
+import sys
+from tempfile import TemporaryDirectory
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+
+# Performance benchmarks for tuning the simulation's data structures.
+# Usage: python3 benchmark.py <benchmark> [person_count]
+# Benchmarks:
+#   hashtable - HashTable vs OpenHashTable on the network workload.
+#   memory - memory used by a loaded network, per person and per edge (follow or like).
+#   hashing - string hash functions' collision rates and throughput, on person_count names.
+
+
+def print_usage() -> None:
+    print("Usage:")
+    print("\t python3 benchmark.py <benchmark> [person_count]")
+    print("Benchmarks: hashtable, memory, hashing")
+
+
+# Writes a random network and event file to the given directory, returning their paths.
+def write_random_network(directory: str, person_count: int) -> Tuple[str, str]:
+    random.seed(0)
+    netfile, eventfile = random_network(person_count, 10, 3, 2, 1)
+    netfile_path = os.path.join(directory, "netfile.txt")
+    eventfile_path = os.path.join(directory, "eventfile.txt")
+    with open(netfile_path, "w") as file:
+        file.write(netfile)
+    with open(eventfile_path, "w") as file:
+        file.write(eventfile)
+    return netfile_path, eventfile_path
+
+
+# Times network loading, name lookups and (object backend) evolution for each hash table type,
+# and counts the hash tables' resizes and average probes per lookup.
+def hashtable_benchmark(person_count: int) -> None:
+    configurations = (
+        ("HashTable", HashTable, simulation_mode.HASHTABLE_ARGS),
+        ("OpenHashTable", OpenHashTable, simulation_mode.OPEN_HASHTABLE_ARGS)
+    )
+    with TemporaryDirectory() as directory:
+        netfile_path, eventfile_path = write_random_network(directory, person_count)
+        print(f"{'table':<15}{'load (s)':>12}{'lookups (s)':>14}{'evolve (s)':>13}{'resizes':>10}{'probes':>9}")
+        for name, hashtable_type, hashtable_args in configurations:
+            random.seed(1)
+            start_time = time.perf_counter()
+            network = read_network_file(netfile_path, hashtable_type=hashtable_type, collect_stats=True,
+                                        **hashtable_args)
+            read_event_file(eventfile_path, network)
+            load_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            for _ in range(10):
+                for i in range(1, person_count + 1):
+                    network.find_person(str(i))
+            lookup_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            for _ in range(3):
+                evolve_network(network, 0.2, 0.2)
+            evolve_time = time.perf_counter() - start_time
+
+            stats = network.hashtable_stats()
+            print(f"{name:<15}{load_time:>12.3f}{lookup_time:>14.3f}{evolve_time:>13.3f}{stats.resizes:>10}"
+                  f"{stats.mean_probe:>9.2f}")
+
+
+# Measures the memory allocated by loading a network and its events, for each hash table type.
+def memory_benchmark(person_count: int) -> None:
+    configurations = (
+        ("HashTable", HashTable, simulation_mode.HASHTABLE_ARGS),
+        ("OpenHashTable", OpenHashTable, simulation_mode.OPEN_HASHTABLE_ARGS)
+    )
+    with TemporaryDirectory() as directory:
+        netfile_path, eventfile_path = write_random_network(directory, person_count)
+        print(f"{'table':<15}{'total (MB)':>12}{'edges':>10}{'B/person':>11}{'B/edge':>9}")
+        for name, hashtable_type, hashtable_args in configurations:
+            random.seed(1)
+            tracemalloc.start()
+            network = read_network_file(netfile_path, hashtable_type=hashtable_type, **hashtable_args)
+            read_event_file(eventfile_path, network)
+            total = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            edge_count = network.follow_count + network.like_count
+            print(f"{name:<15}{total / 1e6:>12.2f}{edge_count:>10}{total / network.person_count:>11.0f}"
+                  f"{total / max(edge_count, 1):>9.0f}")
+            del network
+
+
+# Compares the string hash functions on short numeric names (like the generated networks') and longer
+# random names. The collision rate is the fraction of names that share a bucket with an earlier name
+# in a table with a bucket per name (about 37% for an ideal hash function).
+# Throughput is measured hashing every name 3 times, as repeated lookups would.
+def hashing_benchmark(name_count: int) -> None:
+    rng = random.Random(0)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    random_names = numpy.empty(name_count, dtype=object)
+    for i in range(name_count):
+        random_names[i] = "".join(rng.choice(letters) for _ in range(rng.randint(5, 30)))
+    name_sets = (
+        ("numeric", numpy.arange(1, name_count + 1).astype(str).astype(object)),
+        ("random", random_names)
+    )
+    # Hashes each name individually.
+    def hash_each(hasher: Callable[[str], int]) -> Callable[[numpy.ndarray], numpy.ndarray]:
+        return lambda names: numpy.fromiter(map(hasher, names), dtype=object, count=len(names))
+    hashers = (
+        ("str_hash", hash_each(str_hash)),
+        ("fnv1a_hash", hash_each(fnv1a_hash)),
+        ("cached fnv1a", hash_each(CachedHasher(fnv1a_hash, name_count))),
+        ("hash_many fnv1a", lambda names: hash_many(names, fnv1a_hash))
+    )
+    print(f"{'names':<10}{'hasher':<18}{'collisions':>12}{'Mhash/s':>10}")
+    for set_name, names in name_sets:
+        for hasher_name, hasher in hashers:
+            start_time = time.perf_counter()
+            for _ in range(3):
+                hashes = hasher(names)
+            elapsed = time.perf_counter() - start_time
+            buckets = numpy.fromiter((int(h) % name_count for h in hashes), dtype=numpy.int64, count=name_count)
+            collision_rate = 1 - numpy.unique(buckets).size / name_count
+            print(f"{set_name:<10}{hasher_name:<18}{collision_rate:>12.1%}{3 * name_count / elapsed / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) in (2, 3) and sys.argv[1] == "hashtable":
+        hashtable_benchmark(int(sys.argv[2]) if len(sys.argv) == 3 else 1000)
+    elif len(sys.argv) in (2, 3) and sys.argv[1] == "memory":
+        memory_benchmark(int(sys.argv[2]) if len(sys.argv) == 3 else 1000)
+    elif len(sys.argv) in (2, 3) and sys.argv[1] == "hashing":
+        hashing_benchmark(int(sys.argv[2]) if len(sys.argv) == 3 else 100000)
+    else:
+        print_usage()
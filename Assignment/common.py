@@ -1,8 +1,14 @@
-from typing import Iterable, Iterator, Sized, TypeVar
+from functools import lru_cache
+import numpy
+from typing import Callable, Iterable, Iterator, Sequence, Sized, TypeVar
 from uuid import uuid4
 
 
 __all__ = [
+    "CachedHasher",
+    "fnv1a_hash",
+    "fnv1a_hash_spans",
+    "hash_many",
     "SizedIterable",
     "str_hash",
     "unique_file"
@@ -24,22 +30,118 @@ class SizedIterable(Iterable[T], Sized):
         return iter(self._iterable)
 
 
+# String hash functions below can be given to hash tables as their str_hasher.
+
+
 def str_hash(s: str) -> int:
     # Very simple hash function for performance reasons.
+    # (Result grows without bound with the length of the string.)
     res = 0
     for c in s:
         res = 33 * res + ord(c)
     return res
 
 
+FNV_OFFSET_BASIS = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+_UINT64_MASK = (1 << 64) - 1
+
+
+# 64-bit FNV-1a hash of the string's UTF-8 encoding. Always fits in 64 bits, and mixes better than str_hash.
+def fnv1a_hash(s: str) -> int:
+    res = FNV_OFFSET_BASIS
+    for b in s.encode():
+        res = ((res ^ b) * FNV_PRIME) & _UINT64_MASK
+    return res
+
+
+# Wraps a string hash function with a cache of the most recently hashed strings, since the same names
+# are looked up over and over. (Python caches its own string hashes, but can't for custom hash functions.)
+# Can be given to hash tables as their str_hasher.
+class CachedHasher:
+    # hasher: string hash function to cache the results of.
+    # cache_size: maximum number of strings to remember.
+    def __init__(self, hasher: Callable[[str], int] = fnv1a_hash, cache_size: int = 1 << 16) -> None:
+        if cache_size < 1:
+            raise ValueError(f"cache_size must be >=1, got {cache_size}.")
+        self.hasher = hasher
+        self.cache_size = cache_size
+        self._cached = lru_cache(cache_size)(hasher)
+
+    def __call__(self, s: str) -> int:
+        return self._cached(s)
+
+    # The cache itself isn't serialised.
+    def __getstate__(self):
+        return self.hasher, self.cache_size
+
+    def __setstate__(self, state) -> None:
+        self.__init__(*state)
+
+
+# Hashes many strings at once with the given string hash function, returning a numpy array of the hashes.
+# 64-bit FNV-1a (optionally cached) is vectorised over all the strings, one byte position at a time,
+# giving a uint64 array. Other hash functions are just called for each string, giving an object array.
+def hash_many(strings: Sequence[str], hasher: Callable[[str], int] = fnv1a_hash) -> numpy.ndarray:
+    if isinstance(hasher, CachedHasher):
+        hasher = hasher.hasher
+    if hasher is fnv1a_hash:
+        res = _fnv1a_hash_many(strings)
+    else:
+        res = numpy.empty(len(strings), dtype=object)
+        for i, s in enumerate(strings):
+            res[i] = hasher(s)
+    return res
+
+
+def _fnv1a_hash_many(strings: Sequence[str]) -> numpy.ndarray:
+    encoded = numpy.empty(len(strings), dtype=object)
+    for i, s in enumerate(strings):
+        encoded[i] = s.encode()
+    lengths = numpy.fromiter(map(len, encoded), dtype=numpy.int64, count=len(encoded))
+    width = int(lengths.max()) if lengths.size else 0
+    # Matrix of each string's bytes, padded with zeros. (The "S" dtype is fixed width and zero padded.)
+    data = encoded.astype(f"S{max(width, 1)}").view(numpy.uint8).reshape(len(encoded), max(width, 1))
+    res = numpy.full(len(encoded), FNV_OFFSET_BASIS, dtype=numpy.uint64)
+    prime = numpy.uint64(FNV_PRIME)
+    with numpy.errstate(over="ignore"):
+        for j in range(width):
+            # Strings shorter than j + 1 bytes are finished.
+            active = lengths > j
+            res[active] = (res[active] ^ data[active, j]) * prime
+    return res
+
+
+# 64-bit FNV-1a hashes of many byte strings stored as spans [starts[i], ends[i]) of a uint8 array, vectorised
+# like hash_many(). The hash of a span of UTF-8 is the same as fnv1a_hash() of the string it encodes.
+def fnv1a_hash_spans(data: numpy.ndarray, starts: numpy.ndarray, ends: numpy.ndarray) -> numpy.ndarray:
+    lengths = ends - starts
+    # Sorted longest first, so the spans still being hashed at each byte position are a prefix.
+    order = numpy.argsort(-lengths, kind="stable")
+    sorted_starts = starts[order]
+    sorted_lengths = lengths[order]
+    width = int(sorted_lengths[0]) if lengths.size else 0
+    active_counts = numpy.searchsorted(-sorted_lengths, -numpy.arange(width), side="left")
+    hashes = numpy.full(lengths.size, FNV_OFFSET_BASIS, dtype=numpy.uint64)
+    prime = numpy.uint64(FNV_PRIME)
+    with numpy.errstate(over="ignore"):
+        for j in range(width):
+            count = active_counts[j]
+            hashes[:count] = (hashes[:count] ^ data[sorted_starts[:count] + j]) * prime
+    res = numpy.empty_like(hashes)
+    res[order] = hashes
+    return res
+
+
 # Returns a new file with a unique filename with the given prefix and extension.
 # The file is guaranteed to not already exist.
-def unique_file(prefix: str, extension: str):
+# binary: if true, the file is opened in binary mode, otherwise text mode.
+def unique_file(prefix: str, extension: str, binary: bool = False):
     done = False
     while not done:
         file_path = f"{prefix}-{uuid4()}{extension}"
         try:
-            file = open(file_path, "x")
+            file = open(file_path, "xb" if binary else "x")
         except FileExistsError:
             pass
         else:
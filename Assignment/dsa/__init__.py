@@ -1,5 +1,8 @@
 from .array import *
 from .hash_table import *
+from .open_hash_table import *
+from .ordered_set import *
+from .resize_policy import *
 from .set import *
 from .singly_linked_list import *
 from .sorting import *
@@ -1,4 +1,4 @@
-from typing import Iterator, Sequence, TypeVar
+from typing import Iterator, Optional, Sequence, TypeVar
 
 import numpy
 
@@ -15,9 +15,15 @@ T = TypeVar("T")
 class Array(Sequence[T]):
     # size_or_data: either an int specifying the size of the array, or a type that supports
     # __iter__ and __len__.
-    def __init__(self, size_or_data) -> None:
+    # dtype: NumPy dtype of the elements. Numeric dtypes (e.g. numpy.int64 for counts and ids) store
+    # the elements natively, rather than as Python objects.
+    def __init__(self, size_or_data, dtype=object) -> None:
         if isinstance(size_or_data, int):
-            self._array = numpy.empty(size_or_data, dtype=numpy.object)
+            self._array = numpy.empty(size_or_data, dtype=dtype)
+        elif isinstance(size_or_data, Array) or (isinstance(size_or_data, numpy.ndarray)
+                                                 and size_or_data.ndim == 1):
+            # Copied in bulk.
+            self._array = numpy.array(size_or_data, dtype=dtype)
         else:
             try:
                 size = len(size_or_data)
@@ -25,20 +31,41 @@ class Array(Sequence[T]):
             except TypeError:
                 raise TypeError("size_or_data must be int or Sized and Iterable.")
             else:
-                self._array = numpy.empty(size, dtype=numpy.object)
-                for i, item in enumerate(iterator):
-                    self._array[i] = item
+                if numpy.dtype(dtype).hasobject:
+                    # Filled one by one, so items which are sequences themselves (e.g. tuples) are kept whole.
+                    self._array = numpy.empty(size, dtype=dtype)
+                    for i, item in enumerate(iterator):
+                        self._array[i] = item
+                else:
+                    self._array = numpy.fromiter(iterator, dtype=dtype, count=size)
+
+    # NumPy dtype of the elements.
+    @property
+    def dtype(self) -> numpy.dtype:
+        return self._array.dtype
 
     def copy(self) -> "Array[T]":
-        return Array(self)
+        return Array._view(self._array.copy())
 
     def __len__(self) -> int:
         return self._array.size
 
-    def __getitem__(self, idx: int) -> T:
-        return self._array[idx]
+    # Slicing returns an Array viewing the same elements, rather than a copy. Indexing with an array of indices
+    # or bools also returns an Array, of copies of the selected elements (as NumPy does).
+    def __getitem__(self, idx):
+        # Integer indices are by far the most common, so are checked first. (Types are compared directly, as
+        # isinstance() checks against Array are slow, it being a Sequence.)
+        if type(idx) is int:
+            res = self._array[idx]
+        elif isinstance(idx, (slice, numpy.ndarray, list)):
+            res = Array._view(self._array[idx])
+        elif type(idx) is Array:
+            res = Array._view(self._array[idx._array])
+        else:
+            res = self._array[idx]
+        return res
 
-    def __setitem__(self, idx: int, value: T) -> None:
+    def __setitem__(self, idx, value) -> None:
         self._array[idx] = value
 
     def __iter__(self) -> Iterator[T]:
@@ -49,3 +76,14 @@ class Array(Sequence[T]):
 
     def __repr__(self) -> str:
         return "[" + ", ".join(map(repr, self)) + "]"
+
+    # Allows numpy.asarray() and other NumPy functions to use the elements without copying them.
+    def __array__(self, dtype: Optional[numpy.dtype] = None) -> numpy.ndarray:
+        return self._array if dtype is None else self._array.astype(dtype, copy=False)
+
+    # Returns an Array which uses (rather than copies) a 1D ndarray.
+    @classmethod
+    def _view(cls, array: numpy.ndarray) -> "Array":
+        res = cls.__new__(cls)
+        res._array = array
+        return res
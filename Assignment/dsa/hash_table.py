@@ -1,14 +1,16 @@
 from .array import Array
+from .resize_policy import HysteresisPolicy
 from .singly_linked_list import SinglyLinkedList
 from common import str_hash
 
 from itertools import chain, takewhile
-from math import ceil, floor
-from typing import Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+from math import floor
+from typing import Callable, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
 
 
 __all__ = [
-    "HashTable"
+    "HashTable",
+    "HashTableStats"
 ]
 
 
@@ -16,11 +18,50 @@ K = TypeVar("K", bound=Hashable)
 V = TypeVar("V")
 
 
+# Counts of the work done by a hash table (or several, when added together), for tuning its parameters.
+class HashTableStats:
+    __slots__ = ("resizes", "rehashed", "lookups", "probes", "longest_probe")
+
+    # resizes: number of capacity changes.
+    # rehashed: total number of entries moved by capacity changes.
+    # lookups: number of key searches (including for insertions).
+    # probes: total number of entries (chaining) or slots (open addressing) examined by key searches.
+    # longest_probe: most entries or slots a single key search could have had to examine: the longest
+    #                chain (chaining) or probe sequence (open addressing) there has been.
+    def __init__(self, resizes: int = 0, rehashed: int = 0, lookups: int = 0, probes: int = 0,
+                 longest_probe: int = 0) -> None:
+        self.resizes = resizes
+        self.rehashed = rehashed
+        self.lookups = lookups
+        self.probes = probes
+        self.longest_probe = longest_probe
+
+    # Average number of entries or slots examined per key search.
+    @property
+    def mean_probe(self) -> float:
+        return self.probes / self.lookups if self.lookups else 0.0
+
+    # Combines the stats of two hash tables.
+    def __add__(self, other: "HashTableStats") -> "HashTableStats":
+        return HashTableStats(self.resizes + other.resizes, self.rehashed + other.rehashed,
+                              self.lookups + other.lookups, self.probes + other.probes,
+                              max(self.longest_probe, other.longest_probe))
+
+    def __repr__(self) -> str:
+        return (f"HashTableStats(resizes={self.resizes}, rehashed={self.rehashed}, lookups={self.lookups}, "
+                f"probes={self.probes}, longest_probe={self.longest_probe})")
+
+
 class HashTable(Generic[K, V]):
     class _Entry(Generic[K, V]):
-        def __init__(self, key: K, value: V) -> None:
+        # There is an entry per item in every set in the network, so keep them small.
+        __slots__ = ("key", "value", "hash")
+
+        def __init__(self, key: K, value: V, hash: int) -> None:
             self.key = key
             self.value = value
+            # Full hash code of the key (before reduction to an array index), so it never has to be recomputed.
+            self.hash = hash
 
         def __eq__(self, key: K) -> bool:
             return key == self.key
@@ -29,6 +70,8 @@ class HashTable(Generic[K, V]):
         def __repr__(self) -> str:
             return f"{self.key}: {self.value}"
 
+    __slots__ = ("_max_load_factor", "_policy", "_str_hasher", "_array", "_size", "_stats")
+
     # Initialises the hashtable with the given starting capacity and load factor.
     # capacity defaults to 100 and must be >= 1 if provided.
     # load_factor defaults to max_load_factor and must be >0 if provided.
@@ -37,9 +80,16 @@ class HashTable(Generic[K, V]):
     # shrink_factor: fraction decrease in capacity when a capacity reduction is triggered.
     #                (Unless the resulting capacity would be too small to fit all items.)
     # growth_factor: fraction increase in capacity when a capacity increase is triggered.
+    # resize_policy: ResizePolicy subclass deciding exactly when and how the capacity changes, constructed
+    #                with the load factor arguments.
+    # str_hasher: hash function for string keys (see common.py). Other keys use the built-in hash().
+    # collect_stats: if true, the work done is counted for stats (otherwise stats are all 0). Off by default, as
+    #                counting slows down every operation.
     def __init__(self, capacity: Optional[int] = None, load_factor: Optional[float] = None,
                  min_load_factor: Optional[float] = None, max_load_factor: Optional[float] = None,
-                 shrink_factor: Optional[float] = None, growth_factor: Optional[float] = None) -> None:
+                 shrink_factor: Optional[float] = None, growth_factor: Optional[float] = None,
+                 resize_policy: type = HysteresisPolicy, str_hasher: Callable[[str], int] = str_hash,
+                 collect_stats: bool = False) -> None:
         if capacity is None:
             capacity = 100
         if capacity < 1:
@@ -64,36 +114,52 @@ class HashTable(Generic[K, V]):
             load_factor = max_load_factor
         if load_factor <= 0:
             raise ValueError(f"load_factor must be >0, got {load_factor}.")
-        self._min_load_factor = min_load_factor
         self._max_load_factor = max_load_factor
-        self._shrink_factor = shrink_factor
-        self._growth_factor = growth_factor
+        self._policy = resize_policy(min_load_factor, max_load_factor, shrink_factor, growth_factor)
+        self._str_hasher = str_hasher
         capacity = max(1, round(capacity / load_factor))
-        self._array: Array[SinglyLinkedList["HashTable._Entry[K, V]"]] = Array(capacity)
-        for i in range(capacity):
-            self._array[i] = SinglyLinkedList()
+        # Chains are only created when something is inserted into them, so empty buckets are None.
+        # (Most sets in a network are small, so this saves a lot of memory compared to a list per bucket.)
+        self._array: Array[Optional[SinglyLinkedList["HashTable._Entry[K, V]"]]] = Array(capacity)
         self._size = 0
+        # None if stats aren't collected.
+        self._stats: Optional[HashTableStats] = HashTableStats() if collect_stats else None
 
     @property
     def load_factor(self) -> float:
         return len(self) / self._capacity
 
+    # Counts of the work done by the hash table since it was created (all 0 unless created with collect_stats).
+    @property
+    def stats(self) -> HashTableStats:
+        # (Adding to empty stats copies them, so the table's own counts can't be changed.)
+        return HashTableStats() if self._stats is None else HashTableStats() + self._stats
+
     # Returns an iterator of all key, value pairs.
     def items(self) -> Iterator[Tuple[K, V]]:
-        return map(lambda entry: (entry.key, entry.value), chain.from_iterable(self._array))
+        return map(lambda entry: (entry.key, entry.value), self._entries())
 
     # Iterates over all values.
     def values(self) -> Iterator[V]:
-        return map(lambda entry: entry.value, chain.from_iterable(self._array))
+        return map(lambda entry: entry.value, self._entries())
 
     # Adds the key, value pair to the hashtable, or if the key already exists, updates the value.
     # Returns a bool indicating if the key was new.
-    def set(self, key: K, value: V) -> bool:
-        res = self._put(key, value)
-        if self.load_factor >= self._max_load_factor:
-            self._increase_capacity()
+    # key_hash: the key's hash, if already known (e.g. from common.hash_many() with the table's str_hasher).
+    def set(self, key: K, value: V, key_hash: Optional[int] = None) -> bool:
+        if key_hash is None:
+            key_hash = self._key_hash(key)
+        res = self._put(key, value, key_hash)
+        self._resize(self._policy.grown_capacity(len(self), self._capacity))
         return res
 
+    # Makes sure there is enough capacity for size items in total, so that adding items up to that
+    # total doesn't trigger any further capacity increases. Does at most 1 resize.
+    def reserve(self, size: int) -> None:
+        new_capacity = floor(size / self._max_load_factor) + 1
+        if new_capacity > self._capacity:
+            self._set_capacity(new_capacity)
+
     def __len__(self) -> int:
         return self._size
 
@@ -106,16 +172,32 @@ class HashTable(Generic[K, V]):
         self.set(key, value)
 
     # Deletes the key, value pair with the given key, or raises KeyError if there is no such key.
-    def __delitem__(self, key: K) -> None:
-        chain = self._array[self._hash(key, self._capacity)]
+    # shrink: if false, the capacity is never reduced, so that many removals can be made followed by
+    #         a single resize with shrink().
+    def remove(self, key: K, shrink: bool = True) -> None:
+        index = self._key_hash(key) % self._capacity
+        chain = self._array[index]
         try:
+            if chain is None:
+                raise ValueError
             chain.remove(key)
         except ValueError:
             raise KeyError(f"Key `{key}` not in hash table.")
         else:
+            if not chain:
+                self._array[index] = None
             self._size -= 1
-            if self.load_factor <= self._min_load_factor:
-                self._decrease_capacity()
+            if shrink:
+                self.shrink()
+
+    # Reduces the capacity as the resize policy would have done if removals made with shrink=False had been
+    # made with shrink=True. Does at most 1 resize.
+    def shrink(self) -> None:
+        self._resize(self._policy.shrunk_capacity(len(self), self._capacity))
+
+    # Deletes the key, value pair with the given key, or raises KeyError if there is no such key.
+    def __delitem__(self, key: K) -> None:
+        self.remove(key)
 
     def __contains__(self, key: K) -> bool:
         try:
@@ -128,7 +210,7 @@ class HashTable(Generic[K, V]):
 
     # Iterates the keys stored.
     def __iter__(self) -> Iterator[K]:
-        return map(lambda entry: entry.key, chain.from_iterable(self._array))
+        return map(lambda entry: entry.key, self._entries())
 
     def __repr__(self) -> str:
         return "{" + ", ".join(map(lambda p: f"{p[0]}: {p[1]}", self.items())) + "}"
@@ -137,62 +219,83 @@ class HashTable(Generic[K, V]):
     def _capacity(self) -> int:
         return len(self._array)
 
+    # Iterates all entries, skipping empty buckets.
+    def _entries(self) -> Iterator[_Entry[K, V]]:
+        return chain.from_iterable(filter(None, self._array))
+
     # Gets the entry object with the given key, or raises KeyError if there is no such key.
     def _get(self, key: K) -> _Entry[K, V]:
-        chain = self._array[self._hash(key, self._capacity)]
-        found = False
-        for entry in takewhile(lambda _: not found, chain):
-            if entry.key == key:
-                found = True
-        if not found:
+        key_hash = self._key_hash(key)
+        entry = self._find(self._array[key_hash % self._capacity], key, key_hash)
+        if entry is None:
             raise KeyError(f"Key `{key}` not in hash table.")
         return entry
 
     # Inserts a key, value pair into the array, or updates an existing key's value.
     # If the key is new, increments _size and returns True.
-    def _put(self, key: K, value: V) -> bool:
-        chain = self._array[self._hash(key, self._capacity)]
-        exists = False
-        for entry in chain:
-            if entry.key == key:
-                entry.value = value
-                exists = True
-        if not exists:
-            chain.insert_last(self._Entry(key, value))
+    def _put(self, key: K, value: V, key_hash: int) -> bool:
+        index = key_hash % self._capacity
+        chain = self._array[index]
+        entry = self._find(chain, key, key_hash)
+        if entry is None:
+            if chain is None:
+                chain = self._array[index] = SinglyLinkedList()
+            chain.insert_last(self._Entry(key, value, key_hash))
             self._size += 1
-        return not exists
-
-    # Increases the capacity by at least the amount specified by _growth_factor.
-    def _increase_capacity(self) -> None:
-        assert self._capacity > 0
-        assert self._growth_factor >= 0
-        new_capacity = ceil(self._capacity * (1.0 + self._growth_factor))
-        self._set_capacity(new_capacity)
-
-    # Decreases the capacity by the amount specified by _shrink_factor, if possible.
-    def _decrease_capacity(self) -> None:
-        assert 0 <= self._shrink_factor < 1
-        new_capacity = floor(self._capacity * (1.0 - self._shrink_factor))
-        new_capacity = max(new_capacity, 1)
-        self._set_capacity(new_capacity)
-
-    # Resizes the current array and rehashes all key, value pairs back into it.
-    def _set_capacity(self, new_capacity: int) -> None:
-        old_array = self._array
-        self._array = Array(new_capacity)
-        self._size = 0
-        for i in range(new_capacity):
-            self._array[i] = SinglyLinkedList()
-        for chain in old_array:
-            for entry in chain:
-                self._put(entry.key, entry.value)
+            if self._stats is not None:
+                self._stats.longest_probe = max(self._stats.longest_probe, len(chain))
+        else:
+            entry.value = value
+        return entry is None
+
+    # Returns the entry in the chain with the given key and key hash, or None if there is no such entry.
+    # chain may be None for an empty bucket.
+    def _find(self, chain: Optional[SinglyLinkedList[_Entry[K, V]]], key: K, key_hash: int) \
+            -> Optional[_Entry[K, V]]:
+        res = None
+        # Comparing cached hashes first avoids most (potentially expensive) key comparisons.
+        for entry in takewhile(lambda _: res is None, chain or ()):
+            if entry.hash == key_hash and entry.key == key:
+                res = entry
+        if self._stats is not None:
+            self._stats.lookups += 1
+            self._stats.probes += self._probe_count(chain, res)
+        return res
 
-    def _hash(self, key: Hashable, array_size: int) -> int:
+    # Returns the number of entries examined by a search of a chain which found the entry res (None if not found).
+    @staticmethod
+    def _probe_count(chain: Optional[SinglyLinkedList[_Entry[K, V]]], res: Optional[_Entry[K, V]]) -> int:
+        count = 0
+        found = False
+        for entry in takewhile(lambda _: not found, chain or ()):
+            count += 1
+            found = entry is res
+        return count
+
+    def _key_hash(self, key: K) -> int:
         # Use custom hash function for strings (to show that I can implement a hash function),
         # but otherwise use built-in hash so we don't unnecessarily restrict the hash table to only strings.
         # (Unrealistic to re-implement hash functions for every possible Python type.)
-        if isinstance(key, str):
-            hasher = str_hash
-        else:
-            hasher = hash
-        return hasher(key) % array_size
+        return self._str_hasher(key) if isinstance(key, str) else hash(key)
+
+    # Changes the capacity if it's different to the current capacity.
+    def _resize(self, new_capacity: int) -> None:
+        if new_capacity != self._capacity:
+            self._set_capacity(new_capacity)
+
+    # Resizes the current array and moves all entries back into it.
+    # Keys are already known to be unique and entries cache their hash, so this is just an index calculation per entry.
+    def _set_capacity(self, new_capacity: int) -> None:
+        if self._stats is not None:
+            self._stats.resizes += 1
+            self._stats.rehashed += len(self)
+        old_array = self._array
+        self._array = Array(new_capacity)
+        for entry in chain.from_iterable(filter(None, old_array)):
+            index = entry.hash % new_capacity
+            if self._array[index] is None:
+                self._array[index] = SinglyLinkedList()
+            self._array[index].insert_last(entry)
+            if self._stats is not None:
+                self._stats.longest_probe = max(self._stats.longest_probe, len(self._array[index]))
+
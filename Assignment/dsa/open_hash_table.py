@@ -0,0 +1,281 @@
+from .array import Array
+from .hash_table import HashTableStats
+from .resize_policy import HysteresisPolicy
+from common import str_hash
+
+from math import floor
+from typing import Callable, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+
+__all__ = [
+    "OpenHashTable"
+]
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# Hash table using open addressing with robin hood linear probing, as an alternative to HashTable.
+# Keys, values and full hash codes are stored in parallel arrays, so there are no per-entry objects
+# or chains to walk. Has the same interface and constructor arguments as HashTable, except that
+# load factors must be <1.
+class OpenHashTable(Generic[K, V]):
+    __slots__ = ("_max_load_factor", "_policy", "_str_hasher", "_hashes", "_keys", "_values", "_size", "_stats")
+
+    # Initialises the hashtable with the given starting capacity and load factor.
+    # capacity defaults to 100 and must be >= 1 if provided.
+    # load_factor defaults to max_load_factor and must be >0 and <1 if provided.
+    # min_load_factor: on item removal, load factors <= this amount trigger the capacity to be reduced.
+    # max_load_factor: on item insertion, load factors >= this amount trigger the capacity to be increased.
+    # shrink_factor: fraction decrease in capacity when a capacity reduction is triggered.
+    #                (Unless the resulting capacity would be too small to fit all items.)
+    # growth_factor: fraction increase in capacity when a capacity increase is triggered.
+    # resize_policy: ResizePolicy subclass deciding exactly when and how the capacity changes, constructed
+    #                with the load factor arguments.
+    # str_hasher: hash function for string keys (see common.py). Other keys use the built-in hash().
+    # collect_stats: if true, the work done is counted for stats (otherwise stats are all 0).
+    def __init__(self, capacity: Optional[int] = None, load_factor: Optional[float] = None,
+                 min_load_factor: Optional[float] = None, max_load_factor: Optional[float] = None,
+                 shrink_factor: Optional[float] = None, growth_factor: Optional[float] = None,
+                 resize_policy: type = HysteresisPolicy, str_hasher: Callable[[str], int] = str_hash,
+                 collect_stats: bool = False) -> None:
+        if capacity is None:
+            capacity = 100
+        if capacity < 1:
+            raise ValueError(f"capacity must be >=1, got {capacity}.")
+        if min_load_factor is None:
+            min_load_factor = 0.2
+        if min_load_factor < 0:
+            raise ValueError(f"min_load_factor must be >=0, got {min_load_factor}.")
+        if max_load_factor is None:
+            max_load_factor = 0.75
+        if not 0 < max_load_factor < 1:
+            raise ValueError(f"max_load_factor must be >0 and <1, got {max_load_factor}.")
+        if shrink_factor is None:
+            shrink_factor = 0.25
+        if not 0 <= shrink_factor < 1:
+            raise ValueError(f"shrink_factor must be >=0 and <1, got {shrink_factor}.")
+        if growth_factor is None:
+            growth_factor = 0.5
+        if growth_factor < 0:
+            raise ValueError(f"growth_factor must be >=0, got {growth_factor}.")
+        if load_factor is None:
+            load_factor = max_load_factor
+        if not 0 < load_factor < 1:
+            raise ValueError(f"load_factor must be >0 and <1, got {load_factor}.")
+        self._max_load_factor = max_load_factor
+        self._policy = resize_policy(min_load_factor, max_load_factor, shrink_factor, growth_factor)
+        self._str_hasher = str_hasher
+        # None if stats aren't collected.
+        self._stats: Optional[HashTableStats] = HashTableStats() if collect_stats else None
+        # Always keep at least 1 empty slot so probing terminates.
+        self._allocate(max(capacity + 1, round(capacity / load_factor)))
+
+    @property
+    def load_factor(self) -> float:
+        return len(self) / self._capacity
+
+    # Counts of the work done by the hash table since it was created (all 0 unless created with collect_stats).
+    @property
+    def stats(self) -> HashTableStats:
+        # (Adding to empty stats copies them, so the table's own counts can't be changed.)
+        return HashTableStats() if self._stats is None else HashTableStats() + self._stats
+
+    # Returns an iterator of all key, value pairs.
+    def items(self) -> Iterator[Tuple[K, V]]:
+        return ((key, value) for key_hash, key, value in zip(self._hashes, self._keys, self._values)
+                if key_hash is not None)
+
+    # Iterates over all values.
+    def values(self) -> Iterator[V]:
+        return (value for key_hash, value in zip(self._hashes, self._values) if key_hash is not None)
+
+    # Adds the key, value pair to the hashtable, or if the key already exists, updates the value.
+    # Returns a bool indicating if the key was new.
+    # key_hash: the key's hash, if already known (e.g. from common.hash_many() with the table's str_hasher).
+    def set(self, key: K, value: V, key_hash: Optional[int] = None) -> bool:
+        if key_hash is None:
+            key_hash = self._key_hash(key)
+        res = self._put(key_hash, key, value)
+        self._resize(self._policy.grown_capacity(len(self), self._capacity))
+        return res
+
+    # Makes sure there is enough capacity for size items in total, so that adding items up to that
+    # total doesn't trigger any further capacity increases. Does at most 1 resize.
+    def reserve(self, size: int) -> None:
+        new_capacity = floor(size / self._max_load_factor) + 1
+        if new_capacity > self._capacity:
+            self._set_capacity(new_capacity)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # Gets the value with the given key, or raises KeyError if there is no such key.
+    def __getitem__(self, key: K) -> V:
+        slot = self._find(key)
+        if slot is None:
+            raise KeyError(f"Key `{key}` not in hash table.")
+        return self._values[slot]
+
+    # Adds the key, value pair to the hashtable, or if the key already exists, updates the value.
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    # Deletes the key, value pair with the given key, or raises KeyError if there is no such key.
+    # shrink: if false, the capacity is never reduced, so that many removals can be made followed by
+    #         a single resize with shrink().
+    def remove(self, key: K, shrink: bool = True) -> None:
+        slot = self._find(key)
+        if slot is None:
+            raise KeyError(f"Key `{key}` not in hash table.")
+        self._remove_slot(slot)
+        if shrink:
+            self.shrink()
+
+    # Reduces the capacity as the resize policy would have done if removals made with shrink=False had been
+    # made with shrink=True. Does at most 1 resize.
+    def shrink(self) -> None:
+        self._resize(self._policy.shrunk_capacity(len(self), self._capacity))
+
+    # Deletes the key, value pair with the given key, or raises KeyError if there is no such key.
+    def __delitem__(self, key: K) -> None:
+        self.remove(key)
+
+    def __contains__(self, key: K) -> bool:
+        return self._find(key) is not None
+
+    # Iterates the keys stored.
+    def __iter__(self) -> Iterator[K]:
+        return (key for key_hash, key in zip(self._hashes, self._keys) if key_hash is not None)
+
+    def __repr__(self) -> str:
+        return "{" + ", ".join(map(lambda p: f"{p[0]}: {p[1]}", self.items())) + "}"
+
+    @property
+    def _capacity(self) -> int:
+        return len(self._hashes)
+
+    def _allocate(self, capacity: int) -> None:
+        # Empty slots have a hash of None.
+        self._hashes: Array[Optional[int]] = Array(capacity)
+        self._keys: Array[K] = Array(capacity)
+        self._values: Array[V] = Array(capacity)
+        self._size = 0
+
+    # Number of slots between the given slot and the home slot of a key with the given hash.
+    def _distance(self, slot: int, key_hash: int) -> int:
+        return (slot - key_hash) % self._capacity
+
+    # Returns the slot containing the given key, or None if there is no such key.
+    def _find(self, key: K) -> Optional[int]:
+        key_hash = self._key_hash(key)
+        capacity = self._capacity
+        slot = key_hash % capacity
+        distance = 0
+        res = None
+        searching = True
+        while searching:
+            slot_hash = self._hashes[slot]
+            # With robin hood probing, the key can't be past a slot closer to its home than the key would be.
+            if slot_hash is None or self._distance(slot, slot_hash) < distance:
+                searching = False
+            elif slot_hash == key_hash and self._keys[slot] == key:
+                res = slot
+                searching = False
+            else:
+                slot = (slot + 1) % capacity
+                distance += 1
+        if self._stats is not None:
+            self._stats.lookups += 1
+            self._stats.probes += distance + 1
+        return res
+
+    # Inserts a key, value pair into the arrays, or updates an existing key's value.
+    # If the key is new, increments _size and returns True.
+    def _put(self, key_hash: int, key: K, value: V) -> bool:
+        capacity = self._capacity
+        slot = key_hash % capacity
+        distance = 0
+        # Once an entry has been displaced, the key is known to be new and only a free slot is needed.
+        displacing = False
+        new = True
+        placing = True
+        probes = 0
+        while placing:
+            probes += 1
+            slot_hash = self._hashes[slot]
+            if slot_hash is None:
+                self._hashes[slot] = key_hash
+                self._keys[slot] = key
+                self._values[slot] = value
+                if self._stats is not None:
+                    self._stats.longest_probe = max(self._stats.longest_probe, distance + 1)
+                placing = False
+            elif not displacing and slot_hash == key_hash and self._keys[slot] == key:
+                self._values[slot] = value
+                new = False
+                placing = False
+            else:
+                slot_distance = self._distance(slot, slot_hash)
+                if slot_distance < distance:
+                    # Take from the rich (entries near their home slot) and give to the poor.
+                    self._hashes[slot], key_hash = key_hash, slot_hash
+                    self._keys[slot], key = key, self._keys[slot]
+                    self._values[slot], value = value, self._values[slot]
+                    distance = slot_distance
+                    displacing = True
+                slot = (slot + 1) % capacity
+                distance += 1
+        if new:
+            self._size += 1
+        if self._stats is not None:
+            self._stats.lookups += 1
+            self._stats.probes += probes
+        return new
+
+    # Empties the given slot, shifting back any following entries that aren't in their home slot.
+    def _remove_slot(self, slot: int) -> None:
+        capacity = self._capacity
+        next_slot = (slot + 1) % capacity
+        next_hash = self._hashes[next_slot]
+        while next_hash is not None and self._distance(next_slot, next_hash) > 0:
+            self._hashes[slot] = next_hash
+            self._keys[slot] = self._keys[next_slot]
+            self._values[slot] = self._values[next_slot]
+            slot = next_slot
+            next_slot = (slot + 1) % capacity
+            next_hash = self._hashes[next_slot]
+        self._hashes[slot] = None
+        self._keys[slot] = None
+        self._values[slot] = None
+        self._size -= 1
+
+    # See HashTable._key_hash().
+    def _key_hash(self, key: K) -> int:
+        return self._str_hasher(key) if isinstance(key, str) else hash(key)
+
+    # Changes the capacity if it's different to the current capacity.
+    def _resize(self, new_capacity: int) -> None:
+        if new_capacity != self._capacity:
+            self._set_capacity(new_capacity)
+
+    # Resizes the arrays and reinserts all key, value pairs into them.
+    def _set_capacity(self, new_capacity: int) -> None:
+        stats = self._stats
+        if stats is not None:
+            stats.resizes += 1
+            stats.rehashed += len(self)
+            # Reinsertion doesn't count as lookups.
+            lookups = stats.lookups
+            probes = stats.probes
+        old_hashes = self._hashes
+        old_keys = self._keys
+        old_values = self._values
+        self._allocate(new_capacity)
+        for key_hash, key, value in zip(old_hashes, old_keys, old_values):
+            if key_hash is not None:
+                self._put(key_hash, key, value)
+        if stats is not None:
+            stats.lookups = lookups
+            stats.probes = probes
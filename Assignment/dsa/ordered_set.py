@@ -0,0 +1,89 @@
+from .hash_table import HashTable, HashTableStats
+
+from typing import Generic, Hashable, Iterator, Optional, TypeVar
+
+
+__all__ = [
+    "OrderedSet"
+]
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+# Set which iterates items in the order they were added, with O(1) add, remove and contains.
+# Implemented as a doubly linked list threaded through a hash table: each item maps to the items before
+# and after it. (Linking by item rather than by node object keeps serialisation from recursing down
+# the whole list.)
+class OrderedSet(Generic[T]):
+    class _Link(Generic[T]):
+        __slots__ = ("prev", "next")
+
+        def __init__(self, prev: Optional[T], next: Optional[T]) -> None:
+            self.prev = prev
+            self.next = next
+
+    __slots__ = ("_links", "_first", "_last")
+
+    # All constructor arguments are passed through to the hash table.
+    # hashtable_type: the hash table class to use, e.g. HashTable or OpenHashTable.
+    def __init__(self, *args, hashtable_type: type = HashTable, **kwargs) -> None:
+        self._links: HashTable[T, OrderedSet._Link[T]] = hashtable_type(*args, **kwargs)
+        self._first: Optional[T] = None
+        self._last: Optional[T] = None
+
+    # Adds an item to the end of the set, if it doesn't already exist.
+    # Returns a bool indicating if the item was new.
+    def add(self, item: T) -> bool:
+        new = item not in self._links
+        if new:
+            if len(self._links):
+                self._links[self._last].next = item
+            else:
+                self._first = item
+            self._links[item] = self._Link(self._last, None)
+            self._last = item
+        return new
+
+    # Makes sure there is enough capacity for size items in total, so adding up to that many doesn't resize.
+    def reserve(self, size: int) -> None:
+        self._links.reserve(size)
+
+    # Removes an item from the set if it exists, otherwise raises KeyError.
+    # shrink: if false, the capacity is never reduced (see shrink()).
+    def remove(self, item: T, shrink: bool = True) -> None:
+        link = self._links[item]
+        self._links.remove(item, shrink)
+        if item == self._first:
+            self._first = link.next
+        else:
+            self._links[link.prev].next = link.next
+        if item == self._last:
+            self._last = link.prev
+        else:
+            self._links[link.next].prev = link.prev
+
+    # Reduces the capacity after removals made with shrink=False. Does at most 1 resize.
+    def shrink(self) -> None:
+        self._links.shrink()
+
+    # Counts of the work done by the underlying hash table.
+    @property
+    def stats(self) -> HashTableStats:
+        return self._links.stats
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._links
+
+    # Iterates items in the order they were added.
+    def __iter__(self) -> Iterator[T]:
+        item = self._first
+        for _ in range(len(self._links)):
+            yield item
+            item = self._links[item].next
+
+    def __repr__(self) -> str:
+        return "{" + ", ".join(map(repr, self)) + "}"
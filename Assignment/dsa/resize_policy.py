@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+from math import ceil, floor
+
+
+__all__ = [
+    "HysteresisPolicy",
+    "ResizePolicy",
+    "ThresholdPolicy"
+]
+
+
+# Decides when a hash table changes capacity, and to what, from its size (number of items) and capacity.
+# Hash tables take a policy class as their resize_policy argument, and construct it with their load factor
+# arguments (already validated by the hash table).
+class ResizePolicy(ABC):
+    # min_load_factor: load factors <= this amount after a removal may trigger the capacity to be reduced.
+    # max_load_factor: load factors >= this amount after an insertion trigger the capacity to be increased.
+    # shrink_factor: fraction decrease in capacity when a capacity reduction is triggered.
+    # growth_factor: fraction increase in capacity when a capacity increase is triggered.
+    def __init__(self, min_load_factor: float, max_load_factor: float, shrink_factor: float,
+                 growth_factor: float) -> None:
+        self.min_load_factor = min_load_factor
+        self.max_load_factor = max_load_factor
+        self.shrink_factor = shrink_factor
+        self.growth_factor = growth_factor
+
+    # Returns the capacity the hash table should have after an insertion (capacity if no resize is needed).
+    @abstractmethod
+    def grown_capacity(self, size: int, capacity: int) -> int:
+        pass
+
+    # Returns the capacity the hash table should have after one or more removals (capacity if no resize
+    # is needed).
+    @abstractmethod
+    def shrunk_capacity(self, size: int, capacity: int) -> int:
+        pass
+
+    # Smallest capacity that holds size items below the maximum load factor.
+    def _min_capacity(self, size: int) -> int:
+        return floor(size / self.max_load_factor) + 1
+
+
+# Grows by growth_factor when the maximum load factor is reached, and shrinks by shrink_factor (repeatedly,
+# if removals were deferred) when the minimum load factor is reached.
+# If min_load_factor is close to max_load_factor / (1 + growth_factor), alternating insertions and
+# removals can resize the table every time.
+class ThresholdPolicy(ResizePolicy):
+    def grown_capacity(self, size: int, capacity: int) -> int:
+        if size / capacity >= self.max_load_factor:
+            capacity = max(ceil(capacity * (1.0 + self.growth_factor)), self._min_capacity(size))
+        return capacity
+
+    def shrunk_capacity(self, size: int, capacity: int) -> int:
+        min_capacity = max(self._min_capacity(size), 1)
+        shrinking = True
+        while shrinking and size / capacity <= self.min_load_factor:
+            new_capacity = max(floor(capacity * (1.0 - self.shrink_factor)), min_capacity)
+            shrinking = new_capacity < capacity
+            capacity = new_capacity
+        return capacity
+
+
+# Resizes at the same load factors as ThresholdPolicy, but always to a capacity giving a load factor halfway
+# between the minimum and maximum. (Growth is still by at least growth_factor. shrink_factor is unused.)
+# After any resize, a number of operations proportional to the new capacity must happen before the next one,
+# so resizing costs O(1) amortised per operation.
+# If min_load_factor isn't less than max_load_factor, there is no load factor in between, so resizes exactly like
+# ThresholdPolicy.
+class HysteresisPolicy(ThresholdPolicy):
+    def __init__(self, min_load_factor: float, max_load_factor: float, shrink_factor: float,
+                 growth_factor: float) -> None:
+        super().__init__(min_load_factor, max_load_factor, shrink_factor, growth_factor)
+        self._target_load_factor = (min_load_factor + max_load_factor) / 2
+        self._hysteresis = min_load_factor < max_load_factor
+
+    def grown_capacity(self, size: int, capacity: int) -> int:
+        if not self._hysteresis:
+            capacity = super().grown_capacity(size, capacity)
+        elif size / capacity >= self.max_load_factor:
+            capacity = max(ceil(capacity * (1.0 + self.growth_factor)), self._target_capacity(size))
+        return capacity
+
+    def shrunk_capacity(self, size: int, capacity: int) -> int:
+        if not self._hysteresis:
+            capacity = super().shrunk_capacity(size, capacity)
+        elif size / capacity <= self.min_load_factor:
+            capacity = min(capacity, self._target_capacity(size))
+        return capacity
+
+    def _target_capacity(self, size: int) -> int:
+        return max(ceil(size / self._target_load_factor), self._min_capacity(size), 1)
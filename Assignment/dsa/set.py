@@ -1,4 +1,4 @@
-from .hash_table import HashTable
+from .hash_table import HashTable, HashTableStats
 
 from typing import Generic, Hashable, Iterator, TypeVar
 
@@ -12,9 +12,12 @@ T = TypeVar("T", bound=Hashable)
 
 
 class Set(Generic[T]):
-    # As this set is implemented with HashTable, all constructor arguments are passed through to it.
-    def __init__(self, *args, **kwargs) -> None:
-        self._hashtable: HashTable[T, None] = HashTable(*args, **kwargs)
+    __slots__ = ("_hashtable",)
+
+    # As this set is implemented with a hash table, all constructor arguments are passed through to it.
+    # hashtable_type: the hash table class to use, e.g. HashTable or OpenHashTable.
+    def __init__(self, *args, hashtable_type: type = HashTable, **kwargs) -> None:
+        self._hashtable: HashTable[T, None] = hashtable_type(*args, **kwargs)
 
     # Adds an item to the set, if it doesn't already exist.
     # Returns a bool indicating if the key was new.
@@ -23,9 +26,23 @@ class Set(Generic[T]):
         # so just set value to None.
         return self._hashtable.set(item, None)
 
+    # Makes sure there is enough capacity for size items in total, so adding up to that many doesn't resize.
+    def reserve(self, size: int) -> None:
+        self._hashtable.reserve(size)
+
     # Removes an item from the set if it exists, otherwise raises KeyError.
-    def remove(self, item: T) -> None:
-        del self._hashtable[item]
+    # shrink: if false, the capacity is never reduced (see shrink()).
+    def remove(self, item: T, shrink: bool = True) -> None:
+        self._hashtable.remove(item, shrink)
+
+    # Reduces the capacity after removals made with shrink=False. Does at most 1 resize.
+    def shrink(self) -> None:
+        self._hashtable.shrink()
+
+    # Counts of the work done by the underlying hash table.
+    @property
+    def stats(self) -> HashTableStats:
+        return self._hashtable.stats
 
     def __len__(self) -> int:
         return len(self._hashtable)
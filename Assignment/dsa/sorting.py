@@ -31,9 +31,12 @@ def mergesort(seq, reverse: bool = False, key=_identity) -> None:
             _mergesort(seq, middle + 1, right)
             _merge(seq, left, middle + 1, right + 1)
 
+    # Temporary arrays have the same dtype as seq, so numeric arrays are merged without boxing their elements.
+    dtype = getattr(seq, "dtype", object)
+
     # Merges seq[left:middle] and seq[middle:right] into seq[left:right]
     def _merge(seq, left: int, middle: int, right: int):
-        tmp = Array(right - left)
+        tmp = Array(right - left, dtype)
         i = left
         j = middle
         k = 0
@@ -53,8 +56,7 @@ def mergesort(seq, reverse: bool = False, key=_identity) -> None:
             tmp[k] = seq[j]
             k += 1
 
-        for k, e in zip(range(left, right), tmp):
-            seq[k] = e
+        seq[left:right] = tmp
 
     _mergesort(seq, 0, len(seq) - 1)
 
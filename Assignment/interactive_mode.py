@@ -1,7 +1,6 @@
-from network import evolve_network, Person, people_by_popularity, posts_by_popularity,\
-    read_network_file, SocialNetwork
+from network import evolve_network, load_snapshot, Person, people_by_popularity, posts_by_popularity,\
+    read_network_file, save_snapshot, SocialNetwork, top_people, top_posts
 
-import pickle
 from typing import Optional, Tuple
 
 
@@ -87,20 +86,14 @@ def load_network_serialised() -> SocialNetwork:
     path = input("Enter serialised file path: ")
     network = None
     try:
-        with open(path, "rb") as file:
-            network = pickle.load(file)
+        network = load_snapshot(path)
     except FileNotFoundError:
         print("Error: file not found.")
     except OSError as e:
         print(f"Error reading from file: {e.strerror}")
-    # Yes catching base Exception is bad, except the Python docs, in their infinite wisdom,
-    # don't actually say which exceptions pickle.load() can raise.
-    except Exception as e:
+    except (ValueError, KeyError, IndexError) as e:
+        # Corrupt files can have invalid layouts or out of range indices.
         print(f"Error reading serialised file: {e}")
-    else:
-        if not isinstance(network, SocialNetwork):
-            print("Error: serialised file does not contain a network.")
-            network = None
     return network
 
 
@@ -142,18 +135,14 @@ def new_post(person: Person) -> None:
     person.make_post(text)
 
 
-# Saves the given network is serialised (pickled) form to user-specified file path.
+# Saves the given network in serialised (snapshot) form to user-specified file path.
 def save_network_serialised(network: SocialNetwork) -> None:
     if assert_network(network):
         path = input("Enter file path: ")
         try:
-            with open(path, "wb") as file:
-                pickle.dump(network, file)
+            save_snapshot(network, path)
         except OSError as e:
             print(f"Error writing to file: {e.strerror}")
-        # Again, Python docs don't say which exceptions can be raised by pickle.dump().
-        except Exception as e:
-            print(f"Error serialising network: {e}")
 
 
 # Displays people and who follows them, and posts and who likes them.
@@ -179,11 +168,28 @@ def display_network(network: SocialNetwork) -> None:
 
 
 # Displays people sorted by follower count and posts sorted by like count.
+# The user can choose to only display the most popular people and posts.
 def network_statistics(network: SocialNetwork) -> None:
     if assert_network(network):
+        count = None
+        while count is None:
+            count = input("Enter number of people and posts to show (blank for all): ")
+            if count:
+                try:
+                    count = int(count)
+                except ValueError:
+                    print("Error: number must be an integer.")
+                    count = None
+                else:
+                    if count < 0:
+                        print("Error: number must be >=0.")
+                        count = None
+        print()
+
         print("People by popularity:")
         if network.person_count:
-            for person in people_by_popularity(network):
+            people = people_by_popularity(network) if count == "" else top_people(network, count)
+            for person in people:
                 print(f"  {person.follower_count} followers : {person}")
         else:
             print("<no people>")
@@ -191,7 +197,8 @@ def network_statistics(network: SocialNetwork) -> None:
 
         print("Posts by popularity:")
         if network.post_count:
-            for post in posts_by_popularity(network):
+            posts = posts_by_popularity(network) if count == "" else top_posts(network, count)
+            for post in posts:
                 print(f"  {post.like_count} likes : {post}")
         else:
             print("<no posts>")
@@ -0,0 +1,228 @@
+from common import SizedIterable
+from dsa import Array, HashTable
+from network import Post, SocialNetwork, TimestepChanges
+
+import bz2
+import gzip
+from itertools import chain
+import lzma
+import numpy
+from queue import Queue
+from threading import Thread
+from typing import Any, BinaryIO, Callable, Optional, Tuple
+
+
+__all__ = [
+    "COMPRESSION_EXTENSIONS",
+    "format_changes",
+    "format_checkpoint",
+    "format_timestep",
+    "LogWriter",
+    "snapshot_timestep"
+]
+
+
+# File extension for each supported compression method.
+COMPRESSION_EXTENSIONS = {
+    None: "",
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "lzma": ".xz"
+}
+
+# Number of bytes buffered before being written to the log file.
+BUFFER_SIZE = 1 << 20
+
+
+# Captures the state of a network needed to log a timestep, as a tuple.
+# Reads the people and posts directly, copying only what evolution can change: follower and like counts,
+# who each person follows and who liked each post. (People and posts themselves are only read later for
+# their names and text, which don't change.) All the text is made by format_timestep().
+def snapshot_timestep(network: SocialNetwork, timestep: int) -> Tuple:
+    people = Array(network.people)
+    posts = Array(network.posts)
+    follower_counts = numpy.fromiter((person.follower_count for person in people), numpy.int64, len(people))
+    like_counts = numpy.fromiter((post.like_count for post in posts), numpy.int64, len(posts))
+    following_offsets = _offsets(numpy.fromiter((person.following_count for person in people), numpy.int64,
+                                                len(people)))
+    following = Array(SizedIterable(chain.from_iterable(person.following for person in people),
+                                    network.follow_count))
+    # Likers are kept in the order they liked each post.
+    liker_offsets = _offsets(like_counts)
+    likers = Array(SizedIterable(chain.from_iterable(post.liked_by for post in posts), network.like_count))
+    return timestep, people, posts, follower_counts, like_counts, following_offsets, following, liker_offsets, likers
+
+
+# Formats a timestep snapshot as text: people sorted by follower count, posts by like count,
+# following lists, and post like lists. People and posts with equal counts are in network order.
+def format_timestep(snapshot: Tuple) -> str:
+    (timestep, people, posts, follower_counts, like_counts, following_offsets, following, liker_offsets,
+     likers) = snapshot
+    names = _strings(people)
+    post_names = _strings(posts)
+    following_names = _strings(following)
+    liker_names = _strings(likers)
+
+    # Formats the items of a list stored flat (e.g. who person i follows) as a comma separated list of names.
+    def _names(offsets: numpy.ndarray, flat_names: numpy.ndarray, i: int) -> str:
+        return ", ".join(flat_names[offsets[i]:offsets[i + 1]])
+
+    return "".join((
+        f"Timestep {timestep}\n",
+        "  People by popularity:\n",
+        "".join(f"    {follower_counts[i]} followers : {names[i]}\n"
+                for i in numpy.argsort(-follower_counts, kind="stable")),
+        "  Posts by popularity:\n",
+        "".join(f"    {like_counts[i]} likes : {post_names[i]}\n"
+                for i in numpy.argsort(-like_counts, kind="stable")),
+        "  Following:\n",
+        "".join(f"    {names[i]} : {_names(following_offsets, following_names, i)}\n" for i in range(len(people))),
+        "  Post likes:\n",
+        "".join(f"    {post_names[i]} : {_names(liker_offsets, liker_names, i)}\n" for i in range(len(posts))),
+        "\n"
+    ))
+
+
+# Formats the changes made in a timestep as delta log lines:
+#   T:<timestep>
+#   L:<person name>:<poster name>:<post number>   for each new like
+#   F:<person name>:<followed person name>        for each new follow
+# Posts are identified by their position in their poster's posts, which is unique and survives snapshots
+# (unlike post ids, which are random), and doesn't change since no posts are made during evolution.
+# (Names can't contain colons, since network and event files couldn't represent them.)
+def format_changes(timestep: int, changes: TimestepChanges) -> str:
+    # Filled in one poster at a time, the first time one of their posts is liked.
+    post_numbers: HashTable[Post, int] = HashTable()
+
+    def _post_number(post: Post) -> int:
+        if post not in post_numbers:
+            for i, p in enumerate(post.poster.posts):
+                post_numbers[p] = i
+        return post_numbers[post]
+
+    return "".join(chain(
+        (f"T:{timestep}\n",),
+        (f"L:{person.name}:{post.poster.name}:{_post_number(post)}\n" for person, post in changes.likes),
+        (f"F:{person.name}:{followee.name}\n" for person, followee in changes.follows)
+    ))
+
+
+# Formats a delta log line recording that a snapshot of the network after the given timestep
+# (0 for the initial network) was saved to the given path:
+#   C:<timestep>:<snapshot path>
+def format_checkpoint(timestep: int, snapshot_path: str) -> str:
+    return f"C:{timestep}:{snapshot_path}\n"
+
+
+# Returns the offsets of the lists with the given lengths when stored one after another.
+def _offsets(lengths: numpy.ndarray) -> numpy.ndarray:
+    offsets = numpy.zeros(len(lengths) + 1, dtype=numpy.int64)
+    numpy.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+# Returns an object array of str(item) for each item.
+def _strings(items: Array) -> numpy.ndarray:
+    strings = numpy.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        strings[i] = str(item)
+    return strings
+
+
+# Writes timestep logs from a background thread, so that the simulation can carry on while the previous
+# timestep is being formatted and written.
+# Use as a context manager, or call close() when done.
+class LogWriter:
+    # file: binary file to write to. Closed when the writer is closed.
+    # compression: None, or a key of COMPRESSION_EXTENSIONS.
+    # max_pending: maximum number of timesteps waiting to be written before log() blocks.
+    #              (Bounds memory use if the simulation is faster than logging.)
+    def __init__(self, file: BinaryIO, compression: Optional[str] = None, max_pending: int = 2) -> None:
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unknown compression method {compression}.")
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be >=1, got {max_pending}.")
+        self._file = file
+        if compression == "gzip":
+            self._output = gzip.GzipFile(fileobj=file, mode="wb")
+        elif compression == "bz2":
+            self._output = bz2.BZ2File(file, "wb")
+        elif compression == "lzma":
+            self._output = lzma.LZMAFile(file, "wb")
+        else:
+            self._output = None
+        self._buffer = bytearray()
+        # Holds (formatting function, arguments) tuples.
+        self._queue: Queue[Optional[Tuple[Callable[..., str], Tuple]]] = Queue(max_pending)
+        # First exception raised by formatting or writing (e.g. OSError), re-raised by the next call.
+        self._error: Optional[Exception] = None
+        self._thread = Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    # Queues the network's current state to be logged as the given timestep.
+    # Raises the exception if a previous write failed (e.g. OSError).
+    def log(self, network: SocialNetwork, timestep: int) -> None:
+        self._put(format_timestep, snapshot_timestep(network, timestep))
+
+    # Queues the changes made in a timestep to be logged (see format_changes()).
+    # changes must not be modified afterwards.
+    # Raises the exception if a previous write failed (e.g. OSError).
+    def log_changes(self, timestep: int, changes: TimestepChanges) -> None:
+        self._put(format_changes, timestep, changes)
+
+    # Queues a checkpoint line to be logged (see format_checkpoint()).
+    # Raises the exception if a previous write failed (e.g. OSError).
+    def log_checkpoint(self, timestep: int, snapshot_path: str) -> None:
+        self._put(format_checkpoint, timestep, snapshot_path)
+
+    # Waits for all queued timesteps to be written, then closes the file.
+    # Raises the exception if any write failed (e.g. OSError).
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            try:
+                self._flush()
+                if self._output is not None:
+                    self._output.close()
+            except OSError as e:
+                self._error = self._error or e
+            finally:
+                self._file.close()
+        self._check_error()
+
+    def __enter__(self) -> "LogWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _put(self, formatter: Callable[..., str], *args: Any) -> None:
+        self._check_error()
+        self._queue.put((formatter, args))
+
+    # Background thread: formats and writes queued items until the None sentinel is received.
+    def _run(self) -> None:
+        item = self._queue.get()
+        while item is not None:
+            # After an error, keep consuming the queue so log() never blocks forever.
+            if self._error is None:
+                formatter, args = item
+                try:
+                    self._buffer += formatter(*args).encode()
+                    if len(self._buffer) >= BUFFER_SIZE:
+                        self._flush()
+                except Exception as e:
+                    # Any exception (not just OSError), since the thread dying would leave log() blocked.
+                    self._error = e
+            item = self._queue.get()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            (self._file if self._output is None else self._output).write(self._buffer)
+            self._buffer = bytearray()
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise self._error
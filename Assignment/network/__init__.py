@@ -1,3 +1,8 @@
+from .compact import *
+from .interning import *
 from .network import *
+from .ranking import *
+from .reachability import *
 from .simulation import *
+from .snapshot import *
 from .util import *
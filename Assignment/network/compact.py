@@ -0,0 +1,291 @@
+from dsa import Array, HashTable
+
+from multiprocessing.shared_memory import SharedMemory
+import numpy
+from typing import Optional, Tuple
+
+
+__all__ = [
+    "CompactNetwork",
+    "SharedCompactArrays"
+]
+
+
+# A many-to-many relation between dense integer ids, stored in CSR form:
+# the columns related to row i are indices[offsets[i]:offsets[i + 1]].
+# Each row's columns are kept sorted, which makes the flattened (row, column) keys sorted too,
+# so membership queries are binary searches.
+class _Relation:
+    def __init__(self, row_count: int, column_count: int, rows: numpy.ndarray, columns: numpy.ndarray) -> None:
+        self._row_count = row_count
+        self._width = max(column_count, 1)
+        self._keys = numpy.unique(self._key(rows, columns))
+        self._update()
+
+    # Creates a relation directly from its flattened keys and CSR arrays (e.g. views of shared memory).
+    @classmethod
+    def _from_arrays(cls, row_count: int, width: int, keys: numpy.ndarray, offsets: numpy.ndarray,
+                     indices: numpy.ndarray) -> "_Relation":
+        relation = cls.__new__(cls)
+        relation._row_count = row_count
+        relation._width = width
+        relation._keys = keys
+        relation._offsets = offsets
+        relation._indices = indices
+        return relation
+
+    @property
+    def offsets(self) -> numpy.ndarray:
+        return self._offsets
+
+    @property
+    def indices(self) -> numpy.ndarray:
+        return self._indices
+
+    @property
+    def size(self) -> int:
+        return self._keys.size
+
+    # Returns a tuple of (position in rows, column) for every column related to any of the given rows.
+    def gather(self, rows: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        counts = self._offsets[rows + 1] - self._offsets[rows]
+        total = int(counts.sum())
+        positions = numpy.repeat(numpy.arange(rows.size), counts)
+        # Start of each row in indices, shifted back by the number of columns gathered before that row.
+        starts = numpy.repeat(self._offsets[rows] - (numpy.cumsum(counts) - counts), counts)
+        return positions, self._indices[starts + numpy.arange(total)]
+
+    # Returns a bool array indicating which (row, column) pairs are in the relation.
+    def contains(self, rows: numpy.ndarray, columns: numpy.ndarray) -> numpy.ndarray:
+        keys = self._key(rows, columns)
+        positions = numpy.searchsorted(self._keys, keys)
+        found = positions < self._keys.size
+        found[found] = self._keys[positions[found]] == keys[found]
+        return found
+
+    # Adds (row, column) pairs to the relation. Pairs already present are ignored.
+    def add(self, rows: numpy.ndarray, columns: numpy.ndarray) -> None:
+        keys = numpy.unique(self._key(rows, columns))
+        keys = keys[~self.contains(keys // self._width, keys % self._width)]
+        if keys.size:
+            self._keys = numpy.insert(self._keys, numpy.searchsorted(self._keys, keys), keys)
+            self._update()
+
+    def _key(self, rows: numpy.ndarray, columns: numpy.ndarray) -> numpy.ndarray:
+        return rows.astype(numpy.int64) * self._width + columns
+
+    # Recomputes the CSR arrays from the flattened keys.
+    def _update(self) -> None:
+        row_starts = numpy.arange(self._row_count + 1, dtype=numpy.int64) * self._width
+        self._offsets = numpy.searchsorted(self._keys, row_starts)
+        self._indices = self._keys % self._width
+
+
+# Compact, integer-indexed mirror of a SocialNetwork's relations.
+# Every person and post is assigned a dense id (its index in people or posts), and the following,
+# authorship and like relations are kept as CSR arrays over those ids.
+# The object graph remains the source of truth: the arrays are built from it, and must either be
+# updated alongside it (by making likes and follows with add_likes() and add_follows()) or be rebuilt.
+class CompactNetwork:
+    def __init__(self, network: "SocialNetwork") -> None:
+        self._version = network._version
+        self.people: Array["Person"] = Array(network.people)
+        self.posts: Array["Post"] = Array(network.posts)
+        person_count = len(self.people)
+        post_count = len(self.posts)
+        self._counts = (person_count, post_count)
+
+        person_ids: HashTable["Person", int] = HashTable(capacity=max(person_count, 1))
+        for i, person in enumerate(self.people):
+            person_ids[person] = i
+        post_ids: HashTable["Post", int] = HashTable(capacity=max(post_count, 1))
+        for i, post in enumerate(self.posts):
+            post_ids[post] = i
+
+        following_counts = numpy.fromiter((p.following_count for p in self.people), numpy.int64, person_count)
+        post_counts = numpy.fromiter((p.post_count for p in self.people), numpy.int64, person_count)
+        liked_counts = numpy.fromiter((p.liked_post_count for p in self.people), numpy.int64, person_count)
+        people_range = numpy.arange(person_count)
+
+        # network.posts yields posts grouped by poster, in the same order as network.people.
+        self.poster = numpy.repeat(people_range, post_counts)
+        self.clickbait = numpy.fromiter((p.clickbait_factor for p in self.posts), numpy.float64, post_count)
+
+        followees = numpy.fromiter((person_ids[f] for p in self.people for f in p.following),
+                                   numpy.int64, int(following_counts.sum()))
+        follower_ids = numpy.repeat(people_range, following_counts)
+        self.following = _Relation(person_count, person_count, follower_ids, followees)
+        # Reverse of following, to find who follows someone.
+        self.followers = _Relation(person_count, person_count, followees, follower_ids)
+        self.authored = _Relation(person_count, post_count, self.poster, numpy.arange(post_count))
+        liked = numpy.fromiter((post_ids[q] for p in self.people for q in p.liked_posts),
+                               numpy.int64, int(liked_counts.sum()))
+        self.likes = _Relation(person_count, post_count, numpy.repeat(people_range, liked_counts), liked)
+
+        # Bool array of the people who might make new likes or follows in the next timestep, for
+        # incremental evolution. None if unknown (everyone must be considered).
+        self.frontier: Optional[numpy.ndarray] = None
+
+    @property
+    def person_count(self) -> int:
+        return self._counts[0]
+
+    @property
+    def post_count(self) -> int:
+        return self._counts[1]
+
+    # Returns a tuple of (person ids, post ids) of every distinct (person, post) pair where the post
+    # was made or liked by someone the person follows, excluding the person's own posts.
+    # Only the given people are considered, or everyone if people is None.
+    # Pairs are sorted by person id, then post id.
+    def candidate_pairs(self, people: Optional[numpy.ndarray] = None) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        if people is None:
+            people = numpy.arange(self.person_count)
+        positions, followees = self.following.gather(people)
+        persons = people[positions]
+        post_positions, posts = self.authored.gather(followees)
+        like_positions, liked = self.likes.gather(followees)
+        pair_persons = numpy.concatenate((persons[post_positions], persons[like_positions]))
+        pair_posts = numpy.concatenate((posts, liked))
+        not_own = self.poster[pair_posts] != pair_persons
+        width = max(self.post_count, 1)
+        keys = numpy.unique(pair_persons[not_own] * width + pair_posts[not_own])
+        return keys // width, keys % width
+
+    # Makes new likes (none of which may already exist) in both the arrays and the object graph of network, in
+    # bulk: each person's and post's set is grown at most once, and each post is moved in the like ranking once,
+    # which is much faster than Person.like_post() for each.
+    # persons, posts: ids of who liked what. Each post's likes are made in this order.
+    def add_likes(self, persons: numpy.ndarray, posts: numpy.ndarray, network: "SocialNetwork") -> None:
+        liked_counts = numpy.bincount(persons, minlength=self.person_count)
+        like_counts = numpy.bincount(posts, minlength=self.post_count)
+        changed_people = numpy.flatnonzero(liked_counts)
+        changed_posts = numpy.flatnonzero(like_counts)
+        for i in changed_people.tolist():
+            person = self.people[i]
+            person._liked_posts.reserve(person.liked_post_count + int(liked_counts[i]))
+        for i in changed_posts.tolist():
+            post = self.posts[i]
+            post._liked_by.reserve(post.like_count + int(like_counts[i]))
+        for i, j in zip(persons.tolist(), posts.tolist()):
+            self.people[i]._liked_posts.add(self.posts[j])
+            self.posts[j]._liked_by.add(self.people[i])
+        for i in changed_posts.tolist():
+            post = self.posts[i]
+            network._post_ranking.move(post, post.like_count - int(like_counts[i]), post.like_count)
+        network._like_count += persons.size
+        if persons.size:
+            network._version += 1
+        self.likes.add(persons, posts)
+        self._version = network._version
+
+    # Makes new follows (none of which may already exist) in both the arrays and the object graph of network, in
+    # bulk, like add_likes().
+    # persons, followees: ids of who followed whom.
+    def add_follows(self, persons: numpy.ndarray, followees: numpy.ndarray, network: "SocialNetwork") -> None:
+        following_counts = numpy.bincount(persons, minlength=self.person_count)
+        follower_counts = numpy.bincount(followees, minlength=self.person_count)
+        changed_followees = numpy.flatnonzero(follower_counts)
+        for i in numpy.flatnonzero(following_counts).tolist():
+            person = self.people[i]
+            person._following.reserve(person.following_count + int(following_counts[i]))
+        for i in changed_followees.tolist():
+            person = self.people[i]
+            person._followers.reserve(person.follower_count + int(follower_counts[i]))
+        for i, j in zip(persons.tolist(), followees.tolist()):
+            self.people[i]._following.add(self.people[j])
+            self.people[j]._followers.add(self.people[i])
+        for i in changed_followees.tolist():
+            person = self.people[i]
+            network._person_ranking.move(person, person.follower_count - int(follower_counts[i]),
+                                         person.follower_count)
+        network._follow_count += persons.size
+        if persons.size:
+            network._version += 1
+        self.following.add(persons, followees)
+        self.followers.add(followees, persons)
+        self._version = network._version
+
+
+# Handle to a copy of a CompactNetwork's arrays in shared memory, so other processes can read them
+# without the network having to be pickled for each of them.
+# The handle itself is cheap to pickle. In any process, attach() gives a CompactNetwork whose arrays
+# are views of the shared memory (its people and posts are not available, only their ids).
+class SharedCompactArrays:
+    # headroom: the shared memory is made this many times larger than the arrays, so that update() can
+    # copy in the arrays of a larger network.
+    def __init__(self, compact: CompactNetwork, headroom: float = 1.0) -> None:
+        arrays = self._arrays_of(compact)
+        self._capacity = max(int(sum(array.nbytes for array in arrays) * headroom), 1)
+        self._memory = SharedMemory(create=True, size=self._capacity)
+        self._name = self._memory.name
+        self._write(compact, arrays)
+
+    # Replaces the shared arrays with those of compact (e.g. the same network after it has changed), if they
+    # fit in the shared memory. Returns whether they did (if not, nothing is changed).
+    # Must only be called by the process that created the shared memory, while no other process uses it.
+    def update(self, compact: CompactNetwork) -> bool:
+        arrays = self._arrays_of(compact)
+        fits = sum(array.nbytes for array in arrays) <= self._capacity
+        if fits:
+            self._write(compact, arrays)
+        return fits
+
+    # Returns a CompactNetwork reading directly from the shared memory.
+    # All references to it (and to arrays sliced from it) must be dropped before close() is called.
+    def attach(self) -> CompactNetwork:
+        if self._memory is None:
+            self._memory = SharedMemory(name=self._name)
+        arrays = Array(len(self._layout))
+        offset = 0
+        for i, (dtype, size) in enumerate(self._layout):
+            arrays[i] = numpy.ndarray(size, numpy.dtype(dtype), self._memory.buf, offset)
+            offset += arrays[i].nbytes
+
+        person_count, post_count = self._counts
+        compact = CompactNetwork.__new__(CompactNetwork)
+        compact.people = None
+        compact.posts = None
+        compact._counts = self._counts
+        compact.following = _Relation._from_arrays(person_count, max(person_count, 1), *arrays[0:3])
+        compact.authored = _Relation._from_arrays(person_count, max(post_count, 1), *arrays[3:6])
+        compact.likes = _Relation._from_arrays(person_count, max(post_count, 1), *arrays[6:9])
+        compact.poster = arrays[9]
+        compact.clickbait = arrays[10]
+        compact.frontier = None
+        return compact
+
+    # Detaches this process from the shared memory.
+    def close(self) -> None:
+        if self._memory is not None:
+            self._memory.close()
+            self._memory = None
+
+    # Frees the shared memory. Should be called once, by the process that created it.
+    def unlink(self) -> None:
+        memory = SharedMemory(name=self._name) if self._memory is None else self._memory
+        memory.unlink()
+        memory.close()
+        self._memory = None
+
+    def __getstate__(self) -> Tuple:
+        return self._name, self._layout, self._counts, self._capacity
+
+    def __setstate__(self, state: Tuple) -> None:
+        self._name, self._layout, self._counts, self._capacity = state
+        self._memory = None
+
+    @staticmethod
+    def _arrays_of(compact: CompactNetwork) -> Tuple[numpy.ndarray, ...]:
+        return (compact.following._keys, compact.following.offsets, compact.following.indices,
+                compact.authored._keys, compact.authored.offsets, compact.authored.indices,
+                compact.likes._keys, compact.likes.offsets, compact.likes.indices,
+                compact.poster, compact.clickbait)
+
+    def _write(self, compact: CompactNetwork, arrays: Tuple[numpy.ndarray, ...]) -> None:
+        self._counts = (compact.person_count, compact.post_count)
+        self._layout = tuple((array.dtype.str, array.size) for array in arrays)
+        offset = 0
+        for array in arrays:
+            numpy.ndarray(array.shape, array.dtype, self._memory.buf, offset)[:] = array
+            offset += array.nbytes
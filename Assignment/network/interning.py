@@ -0,0 +1,86 @@
+from dsa import Array, HashTable
+
+from functools import lru_cache
+from typing import Any, Optional
+
+
+__all__ = [
+    "NAME_CACHE_SIZE",
+    "NameInterner"
+]
+
+
+# Default number of recently interned names whose handles are cached.
+NAME_CACHE_SIZE = 1 << 14
+
+
+# Maps each distinct name to a small integer handle (0, 1, 2, ... in order of first appearance), so that
+# files can be parsed into handles and their events applied with array indexing instead of name lookups.
+# Each handle also has a value slot (None until set), e.g. for the person the name currently refers to.
+# Recent names are cached, since files tend to repeat the same names over and over. (The cache uses Python's
+# own string hashing, which is cached in each string, so hits skip hashing the name and walking a chain.)
+class NameInterner:
+    # capacity: expected number of distinct names.
+    # cache_size: number of recently interned names cached.
+    # hashtable_args: arguments for the HashTable constructor.
+    def __init__(self, capacity: Optional[int] = None, cache_size: int = NAME_CACHE_SIZE, **hashtable_args) -> None:
+        if cache_size < 1:
+            raise ValueError(f"cache_size must be >=1, got {cache_size}.")
+        capacity = max(capacity or 1, 1)
+        self._handles: HashTable[str, int] = HashTable(capacity=capacity, **hashtable_args)
+        self._names: Array[str] = Array(capacity)
+        self._values: Array[Any] = Array(capacity)
+        self._cached_intern = lru_cache(cache_size)(self._intern)
+
+    # Returns the handle of the name, giving it a new handle if it hasn't been seen before.
+    def intern(self, name: str) -> int:
+        return self._cached_intern(name)
+
+    # Returns the handle of the name, or None if it hasn't been interned.
+    def find(self, name: str) -> Optional[int]:
+        return self._handles[name] if name in self._handles else None
+
+    # Returns the name with the given handle.
+    def name(self, handle: int) -> str:
+        self._check_handle(handle)
+        return self._names[handle]
+
+    # Returns the value of the handle's slot.
+    def get(self, handle: int) -> Any:
+        self._check_handle(handle)
+        return self._values[handle]
+
+    # Sets the value of the handle's slot.
+    def put(self, handle: int, value: Any) -> None:
+        self._check_handle(handle)
+        self._values[handle] = value
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._handles
+
+    def _intern(self, name: str) -> int:
+        handle = self.find(name)
+        if handle is None:
+            handle = len(self._handles)
+            self._handles[name] = handle
+            if handle == len(self._names):
+                self._grow()
+            self._names[handle] = name
+        return handle
+
+    # Doubles the capacity of the handle arrays.
+    def _grow(self) -> None:
+        names = Array(2 * len(self._names))
+        values = Array(2 * len(self._values))
+        for i in range(len(self._names)):
+            names[i] = self._names[i]
+            values[i] = self._values[i]
+        self._names = names
+        self._values = values
+
+    def _check_handle(self, handle: int) -> None:
+        if not 0 <= handle < len(self._handles):
+            raise KeyError(f"Handle {handle} not in interner.")
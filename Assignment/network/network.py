@@ -1,9 +1,12 @@
-from common import SizedIterable
-from dsa import HashTable, Set, SinglyLinkedList
+from .compact import CompactNetwork
+from .ranking import PopularityIndex
+from common import hash_many, SizedIterable, str_hash
+from dsa import Array, HashTable, HashTableStats, OrderedSet, Set, SinglyLinkedList
 
-from itertools import chain
+from itertools import chain, islice, takewhile
+import numpy
 import random
-from typing import Optional
+from typing import Iterable, Optional, Sequence, Tuple, Union
 
 
 __all__ = [
@@ -14,14 +17,26 @@ __all__ = [
 
 
 class Person:
-    def __init__(self, name: str, id: int, network: "SocialNetwork") -> None:
+    __slots__ = ("_name", "_network", "_id", "_posts", "_followers", "_following", "_liked_posts", "_mark")
+
+    # following_capacity, follower_capacity: initial capacities of the following and follower sets.
+    # (Default to 1. Sets grow as needed, and most people only follow and are followed by a small part of the
+    # network, so sizing them for the whole network would take memory proportional to the square of its size.)
+    def __init__(self, name: str, id: int, network: "SocialNetwork", following_capacity: Optional[int] = None,
+                 follower_capacity: Optional[int] = None) -> None:
+        if following_capacity is None:
+            following_capacity = 1
+        if follower_capacity is None:
+            follower_capacity = 1
         self._name = name
         self._network = network
         self._id = id
         self._posts: SinglyLinkedList["Post"] = SinglyLinkedList()
-        self._followers: Set["Person"] = Set(capacity=network._expected_people, **network._hashtable_args)
-        self._following: Set["Person"] = Set(capacity=network._expected_people, **network._hashtable_args)
-        self._liked_posts: Set["Post"] = Set(capacity=network._expected_posts, **network._hashtable_args)
+        self._followers: Set["Person"] = network._new_set(follower_capacity)
+        self._following: Set["Person"] = network._new_set(following_capacity)
+        self._liked_posts: Set["Post"] = network._new_set(1)
+        # For marking the person as visited by a search, with a value from SocialNetwork._new_mark().
+        self._mark = 0
 
     @property
     def name(self) -> str:
@@ -62,6 +77,7 @@ class Person:
     def make_post(self, text: str, clickbait_factor: int = 1) -> "Post":
         post = Post(self, random.randrange(2 ** 32), text, clickbait_factor)
         self._posts.insert_first(post)
+        self._network._version += 1
         return post
 
     def follow(self, person: "Person") -> None:
@@ -70,6 +86,9 @@ class Person:
         if not self._following.add(person):
             raise ValueError(f"{self} already follows {person}.")
         assert person._followers.add(self)
+        self._network._follow_count += 1
+        self._network._person_ranking.move(person, person.follower_count - 1, person.follower_count)
+        self._network._version += 1
 
     def unfollow(self, person: "Person") -> None:
         try:
@@ -77,11 +96,17 @@ class Person:
             person._followers.remove(self)
         except KeyError:
             raise ValueError(f"{self} doesn't follow {person}")
+        self._network._follow_count -= 1
+        self._network._person_ranking.move(person, person.follower_count + 1, person.follower_count)
+        self._network._version += 1
 
     def like_post(self, post: "Post") -> None:
         if not self._liked_posts.add(post):
             raise ValueError(f"{self} already likes {post}.")
-        post._liked_by.insert_last(self)
+        post._liked_by.add(self)
+        self._network._like_count += 1
+        self._network._post_ranking.move(post, post.like_count - 1, post.like_count)
+        self._network._version += 1
 
     def is_following(self, person: "Person") -> bool:
         return person in self._following
@@ -104,38 +129,65 @@ class Person:
     def __repr__(self) -> str:
         return f"Person(name={self._name}, id={self._id})"
 
-    def _delete(self) -> None:
+    # Removes the person from everyone and every post they're connected to, and deletes their posts.
+    # The other people and posts are added to affected (marked with mark) without their sets being
+    # shrunk, so the caller can shrink each of them once with _shrink().
+    def _delete(self, affected: SinglyLinkedList, mark: int) -> None:
         # Set attributes to None for debugging purposes and to make sure GC collects everything.
 
+        person_ranking = self._network._person_ranking
+        post_ranking = self._network._post_ranking
+        person_ranking.remove(self, self.follower_count)
+        self._network._follow_count -= self.following_count + self.follower_count
+        self._network._like_count -= self.liked_post_count
+
         for person in self._following:
-            person._followers.remove(self)
+            person._followers.remove(self, shrink=False)
+            person_ranking.move(person, person.follower_count + 1, person.follower_count)
+            _add_affected(person, affected, mark)
         self._following = None
 
         for person in self._followers:
-            person._following.remove(self)
+            person._following.remove(self, shrink=False)
+            _add_affected(person, affected, mark)
         self._followers = None
 
         for post in self._liked_posts:
-            post._liked_by.remove(self)
+            post._liked_by.remove(self, shrink=False)
+            post_ranking.move(post, post.like_count + 1, post.like_count)
+            _add_affected(post, affected, mark)
         self._liked_posts = None
 
         for post in self._posts:
-            post._delete()
+            post._delete(affected, mark)
         self._posts = None
 
         self._network = None
         self._id = None
         self._name = "[DELETED]"
 
+    # Shrinks the person's sets after removals from them by _delete(), unless the person is deleted too.
+    def _shrink(self) -> None:
+        if self._network is not None:
+            self._followers.shrink()
+            self._following.shrink()
+            self._liked_posts.shrink()
+
 
 class Post:
+    __slots__ = ("_poster", "_id", "_text", "_clickbait", "_liked_by", "_mark")
+
     def __init__(self, poster: Person, id: int, text: str, clickbait_factor: int = 1) -> None:
         self._poster = poster
         self._id = id
         self._text = text
         self._clickbait = clickbait_factor
-        self._liked_by: SinglyLinkedList[Person] = SinglyLinkedList()
+        # In the order the likes were made.
+        self._liked_by: OrderedSet[Person] = poster._network._new_set(1, OrderedSet)
+        # For marking the post as visited by a search, with a value from SocialNetwork._new_mark().
+        self._mark = 0
         self._poster._network._post_count += 1
+        self._poster._network._post_ranking.add(self, 0)
 
     @property
     def poster(self) -> Person:
@@ -166,6 +218,9 @@ class Post:
     def like_count(self) -> int:
         return len(self._liked_by)
 
+    def is_liked_by(self, person: Person) -> bool:
+        return person in self._liked_by
+
     def __hash__(self) -> int:
         # Post objects are actually unique, but since they are stored in hash tables which
         # may be serialised, object identity cannot be used as a hash, because it will change
@@ -179,10 +234,14 @@ class Post:
     def __repr__(self) -> str:
         return f"Post(poster={self._poster}, id={self._id}, text={self._text}, clickbait_factor={self._clickbait})"
 
-    def _delete(self) -> None:
+    # See Person._delete().
+    def _delete(self, affected: SinglyLinkedList, mark: int) -> None:
         for person in self._liked_by:
-            person._liked_posts.remove(self)
+            person._liked_posts.remove(self, shrink=False)
+            _add_affected(person, affected, mark)
         self._poster._network._post_count -= 1
+        self._poster._network._like_count -= self.like_count
+        self._poster._network._post_ranking.remove(self, self.like_count)
         self._liked_by = None
         self._poster = None
         self._id = None
@@ -190,20 +249,118 @@ class Post:
         self._clickbait = None
         # Responsibility of caller to remove this object from poster's list of posts.
 
+    # See Person._shrink().
+    def _shrink(self) -> None:
+        if self._liked_by is not None:
+            self._liked_by.shrink()
+
+
+# Adds a person or post to the list of those affected by a deletion, if not already marked as in it.
+def _add_affected(item: Union[Person, Post], affected: SinglyLinkedList, mark: int) -> None:
+    if item._mark != mark:
+        item._mark = mark
+        affected.insert_last(item)
+
 
 class SocialNetwork:
     # expected_people: expected total number of people to be present in the network.
     # expected_post: expected total number of posts to be present in the network.
-    # hashtable_args: arguments supplied to the HashTable constructor.
+    # compact_backend: if true, network evolution runs against a CompactNetwork mirror of the network.
+    # hashtable_type: hash table class used for the network's hash tables and sets (HashTable or OpenHashTable).
+    # hashtable_args: arguments supplied to the hash table constructor.
     # (These are solely for performance optimisation.)
     def __init__(self, expected_people: Optional[int] = None, expected_posts: Optional[int] = None,
-                 **hashtable_args) -> None:
+                 compact_backend: bool = False, hashtable_type: type = HashTable, **hashtable_args) -> None:
         self._expected_people = max(expected_people, 1) if expected_people is not None else None
         self._expected_posts = max(expected_posts, 1) if expected_posts is not None else None
         hashtable_args.pop("capacity", None)
+        self._hashtable_type = hashtable_type
         self._hashtable_args = hashtable_args
-        self._people: HashTable[str, Person] = HashTable(capacity=self._expected_people, **hashtable_args)
+        self._str_hasher = hashtable_args.get("str_hasher", str_hash)
+        self._people: HashTable[str, Person] = hashtable_type(capacity=self._expected_people, **hashtable_args)
         self._post_count = 0
+        # Total number of likes and follows, kept up to date so they needn't be counted.
+        self._like_count = 0
+        self._follow_count = 0
+        self._compact_backend = compact_backend
+        self._compact: Optional[CompactNetwork] = None
+        # People ranked by follower count and posts ranked by like count.
+        self._person_ranking: PopularityIndex[Person] = PopularityIndex(self._new_table(self._expected_people))
+        self._post_ranking: PopularityIndex[Post] = PopularityIndex(self._new_table(self._expected_posts))
+        # Incremented on every change to the network, so derived data can tell when it's out of date.
+        self._version = 0
+        # Last value returned by _new_mark().
+        self._mark_count = 0
+
+    # Creates a network of the given people and follows in bulk, which is much faster than
+    # adding each person and follow individually.
+    # names: names of the people in the network. Must be unique.
+    # edge_pairs: (follower name, followee name) pairs, or an integer array of shape (n, 2)
+    #             of (follower, followee) indices into names.
+    # allow_duplicates: if true, repeated follows are ignored, otherwise they raise ValueError.
+    # ids: ids of the people, in the same order as names. Random if None.
+    # network_args: arguments for the SocialNetwork constructor (expected_people is set automatically).
+    # Raises ValueError for follows that would raise ValueError if made individually.
+    @classmethod
+    def from_edges(cls, names: Sequence[str], edge_pairs, allow_duplicates: bool = False,
+                   ids: Optional[Sequence[int]] = None, **network_args) -> "SocialNetwork":
+        names = Array(names)
+        person_count = len(names)
+        network_args["expected_people"] = person_count
+        network = cls(**network_args)
+
+        # Names are hashed once for both the index table and the network's table of people, all at once.
+        hashes = hash_many(names, network._str_hasher)
+        indices: HashTable[str, int] = HashTable(capacity=max(person_count, 1), str_hasher=network._str_hasher)
+        for i, name in enumerate(names):
+            if not indices.set(name, i, int(hashes[i])):
+                raise ValueError(f'Person with name "{name}" already exists in network.')
+
+        if isinstance(edge_pairs, numpy.ndarray):
+            edges = edge_pairs.astype(numpy.int64).reshape(-1, 2)
+            if edges.size and not (0 <= edges.min() and edges.max() < person_count):
+                raise ValueError("Edge index out of range.")
+            followers = edges[:, 0]
+            followees = edges[:, 1]
+        else:
+            edge_pairs = Array(edge_pairs)
+            followers = Array(len(edge_pairs), numpy.int64)
+            followees = Array(len(edge_pairs), numpy.int64)
+            for i, (follower, followee) in enumerate(edge_pairs):
+                followers[i] = network._index_of(indices, follower)
+                followees[i] = network._index_of(indices, followee)
+            followers = numpy.asarray(followers)
+            followees = numpy.asarray(followees)
+        if ids is not None:
+            ids = Array(ids, numpy.int64)
+
+        if numpy.any(followers == followees):
+            raise ValueError("Cannot follow self.")
+        width = max(person_count, 1)
+        keys, first, counts = numpy.unique(followers * width + followees, return_index=True, return_counts=True)
+        if keys.size < followers.size:
+            if not allow_duplicates:
+                duplicate = first[numpy.flatnonzero(counts > 1)[0]]
+                raise ValueError(f"{names[followers[duplicate]]} already follows {names[followees[duplicate]]}.")
+            followers = followers[first]
+            followees = followees[first]
+
+        # Size every person's follow sets to fit exactly, so they never need resizing while being filled.
+        following_counts = Array(numpy.bincount(followers, minlength=person_count), numpy.int64)
+        follower_counts = Array(numpy.bincount(followees, minlength=person_count), numpy.int64)
+        people: Array[Person] = Array(person_count)
+        for i, name in enumerate(names):
+            id = random.randrange(2 ** 32) if ids is None else int(ids[i])
+            people[i] = Person(name, id, network, max(int(following_counts[i]), 1), max(int(follower_counts[i]), 1))
+            network._people.set(name, people[i], int(hashes[i]))
+        for follower, followee in zip(followers, followees):
+            people[follower]._following.add(people[followee])
+            people[followee]._followers.add(people[follower])
+        for person in people:
+            network._person_ranking.add(person, person.follower_count)
+        network._follow_count = followers.size
+        network._version += 1
+        return network
 
     @property
     def person_count(self) -> int:
@@ -222,24 +379,149 @@ class SocialNetwork:
     def post_count(self) -> int:
         return self._post_count
 
+    # Total number of posts liked by anyone.
+    @property
+    def like_count(self) -> int:
+        return self._like_count
+
+    # Total number of people followed by anyone.
+    @property
+    def follow_count(self) -> int:
+        return self._follow_count
+
+    @property
+    def compact_backend(self) -> bool:
+        return self._compact_backend
+
+    # Compact (CSR) mirror of the network's current state. Rebuilt if the network has changed since last built.
+    @property
+    def compact_view(self) -> CompactNetwork:
+        if self._compact is None or self._compact._version != self._version:
+            self._compact = CompactNetwork(self)
+        return self._compact
+
+    # Combined counts of the work done by the network's table of people and the sets of its current people
+    # and posts. (Deleted people's and posts' tables aren't included.) For tuning the hash table arguments.
+    def hashtable_stats(self) -> HashTableStats:
+        tables = chain(
+            (self._people,),
+            chain.from_iterable((p._followers, p._following, p._liked_posts) for p in self.people),
+            (post._liked_by for post in self.posts)
+        )
+        return sum((table.stats for table in tables), HashTableStats())
+
     def add_person(self, name) -> Person:
         if name in self._people:
             raise ValueError(f'Person with name "{name}" already exists in network.')
         person = Person(name, random.randrange(2 ** 32), self)
         self._people[name] = person
+        self._person_ranking.add(person, 0)
+        self._version += 1
         return person
 
     # person should not be used after deletion.
     def delete_person(self, person: Person) -> None:
-        try:
-            del self._people[person.name]
-        except KeyError:
-            raise ValueError(f"{person} doesn't exist in network.")
-        else:
-            person._delete()
+        self.delete_people((person,))
+
+    # Deletes many people at once, which is faster than deleting them individually: the sets they're
+    # removed from are only shrunk once at the end, rather than possibly being resized after each person.
+    # Raises ValueError, without deleting anyone, if any person doesn't exist in the network
+    # (including if they appear more than once).
+    def delete_people(self, people: Iterable[Person]) -> None:
+        people = SinglyLinkedList(people)
+        mark = self._new_mark()
+        for person in people:
+            if person._mark == mark or person._network is not self or person.name not in self._people:
+                raise ValueError(f"{person} doesn't exist in network.")
+            person._mark = mark
+
+        affected: SinglyLinkedList = SinglyLinkedList()
+        mark = self._new_mark()
+        for person in people:
+            self._people.remove(person.name, shrink=False)
+            person._delete(affected, mark)
+        self._people.shrink()
+        for item in affected:
+            item._shrink()
+        if people:
+            self._version += 1
+
+    # Makes many follows at once, which is faster than making them individually: each followed person is
+    # moved in the follower ranking once, rather than once per follow.
+    # follows: (follower, followee) pairs.
+    # Raises ValueError, without making any follows, if any follow would raise ValueError if made individually
+    # in order, or if either person doesn't exist in the network.
+    def add_follows(self, follows: Iterable[Tuple[Person, Person]]) -> None:
+        follows = SinglyLinkedList(follows)
+        for follower, followee in follows:
+            for person in (follower, followee):
+                if person._network is not self or person.name not in self._people:
+                    raise ValueError(f"{person} doesn't exist in network.")
+            if follower is followee:
+                raise ValueError("Cannot follow self.")
+
+        # Followed people with their follower counts before the batch, each added once (marked with mark).
+        followees: SinglyLinkedList[Tuple[Person, int]] = SinglyLinkedList()
+        mark = self._new_mark()
+        # Number of follows made so far.
+        made = 0
+        error = None
+        for follower, followee in takewhile(lambda _: error is None, follows):
+            if followee._mark != mark:
+                followee._mark = mark
+                followees.insert_last((followee, followee.follower_count))
+            if follower._following.add(followee):
+                followee._followers.add(follower)
+                made += 1
+            else:
+                error = ValueError(f"{follower} already follows {followee}.")
+        if error is not None:
+            # Undo the follows made so far.
+            for follower, followee in islice(follows, made):
+                follower._following.remove(followee)
+                followee._followers.remove(follower)
+            raise error
+
+        for person, count in followees:
+            self._person_ranking.move(person, count, person.follower_count)
+        self._follow_count += len(follows)
+        if follows:
+            self._version += 1
 
     def find_person(self, name: str) -> Person:
         try:
             return self._people[name]
         except KeyError:
             raise ValueError(f'Person with name "{name}" doesn\'t exist in network.')
+
+    # Makes room for the given total numbers of people and/or posts, for when they become known after
+    # the network was created. (Solely for performance optimisation.)
+    def reserve(self, person_count: Optional[int] = None, post_count: Optional[int] = None) -> None:
+        if person_count is not None:
+            self._people.reserve(person_count)
+            self._person_ranking.reserve(person_count)
+        if post_count is not None:
+            self._expected_posts = max(post_count, 1)
+            self._post_ranking.reserve(self._expected_posts)
+
+    # Returns a new value for marking people and posts as visited, different to any returned before.
+    # Each search can use its own mark, so marks never need to be cleared afterwards.
+    def _new_mark(self) -> int:
+        self._mark_count += 1
+        return self._mark_count
+
+    # Returns the index of the named person, or raises ValueError if they don't exist.
+    @staticmethod
+    def _index_of(indices: HashTable[str, int], name: str) -> int:
+        try:
+            return indices[name]
+        except KeyError:
+            raise ValueError(f'Person with name "{name}" doesn\'t exist in network.')
+
+    # Creates a hash table using the network's hash table type and arguments.
+    def _new_table(self, capacity: Optional[int]) -> HashTable:
+        return self._hashtable_type(capacity=capacity, **self._hashtable_args)
+
+    # Creates a set (of type Set or OrderedSet) using the network's hash table type and arguments.
+    def _new_set(self, capacity: Optional[int], set_type: type = Set) -> Set:
+        return set_type(capacity=capacity, hashtable_type=self._hashtable_type, **self._hashtable_args)
@@ -0,0 +1,201 @@
+from dsa import Array, HashTable
+
+from itertools import islice
+import numpy
+from typing import Generic, Hashable, Iterator, Optional, TypeVar
+
+
+__all__ = [
+    "PopularityIndex"
+]
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+# Ranks items by a non-negative integer count (e.g. follower count), kept up to date as counts change.
+# Items are kept in buckets indexed by their count, and the non-empty buckets are linked in descending order
+# of count, so iterating in descending order of count is O(n) and needs no sorting, and iterating the top k
+# items is O(k). Changing a count by d is O(d) (so O(1) for the +-1 changes made by likes and follows).
+# Each bucket is a doubly linked list of nodes, so items with the same count are in the order they got that
+# count, and moving an item between buckets takes a single hash table lookup (to find its node).
+# The index doesn't know items' counts itself, so callers must supply them.
+class PopularityIndex(Generic[T]):
+    class _Node(Generic[T]):
+        __slots__ = ("item", "count", "prev", "next")
+
+        def __init__(self, item: T, count: int) -> None:
+            self.item = item
+            self.count = count
+            self.prev: Optional[PopularityIndex._Node[T]] = None
+            self.next: Optional[PopularityIndex._Node[T]] = None
+
+    # nodes: empty hash table to map items to their nodes (a HashTable by default).
+    def __init__(self, nodes: Optional[HashTable] = None) -> None:
+        self._nodes: HashTable[T, PopularityIndex._Node[T]] = nodes if nodes is not None else HashTable()
+        # _first[i] and _last[i] are the first and last nodes of the items with count i, or None if there are
+        # none.
+        self._first: Array[PopularityIndex._Node[T]] = Array(16)
+        self._last: Array[PopularityIndex._Node[T]] = Array(16)
+        # If bucket i is non-empty, _lower[i] and _higher[i] are the counts of the next non-empty buckets below
+        # and above it, or -1 if there are none.
+        self._lower: Array[int] = Array(16, numpy.int64)
+        self._higher: Array[int] = Array(16, numpy.int64)
+        # Counts of the highest and lowest non-empty buckets, or -1 if there are no items.
+        self._max_count = -1
+        self._min_count = -1
+
+    # Highest count of any item, or 0 if there are no items.
+    @property
+    def max_count(self) -> int:
+        return max(self._max_count, 0)
+
+    # Adds an item, which mustn't already be in the index, with the given count.
+    # Takes time proportional to the difference to the nearest count that any item has.
+    def add(self, item: T, count: int) -> None:
+        node = self._Node(item, count)
+        self._nodes[item] = node
+        self._prepare(count)
+        self._append(node)
+
+    # Removes an item, which must currently have the given count. Raises KeyError if it doesn't.
+    def remove(self, item: T, count: int) -> None:
+        node = self._node(item, count)
+        self._nodes.remove(item)
+        self._detach(node)
+
+    # Makes room for size items in total, for when many items are known to be about to be added.
+    def reserve(self, size: int) -> None:
+        self._nodes.reserve(size)
+
+    # Changes the count of an item from old_count to new_count. Raises KeyError if it doesn't have old_count.
+    def move(self, item: T, old_count: int, new_count: int) -> None:
+        node = self._node(item, old_count)
+        if new_count != old_count:
+            # Linking the new bucket while the item's old bucket is still non-empty means its place in the
+            # links is found within new_count - old_count steps.
+            self._prepare(new_count)
+            self._detach(node)
+            node.count = new_count
+            self._append(node)
+
+    # Iterates the first k items in descending order of count.
+    def top(self, k: int) -> Iterator[T]:
+        return islice(self, k)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # Iterates all items in descending order of count.
+    def __iter__(self) -> Iterator[T]:
+        count = self._max_count
+        while count >= 0:
+            node = self._first[count]
+            while node is not None:
+                yield node.item
+                node = node.next
+            count = int(self._lower[count])
+
+    # Returns the node of an item, which must have the given count, otherwise raises KeyError.
+    def _node(self, item: T, count: int) -> "PopularityIndex._Node[T]":
+        node = self._nodes[item]
+        if node.count != count:
+            raise KeyError(f"{item} not in index with count {count}.")
+        return node
+
+    # Makes sure there is a bucket for the given count, linking it in if it's empty.
+    def _prepare(self, count: int) -> None:
+        if count >= len(self._first):
+            self._grow(count)
+        if self._first[count] is None:
+            self._link(count)
+
+    # Adds a node to the end of the bucket for its count, which must have been prepared.
+    def _append(self, node: "PopularityIndex._Node[T]") -> None:
+        last = self._last[node.count]
+        node.prev = last
+        node.next = None
+        if last is not None:
+            last.next = node
+        else:
+            self._first[node.count] = node
+        self._last[node.count] = node
+
+    # Takes a node out of the bucket for its count, unlinking the bucket if that leaves it empty.
+    def _detach(self, node: "PopularityIndex._Node[T]") -> None:
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self._first[node.count] = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
+        else:
+            self._last[node.count] = node.prev
+        if self._first[node.count] is None:
+            self._unlink(node.count)
+
+    # Links the bucket for the given count (about to become non-empty) between its non-empty neighbours,
+    # found by searching outwards from it for the nearest non-empty bucket.
+    def _link(self, count: int) -> None:
+        if self._max_count < 0:
+            lower = higher = -1
+        elif count > self._max_count:
+            lower = self._max_count
+            higher = -1
+        elif count < self._min_count:
+            lower = -1
+            higher = self._min_count
+        else:
+            # count is between the lowest and highest counts, so there is a non-empty bucket either side.
+            distance = 1
+            lower = higher = -1
+            while lower < 0 and higher < 0:
+                if count + distance <= self._max_count and self._first[count + distance] is not None:
+                    higher = count + distance
+                elif count - distance >= self._min_count and self._first[count - distance] is not None:
+                    lower = count - distance
+                distance += 1
+            if higher >= 0:
+                lower = int(self._lower[higher])
+            else:
+                higher = int(self._higher[lower])
+        self._lower[count] = lower
+        self._higher[count] = higher
+        if lower >= 0:
+            self._higher[lower] = count
+        else:
+            self._min_count = count
+        if higher >= 0:
+            self._lower[higher] = count
+        else:
+            self._max_count = count
+
+    # Unlinks the bucket for the given count, which has just become empty.
+    def _unlink(self, count: int) -> None:
+        lower = int(self._lower[count])
+        higher = int(self._higher[count])
+        if lower >= 0:
+            self._higher[lower] = higher
+        else:
+            self._min_count = higher
+        if higher >= 0:
+            self._lower[higher] = lower
+        else:
+            self._max_count = lower
+
+    # Makes room for buckets up to at least the given count.
+    def _grow(self, count: int) -> None:
+        old_size = len(self._first)
+        size = max(count + 1, 2 * old_size)
+        first = Array(size)
+        last = Array(size)
+        lower = Array(size, numpy.int64)
+        higher = Array(size, numpy.int64)
+        first[:old_size] = self._first
+        last[:old_size] = self._last
+        lower[:old_size] = self._lower
+        higher[:old_size] = self._higher
+        self._first = first
+        self._last = last
+        self._lower = lower
+        self._higher = higher
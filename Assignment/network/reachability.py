@@ -0,0 +1,149 @@
+from .compact import CompactNetwork
+
+import numpy
+from typing import Tuple
+
+
+__all__ = [
+    "possible_connections",
+    "strongly_connected_components"
+]
+
+
+# Number of set bits in an int. (int.bit_count() is only available from Python 3.10.)
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+# Finds the strongly connected components of a directed graph in CSR form (the successors of node i
+# are indices[offsets[i]:offsets[i + 1]]), with an iterative version of Tarjan's algorithm.
+# Returns a tuple of (component count, component id of each node).
+# Components are numbered in reverse topological order: every edge between different components goes
+# from a higher id to a lower id.
+def strongly_connected_components(offsets: numpy.ndarray, indices: numpy.ndarray) -> Tuple[int, numpy.ndarray]:
+    node_count = offsets.size - 1
+    order = numpy.full(node_count, -1, dtype=numpy.int64)
+    low = numpy.zeros(node_count, dtype=numpy.int64)
+    component = numpy.full(node_count, -1, dtype=numpy.int64)
+    # Nodes visited but not yet assigned to a component.
+    stack = numpy.empty(node_count, dtype=numpy.int64)
+    stack_size = 0
+    # Depth first search path, with the position of the next edge to explore from each node on it.
+    path = numpy.empty(node_count, dtype=numpy.int64)
+    path_edges = numpy.empty(node_count, dtype=numpy.int64)
+    depth = 0
+    visit_count = 0
+    component_count = 0
+
+    for root in range(node_count):
+        if order[root] < 0:
+            order[root] = low[root] = visit_count
+            visit_count += 1
+            stack[stack_size] = root
+            stack_size += 1
+            path[0] = root
+            path_edges[0] = offsets[root]
+            depth = 1
+            while depth:
+                node = path[depth - 1]
+                edge = path_edges[depth - 1]
+                if edge < offsets[node + 1]:
+                    path_edges[depth - 1] = edge + 1
+                    successor = indices[edge]
+                    if order[successor] < 0:
+                        order[successor] = low[successor] = visit_count
+                        visit_count += 1
+                        stack[stack_size] = successor
+                        stack_size += 1
+                        path[depth] = successor
+                        path_edges[depth] = offsets[successor]
+                        depth += 1
+                    elif component[successor] < 0:
+                        # Successor is still on the stack, so is in the same component as node.
+                        low[node] = min(low[node], order[successor])
+                else:
+                    depth -= 1
+                    if low[node] == order[node]:
+                        # node is the root of a component: everything above it on the stack belongs to it.
+                        popped = -1
+                        while popped != node:
+                            stack_size -= 1
+                            popped = stack[stack_size]
+                            component[popped] = component_count
+                        component_count += 1
+                    if depth:
+                        parent = path[depth - 1]
+                        low[parent] = min(low[parent], low[node])
+    return component_count, component
+
+
+# Computes the maximum number of posts each person could end up liking, and people they could end up
+# following, through network evolution. Only the network's follows and posts are considered, not its likes.
+# A person can come to like every post made by anyone reachable from them via follows (except their own
+# posts), and follow everyone they already follow plus every reachable person who has made a post.
+# Works on the strongly connected components of the follow graph, since everyone in a component can reach
+# the same people. The reachable posts and posters of each component are found with a pass over the
+# components in reverse topological order, as bitsets merged from the components it follows.
+# Returns a tuple of (max liked posts, max following) arrays, indexed by the person ids of compact.
+def possible_connections(compact: CompactNetwork) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    person_count = compact.person_count
+    following_offsets = compact.following.offsets
+    following_indices = compact.following.indices
+    component_count, component = strongly_connected_components(following_offsets, following_indices)
+
+    # Posts are grouped by poster in person id order, so each person's posts have a contiguous range of ids.
+    post_counts = numpy.bincount(compact.poster, minlength=person_count)
+    post_starts = numpy.cumsum(post_counts) - post_counts
+    has_posts = post_counts > 0
+
+    # Component members, grouped by component.
+    members = numpy.argsort(component, kind="stable")
+    member_offsets = numpy.zeros(component_count + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(component, minlength=component_count), out=member_offsets[1:])
+
+    # Edges of the condensation (follows between different components), grouped by component.
+    followers = numpy.repeat(numpy.arange(person_count), numpy.diff(following_offsets))
+    sources = component[followers]
+    targets = component[following_indices]
+    external = sources != targets
+    keys = numpy.unique(sources[external] * max(component_count, 1) + targets[external])
+    successor_counts = numpy.bincount(keys // max(component_count, 1), minlength=component_count)
+    successors = keys % max(component_count, 1)
+    successor_offsets = numpy.zeros(component_count + 1, dtype=numpy.int64)
+    numpy.cumsum(successor_counts, out=successor_offsets[1:])
+    # Number of components yet to be processed that follow each component, so bitsets can be freed
+    # as soon as they are no longer needed.
+    remaining_predecessors = numpy.bincount(successors, minlength=component_count)
+
+    reachable_posts = numpy.zeros(component_count, dtype=numpy.int64)
+    reachable_posters = numpy.zeros(component_count, dtype=numpy.int64)
+    post_bits = numpy.empty(component_count, dtype=object)
+    poster_bits = numpy.empty(component_count, dtype=object)
+    # Successors always have lower ids, so are processed first.
+    for c in range(component_count):
+        posts = 0
+        posters = 0
+        for person in members[member_offsets[c]:member_offsets[c + 1]]:
+            if has_posts[person]:
+                posts |= ((1 << int(post_counts[person])) - 1) << int(post_starts[person])
+                posters |= 1 << int(person)
+        for successor in successors[successor_offsets[c]:successor_offsets[c + 1]]:
+            posts |= post_bits[successor]
+            posters |= poster_bits[successor]
+            remaining_predecessors[successor] -= 1
+            if not remaining_predecessors[successor]:
+                post_bits[successor] = poster_bits[successor] = None
+        reachable_posts[c] = _popcount(posts)
+        reachable_posters[c] = _popcount(posters)
+        if remaining_predecessors[c]:
+            post_bits[c] = posts
+            poster_bits[c] = posters
+
+    following_counts = numpy.diff(following_offsets)
+    followees_with_posts = numpy.bincount(followers, weights=has_posts[following_indices],
+                                          minlength=person_count).astype(numpy.int64)
+    max_likes = reachable_posts[component] - post_counts
+    # Everyone reachable is in the person's own component's reach, including the person themself and the
+    # people they already follow, which mustn't be counted twice.
+    max_following = following_counts + reachable_posters[component] - has_posts - followees_with_posts
+    return max_likes, max_following
@@ -1,22 +1,86 @@
+from .compact import CompactNetwork, SharedCompactArrays
 from .network import Person, Post, SocialNetwork
-from dsa import Array, SinglyLinkedList
+from dsa import Array, HashTable, SinglyLinkedList
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import numpy
 import random
-from typing import Tuple
+from typing import Optional, Tuple, Union
 
 
 __all__ = [
-    "evolve_network"
+    "evolve_network",
+    "EvolutionWorkers",
+    "TimestepChanges"
 ]
 
 
+# Offsets added to a pair's hash to get its like and follow decisions (see _pair_draws()): the first two steps
+# of SplitMix64's state, modulo 2 ** 64.
+_DECISION_STEPS = numpy.array((0x9E3779B97F4A7C15, 0x3C6EF372FE94F82A), dtype=numpy.uint64)
+
+
+# The likes and follows made by one timestep of network evolution, in the order they were applied.
+class TimestepChanges:
+    def __init__(self) -> None:
+        # (person, post liked) pairs.
+        self.likes: SinglyLinkedList[Tuple[Person, Post]] = SinglyLinkedList()
+        # (person, person followed) pairs.
+        self.follows: SinglyLinkedList[Tuple[Person, Person]] = SinglyLinkedList()
+
+
 # Evolves a network with the following rules:
 #   Each person "interacts" with the posts and liked posts of people they follow.
 #   For each post interacted with, there is a like_chance chance of the person liking that post,
 #   enhanced by the posts' clickbait factor.
 #   If the person likes the post, then there is a follow_chance chance of the person following the post's creator.
 # Returns a tuple of (total new likes, total new follows)
-def evolve_network(network: SocialNetwork, like_chance: float, follow_chance: float) -> Tuple[int, int]:
+# If the network uses the compact backend, the evolution runs against its CompactNetwork arrays.
+# rng: if given, the timestep's decisions come from it (seed it for reproducible results). A single key is drawn
+# for the timestep, and each candidate (person, post) pair's decisions are derived from the key and the pair
+# (see _pair_draws()), so they don't depend on which other pairs are considered: the object graph or the compact
+# backend, evolving everyone or incrementally, with any number of workers, all give exactly the same results for a
+# given seed. Otherwise the key comes from the random module, or with the object graph (and no workers or
+# incremental evolution), decisions are drawn one at a time from the random module.
+# workers: if >1, decisions are made by that many processes in parallel, using the network's CompactNetwork
+# arrays (whether or not the network uses the compact backend). The processes are started for this call only;
+# pass an EvolutionWorkers instead to keep them for a whole simulation.
+# changes: if given, the likes and follows made are recorded in it.
+# incremental: if true, only people whose neighbourhood changed last timestep, or who could still make
+# new likes or follows, are considered (using the network's CompactNetwork arrays, whether or not the
+# network uses the compact backend). Much faster once the network is close to saturation, with the same
+# results as evolving everyone.
+def evolve_network(network: SocialNetwork, like_chance: float, follow_chance: float,
+                   rng: Optional[numpy.random.Generator] = None,
+                   workers: Union[int, "EvolutionWorkers", None] = None,
+                   changes: Optional[TimestepChanges] = None, incremental: bool = False) -> Tuple[int, int]:
+    if not 0 <= like_chance <= 1.0:
+        raise ValueError(f"like_chance must be in the range [0, 1], but got {like_chance}.")
+    if not 0 <= follow_chance <= 1.0:
+        raise ValueError(f"follow_chance must be in the range [0, 1], but got {follow_chance}.")
+    if isinstance(workers, int) and workers < 1:
+        raise ValueError(f"workers must be >=1, but got {workers}.")
+
+    if changes is None:
+        # Saves checking whether to record changes everywhere.
+        changes = TimestepChanges()
+    if isinstance(workers, EvolutionWorkers) or (workers is not None and workers > 1):
+        res = _evolve_compact(network, like_chance, follow_chance, rng, changes, workers, incremental)
+    elif incremental:
+        res = _evolve_compact(network, like_chance, follow_chance, rng, changes, incremental=True)
+    elif network.compact_backend:
+        res = _evolve_compact(network, like_chance, follow_chance, rng, changes)
+    elif rng is not None:
+        res = _evolve_objects_batched(network, like_chance, follow_chance, rng, changes)
+    else:
+        res = _evolve_objects(network, like_chance, follow_chance, changes)
+    return res
+
+
+# Network evolution working directly on the Person and Post objects.
+def _evolve_objects(network: SocialNetwork, like_chance: float, follow_chance: float,
+                    changes: TimestepChanges) -> Tuple[int, int]:
     def interact(person: Person, post: Post, new_likes: SinglyLinkedList[Post],
                  new_follows: SinglyLinkedList[Person]) -> None:
         # Doesn't make sense for a person to interact with their own post via network evolution.
@@ -27,33 +91,27 @@ def evolve_network(network: SocialNetwork, like_chance: float, follow_chance: fl
                 if random.random() <= follow_chance:
                     new_follows.insert_last(post.poster)
 
-    if not 0 <= like_chance <= 1.0:
-        raise ValueError(f"like_chance must be in the range [0, 1], but got {like_chance}.")
-    if not 0 <= follow_chance <= 1.0:
-        raise ValueError(f"follow_chance must be in the range [0, 1], but got {follow_chance}.")
-
     # Don't want to actually change the network during an update, as that could change the outcome.
     # Therefore keep track of any new likes and follows and apply them all at the end.
-    changes = Array(network.person_count)
+    interactions = Array(network.person_count)
 
     for i, person in enumerate(network.people):
         new_likes: SinglyLinkedList[Post] = SinglyLinkedList()
         new_follows: SinglyLinkedList[Person] = SinglyLinkedList()
+        mark = network._new_mark()
         for following in person.following:
             for post in following.posts:
                 # Mark the post so it isn't interacted with again in this timestep by this person.
-                if post.__dict__.get("_last_interaction") is not person:
+                if post._mark != mark:
                     interact(person, post, new_likes, new_follows)
-                    post._last_interaction = person
+                    post._mark = mark
             for post in following.liked_posts:
-                if post.__dict__.get("_last_interaction") is not person:
+                if post._mark != mark:
                     interact(person, post, new_likes, new_follows)
-                    post._last_interaction = person
-        changes[i] = (person, new_likes, new_follows)
+                    post._mark = mark
+        interactions[i] = (person, new_likes, new_follows)
 
-    new_like_count = 0
-    new_follow_count = 0
-    for person, new_likes, new_follows in changes:
+    for person, new_likes, new_follows in interactions:
         for post in new_likes:
             try:
                 person.like_post(post)
@@ -61,7 +119,7 @@ def evolve_network(network: SocialNetwork, like_chance: float, follow_chance: fl
                 # Ignore if post is already liked.
                 pass
             else:
-                new_like_count += 1
+                changes.likes.insert_last((person, post))
 
         for person2 in new_follows:
             try:
@@ -70,12 +128,286 @@ def evolve_network(network: SocialNetwork, like_chance: float, follow_chance: fl
                 # Ignore if person is already following.
                 pass
             else:
-                new_follow_count += 1
+                changes.follows.insert_last((person, person2))
+
+    return len(changes.likes), len(changes.follows)
+
+
+# Network evolution working directly on the Person and Post objects, with the like and follow
+# decisions for all candidate (person, post) pairs drawn in one batch.
+# People and posts are numbered as in a CompactNetwork, and changes are made in the same order, so the results
+# are exactly the same as _evolve_compact() gives with the same rng.
+def _evolve_objects_batched(network: SocialNetwork, like_chance: float, follow_chance: float,
+                            rng: numpy.random.Generator, changes: TimestepChanges) -> Tuple[int, int]:
+    people = Array(network.people)
+    posts = Array(network.posts)
+    person_ids: HashTable[Person, int] = HashTable(capacity=max(len(people), 1))
+    for i, person in enumerate(people):
+        person_ids[person] = i
+    post_ids: HashTable[Post, int] = HashTable(capacity=max(len(posts), 1))
+    for i, post in enumerate(posts):
+        post_ids[post] = i
+
+    # Gather every distinct (person id, post id) pair that would be interacted with.
+    pairs: SinglyLinkedList[int] = SinglyLinkedList()
+    for i, person in enumerate(people):
+        mark = network._new_mark()
+        for following in person.following:
+            for post in chain(following.posts, following.liked_posts):
+                if post._mark != mark:
+                    if person is not post.poster:
+                        pairs.insert_last(i)
+                        pairs.insert_last(post_ids[post])
+                    post._mark = mark
+    pairs = numpy.fromiter(pairs, numpy.int64, len(pairs)).reshape(-1, 2)
+    # In the order CompactNetwork.candidate_pairs() gives.
+    pairs = pairs[numpy.lexsort((pairs[:, 1], pairs[:, 0]))]
+    pair_persons = pairs[:, 0]
+    pair_posts = pairs[:, 1]
 
-    for post in network.posts:
+    clickbait = numpy.fromiter((posts[i].clickbait_factor for i in pair_posts), numpy.float64, len(pair_posts))
+    draws = _pair_draws(_timestep_key(rng), pair_persons, pair_posts)
+    liked = draws[:, 0] <= like_chance * clickbait
+    followed = liked & (draws[:, 1] <= follow_chance)
+
+    for i, j in zip(pair_persons[liked], pair_posts[liked]):
+        person = people[i]
+        post = posts[j]
+        try:
+            person.like_post(post)
+        except ValueError:
+            # Ignore if post is already liked.
+            pass
+        else:
+            changes.likes.insert_last((person, post))
+
+    width = max(len(people), 1)
+    followees = numpy.fromiter((person_ids[posts[j].poster] for j in pair_posts[followed]), numpy.int64,
+                               int(followed.sum()))
+    for key in numpy.unique(pair_persons[followed] * width + followees):
+        person = people[key // width]
+        followee = people[key % width]
         try:
-            delattr(post, "_last_interaction")
-        except AttributeError:
+            person.follow(followee)
+        except ValueError:
+            # Ignore if person is already following.
             pass
+        else:
+            changes.follows.insert_last((person, followee))
+
+    return len(changes.likes), len(changes.follows)
+
+
+# Network evolution working on the network's CompactNetwork arrays.
+# Candidate (person, post) pairs are found with array operations, so only the random draws and
+# the changes that actually happen are handled one at a time.
+# With an EvolutionWorkers or workers > 1, the decisions are made in that many processes, each handling
+# a shard of the people.
+# If incremental, only the people in the CompactNetwork's frontier are considered, and the frontier is
+# updated for the next timestep.
+def _evolve_compact(network: SocialNetwork, like_chance: float, follow_chance: float,
+                    rng: Optional[numpy.random.Generator], changes: TimestepChanges,
+                    workers: Union[int, "EvolutionWorkers"] = 1, incremental: bool = False) -> Tuple[int, int]:
+    compact = network.compact_view
+    if incremental and compact.frontier is not None:
+        people = numpy.flatnonzero(compact.frontier)
+    else:
+        people = numpy.arange(compact.person_count)
+    key = _timestep_key(rng)
+    if isinstance(workers, EvolutionWorkers):
+        persons, posts, follow_persons, followees, unsettled = workers._decide(compact, people, like_chance,
+                                                                               follow_chance, key, incremental)
+    elif workers > 1:
+        with EvolutionWorkers(workers) as evolution_workers:
+            persons, posts, follow_persons, followees, unsettled = evolution_workers._decide(
+                compact, people, like_chance, follow_chance, key, incremental)
+    else:
+        persons, posts, follow_persons, followees, unsettled = _decide(compact, people, like_chance,
+                                                                       follow_chance, key, incremental)
+
+    compact.add_likes(persons, posts, network)
+    compact.add_follows(follow_persons, followees, network)
+    for person, post in zip(persons.tolist(), posts.tolist()):
+        changes.likes.insert_last((compact.people[person], compact.posts[post]))
+    for person, followee in zip(follow_persons.tolist(), followees.tolist()):
+        changes.follows.insert_last((compact.people[person], compact.people[followee]))
+    if incremental:
+        _update_frontier(compact, unsettled, persons, follow_persons)
+    else:
+        # Evolving everyone doesn't keep track of the frontier.
+        compact.frontier = None
+
+    return persons.size, follow_persons.size
+
+
+# Sets the frontier of people who might make new likes or follows in the next timestep, after some people
+# were evolved and made likes (liking person ids) and follows (following person ids).
+# Of the evolved people, those whose every candidate post is already liked, with its poster already
+# followed, can't change anything, and stay that way until their neighbourhood changes, which only
+# happens to the followers of people who liked posts, and to people who followed someone.
+# (Any other change to the network gives a new CompactNetwork, which has no frontier.)
+# unsettled: ids of the evolved people who aren't in that state, as found by _decide().
+def _update_frontier(compact: CompactNetwork, unsettled: numpy.ndarray, like_persons: numpy.ndarray,
+                     follow_persons: numpy.ndarray) -> None:
+    frontier = numpy.zeros(compact.person_count, dtype=bool)
+    frontier[unsettled] = True
+    _, followers = compact.followers.gather(numpy.unique(like_persons))
+    frontier[followers] = True
+    frontier[follow_persons] = True
+    compact.frontier = frontier
+
+
+# Decides the likes and follows made by the given people (ids in compact) this timestep.
+# Returns a tuple of (liking person ids, liked post ids, following person ids, followed person ids,
+# unsettled person ids), excluding likes and follows that already exist.
+# unsettled: if find_unsettled, the people who will still have a candidate post they don't like, or whose
+# poster they don't follow, once these likes and follows are made (see _update_frontier()). Otherwise None.
+# (Found from the same candidate pairs, since finding them is the most expensive step.)
+# key: the timestep's key for _pair_draws().
+def _decide(compact: CompactNetwork, people: numpy.ndarray, like_chance: float, follow_chance: float,
+            key: int, find_unsettled: bool = False) \
+        -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, Optional[numpy.ndarray]]:
+    persons, posts = compact.candidate_pairs(people)
+    pair_persons = persons
+    pair_posts = posts
+
+    draws = _pair_draws(key, persons, posts)
+    liked = draws[:, 0] <= like_chance * compact.clickbait[posts]
+    # As in _evolve_objects(), only liking a post gives a chance to follow its poster.
+    followed = liked & (draws[:, 1] <= follow_chance)
+    follow_persons = persons[followed]
+    followees = compact.poster[posts[followed]]
+    persons = persons[liked]
+    posts = posts[liked]
+
+    # Liking an already liked post or following an already followed person has no effect.
+    new = ~compact.likes.contains(persons, posts)
+    persons = persons[new]
+    posts = posts[new]
+    width = max(compact.person_count, 1)
+    keys = numpy.unique(follow_persons * width + followees)
+    follow_persons = keys // width
+    followees = keys % width
+    new = ~compact.following.contains(follow_persons, followees)
+
+    unsettled = None
+    if find_unsettled:
+        pair_posters = compact.poster[pair_posts]
+        liked_after = compact.likes.contains(pair_persons, pair_posts)
+        liked_after[liked] = True
+        followed_after = compact.following.contains(pair_persons, pair_posters)
+        followed_after |= numpy.isin(pair_persons * width + pair_posters, keys)
+        unsettled = numpy.unique(pair_persons[~(liked_after & followed_after)])
+    return persons, posts, follow_persons[new], followees[new], unsettled
+
+
+# Worker processes for sharded network evolution, kept between timesteps so that they are only started once.
+# The workers read the network's CompactNetwork arrays from shared memory, which is only rewritten when the
+# network has changed, and only reallocated when the arrays outgrow it.
+# Use as a context manager, or call close() when done.
+class EvolutionWorkers:
+    # count: number of worker processes.
+    def __init__(self, count: int) -> None:
+        if count < 1:
+            raise ValueError(f"count must be >=1, but got {count}.")
+        self._count = count
+        self._executor = ProcessPoolExecutor(count)
+        self._shared: Optional[SharedCompactArrays] = None
+        # The CompactNetwork, and its version, last copied to the shared memory.
+        self._shared_compact: Optional[CompactNetwork] = None
+        self._shared_version = None
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    # Stops the worker processes and frees the shared memory.
+    def close(self) -> None:
+        self._executor.shutdown()
+        if self._shared is not None:
+            self._shared.close()
+            self._shared.unlink()
+            self._shared = None
+            self._shared_compact = None
+
+    def __enter__(self) -> "EvolutionWorkers":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    # Like _decide(), but split into shards of people processed in parallel.
+    # Each pair's decisions only depend on the key and the pair, so the result doesn't depend on the worker count.
+    def _decide(self, compact: CompactNetwork, people: numpy.ndarray, like_chance: float, follow_chance: float,
+                key: int, find_unsettled: bool = False) \
+            -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, Optional[numpy.ndarray]]:
+        shards = numpy.array_split(people, self._count)
+        shared = self._share(compact)
+
+        futures = Array(self._count)
+        for i in range(self._count):
+            futures[i] = self._executor.submit(_decide_shard, shared, shards[i], like_chance, follow_chance,
+                                               key, find_unsettled)
+        # Merge in shard order, so the result doesn't depend on which worker finishes first.
+        results = Array(self._count)
+        for i, future in enumerate(futures):
+            results[i] = future.result()
+        res = tuple(numpy.concatenate(tuple(result[i] for result in results)) for i in range(4))
+        if find_unsettled:
+            unsettled = numpy.concatenate(tuple(result[4] for result in results))
+        else:
+            unsettled = None
+        return res + (unsettled,)
+
+    # Returns the shared memory copy of compact's arrays, bringing it up to date first if needed.
+    def _share(self, compact: CompactNetwork) -> SharedCompactArrays:
+        if compact is not self._shared_compact or compact._version != self._shared_version:
+            if self._shared is None or not self._shared.update(compact):
+                if self._shared is not None:
+                    self._shared.close()
+                    self._shared.unlink()
+                # Leaves room for the likes and follows of later timesteps.
+                self._shared = SharedCompactArrays(compact, headroom=2.0)
+            self._shared_compact = compact
+            self._shared_version = compact._version
+        return self._shared
+
+
+# Worker process task for EvolutionWorkers._decide(): decides for the given people (ids in the network).
+def _decide_shard(shared: SharedCompactArrays, people: numpy.ndarray, like_chance: float, follow_chance: float,
+                  key: int, find_unsettled: bool) \
+        -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, Optional[numpy.ndarray]]:
+    compact = shared.attach()
+    res = _decide(compact, people, like_chance, follow_chance, key, find_unsettled)
+    # All views of the shared memory must be gone before detaching.
+    del compact
+    shared.close()
+    return res
+
+
+# Returns a key for _pair_draws() for one timestep, taken from rng if given, otherwise from the random module.
+def _timestep_key(rng: Optional[numpy.random.Generator]) -> int:
+    if rng is None:
+        key = random.getrandbits(64)
+    else:
+        key = int(rng.integers(2 ** 64, dtype=numpy.uint64))
+    return key
+
+
+# Returns a (count, 2) array of uniform draws in [0, 1): the like and follow decisions for the candidate pairs
+# (persons[i], posts[i]) (ids in a CompactNetwork).
+# Each draw is a hash of the key, the pair and which decision it is, so is the same whenever that pair is
+# considered with that key, whatever other pairs are considered alongside it. (The hash is SplitMix64's
+# finaliser, which gives uniform, independent-looking outputs for distinct inputs.)
+def _pair_draws(key: int, persons: numpy.ndarray, posts: numpy.ndarray) -> numpy.ndarray:
+    pairs = _mix64(_mix64(persons.astype(numpy.uint64) + numpy.uint64(key)) ^ posts.astype(numpy.uint64))
+    bits = _mix64(pairs[:, numpy.newaxis] + _DECISION_STEPS)
+    # The top 53 bits, as a float in [0, 1).
+    return (bits >> numpy.uint64(11)) * 2.0 ** -53
+
 
-    return new_like_count, new_follow_count
+# SplitMix64's finaliser, applied elementwise. (Wraps around on overflow, as intended.)
+def _mix64(x: numpy.ndarray) -> numpy.ndarray:
+    x = (x ^ (x >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+    return x ^ (x >> numpy.uint64(31))
@@ -0,0 +1,240 @@
+from .network import Person, Post, SocialNetwork
+from dsa import Array, HashTable
+
+import numpy
+from numpy.lib import format as npy_format
+from typing import Any, BinaryIO, Callable, Tuple
+
+
+__all__ = [
+    "load_snapshot",
+    "save_snapshot",
+    "Snapshot",
+    "SNAPSHOT_VERSION"
+]
+
+
+SNAPSHOT_MAGIC = b"DSANET\x00\x00"
+
+# Incremented whenever the layout of snapshot files changes.
+SNAPSHOT_VERSION = 1
+
+# Each array in a snapshot file starts on a multiple of this many bytes, so that memory mapped
+# arrays are aligned.
+_ALIGNMENT = 64
+
+# Names of the arrays in a snapshot file, in the order they are stored.
+# Strings are stored as UTF-8 bytes concatenated together, with offsets marking where each one starts.
+_ARRAY_NAMES = (
+    "person_ids",           # uint64, id of each person.
+    "name_offsets",         # int64, name of person i is name_bytes[name_offsets[i]:name_offsets[i + 1]].
+    "name_bytes",           # uint8
+    "follows",              # int64 (follow count, 2), (follower, followee) person indices.
+    "post_posters",         # int64, person index of each post's poster.
+    "post_ids",             # uint64
+    "post_clickbait",       # int64
+    "text_offsets",         # int64, text of post i is text_bytes[text_offsets[i]:text_offsets[i + 1]].
+    "text_bytes",           # uint8
+    "likes"                 # int64 (like count, 2), (person index, post index), grouped by post in the order
+                            # each post's likes were made.
+)
+
+
+# Columnar, read-only view of a network snapshot file.
+# The arrays are memory mapped, so opening a snapshot is fast regardless of its size, and data
+# is only read from disk when used. (Except by to_network(), which reads all of it.)
+class Snapshot:
+    # Raises ValueError if the file is not a snapshot of a supported version.
+    def __init__(self, file_path: str) -> None:
+        self._arrays = Array(len(_ARRAY_NAMES))
+        with open(file_path, "rb") as file:
+            if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError("File is not a network snapshot.")
+            version_bytes = file.read(4)
+            if len(version_bytes) != 4:
+                raise ValueError("Snapshot file is truncated.")
+            version = int(numpy.frombuffer(version_bytes, numpy.uint32)[0])
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION}).")
+            for i in range(len(_ARRAY_NAMES)):
+                _skip_padding(file)
+                npy_format.read_magic(file)
+                shape, fortran_order, dtype = npy_format.read_array_header_1_0(file)
+                size = int(numpy.prod(shape))
+                if size:
+                    self._arrays[i] = numpy.memmap(file_path, dtype, "r", file.tell(), shape)
+                else:
+                    self._arrays[i] = numpy.empty(shape, dtype)
+                file.seek(size * dtype.itemsize, 1)
+
+    @property
+    def person_count(self) -> int:
+        return self.person_ids.size
+
+    @property
+    def post_count(self) -> int:
+        return self.post_ids.size
+
+    @property
+    def person_ids(self) -> numpy.ndarray:
+        return self._arrays[0]
+
+    @property
+    def follows(self) -> numpy.ndarray:
+        return self._arrays[3]
+
+    @property
+    def post_posters(self) -> numpy.ndarray:
+        return self._arrays[4]
+
+    @property
+    def post_ids(self) -> numpy.ndarray:
+        return self._arrays[5]
+
+    @property
+    def post_clickbait(self) -> numpy.ndarray:
+        return self._arrays[6]
+
+    @property
+    def likes(self) -> numpy.ndarray:
+        return self._arrays[9]
+
+    # Name of the person with index i.
+    def name(self, i: int) -> str:
+        return _string(self._arrays[1], self._arrays[2], i)
+
+    # Text of the post with index i.
+    def text(self, i: int) -> str:
+        return _string(self._arrays[7], self._arrays[8], i)
+
+    # Creates a network from the snapshot. Every person, post, follow and like is created up front, so this takes
+    # time proportional to the size of the snapshot.
+    # network_args: arguments for the SocialNetwork constructor (expected_posts defaults to the post count).
+    # Raises ValueError if the arrays are inconsistent, e.g. an index is out of range.
+    def to_network(self, **network_args) -> SocialNetwork:
+        self._check()
+        network_args.setdefault("expected_posts", self.post_count)
+        names = Array(self.person_count)
+        for i in range(self.person_count):
+            names[i] = self.name(i)
+        network = SocialNetwork.from_edges(names, numpy.asarray(self.follows), ids=self.person_ids,
+                                           **network_args)
+        people = Array(self.person_count)
+        for i, name in enumerate(names):
+            people[i] = network.find_person(name)
+
+        posts = Array(self.post_count)
+        for i, (poster, id, clickbait_factor) in enumerate(zip(self.post_posters, self.post_ids,
+                                                              self.post_clickbait)):
+            posts[i] = Post(people[poster], int(id), self.text(i), int(clickbait_factor))
+            people[poster]._posts.insert_last(posts[i])
+
+        liked_counts = numpy.bincount(self.likes[:, 0], minlength=self.person_count)
+        for person, count in zip(people, liked_counts):
+            person._liked_posts.reserve(int(count))
+        like_counts = numpy.bincount(self.likes[:, 1], minlength=self.post_count)
+        for post, count in zip(posts, like_counts):
+            post._liked_by.reserve(int(count))
+        # Likes are stored in the order they were made, so adding them in order keeps each post's likes in order.
+        for person, post in self.likes:
+            people[person]._liked_posts.add(posts[post])
+            posts[post]._liked_by.add(people[person])
+        network._like_count = len(self.likes)
+        for post in posts:
+            if post.like_count:
+                network._post_ranking.move(post, 0, post.like_count)
+        network._version += 1
+        return network
+
+    # Raises ValueError if the arrays don't fit together, so that a corrupt file can't create a broken network.
+    # (In particular, NumPy would accept negative indices.)
+    def _check(self) -> None:
+        people = self.person_count
+        posts = self.post_count
+        valid = (self.person_ids.ndim == 1
+                 and _valid_offsets(self._arrays[1], self._arrays[2], people)
+                 and _valid_pairs(self.follows, people, people)
+                 and self.post_posters.shape == (posts,) and _valid_indices(self.post_posters, people)
+                 and self.post_clickbait.shape == (posts,)
+                 and _valid_offsets(self._arrays[7], self._arrays[8], posts)
+                 and _valid_pairs(self.likes, people, posts))
+        if not valid:
+            raise ValueError("Snapshot file is corrupt.")
+
+
+# Writes a snapshot of a network to a file.
+def save_snapshot(network: SocialNetwork, file_path: str) -> None:
+    compact = network.compact_view
+    person_count = compact.person_count
+    following_counts = numpy.diff(compact.following.offsets)
+    person_indices: HashTable[Person, int] = HashTable(capacity=max(person_count, 1))
+    for i, person in enumerate(compact.people):
+        person_indices[person] = i
+    like_counts = numpy.fromiter((post.like_count for post in compact.posts), numpy.int64, compact.post_count)
+    likers = numpy.fromiter((person_indices[person] for post in compact.posts for person in post.liked_by),
+                            numpy.int64, network.like_count)
+    name_offsets, name_bytes = _pack_strings(compact.people, lambda p: p.name)
+    text_offsets, text_bytes = _pack_strings(compact.posts, lambda p: p.text)
+    arrays = (
+        numpy.fromiter((person._id for person in compact.people), numpy.uint64, person_count),
+        name_offsets,
+        name_bytes,
+        numpy.column_stack((numpy.repeat(numpy.arange(person_count), following_counts), compact.following.indices)),
+        compact.poster,
+        numpy.fromiter((post._id for post in compact.posts), numpy.uint64, compact.post_count),
+        numpy.fromiter((post.clickbait_factor for post in compact.posts), numpy.int64, compact.post_count),
+        text_offsets,
+        text_bytes,
+        numpy.column_stack((likers, numpy.repeat(numpy.arange(compact.post_count), like_counts)))
+    )
+    with open(file_path, "wb") as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(numpy.uint32(SNAPSHOT_VERSION).tobytes())
+        for array in arrays:
+            file.write(bytes(-file.tell() % _ALIGNMENT))
+            npy_format.write_array(file, numpy.ascontiguousarray(array), version=(1, 0))
+
+
+# Reads a network from a snapshot file.
+# network_args: arguments for the SocialNetwork constructor.
+# Raises ValueError if the file is not a snapshot of a supported version.
+def load_snapshot(file_path: str, **network_args) -> SocialNetwork:
+    return Snapshot(file_path).to_network(**network_args)
+
+
+# Returns a tuple of (offsets, UTF-8 bytes) of the strings key(item) for each item, stored back to back.
+def _pack_strings(items: Array, key: Callable[[Any], str]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    encoded = Array(len(items))
+    for i, item in enumerate(items):
+        encoded[i] = key(item).encode()
+    offsets = numpy.zeros(len(encoded) + 1, numpy.int64)
+    numpy.cumsum(numpy.fromiter(map(len, encoded), numpy.int64, len(encoded)), out=offsets[1:])
+    return offsets, numpy.frombuffer(b"".join(encoded), numpy.uint8)
+
+
+# Returns whether indices are integers in the range [0, size).
+def _valid_indices(indices: numpy.ndarray, size: int) -> bool:
+    return numpy.issubdtype(indices.dtype, numpy.integer) and (
+        not indices.size or (int(indices.min()) >= 0 and int(indices.max()) < size))
+
+
+# Returns whether pairs is an array of (index, index) rows, with the indices in each column in the range
+# [0, size) for that column.
+def _valid_pairs(pairs: numpy.ndarray, first_size: int, second_size: int) -> bool:
+    return (pairs.ndim == 2 and pairs.shape[1] == 2 and _valid_indices(pairs[:, 0], first_size)
+            and _valid_indices(pairs[:, 1], second_size))
+
+
+# Returns whether offsets mark out count strings, back to back, covering all of data.
+def _valid_offsets(offsets: numpy.ndarray, data: numpy.ndarray, count: int) -> bool:
+    return (offsets.shape == (count + 1,) and data.ndim == 1 and numpy.issubdtype(offsets.dtype, numpy.integer)
+            and offsets[0] == 0 and offsets[-1] == data.size and bool(numpy.all(numpy.diff(offsets) >= 0)))
+
+
+def _string(offsets: numpy.ndarray, data: numpy.ndarray, i: int) -> str:
+    return bytes(data[offsets[i]:offsets[i + 1]]).decode()
+
+
+# Moves a file to the start of the next aligned array.
+def _skip_padding(file: BinaryIO) -> None:
+    file.seek(-file.tell() % _ALIGNMENT, 1)
@@ -1,124 +1,687 @@
+from .interning import NAME_CACHE_SIZE, NameInterner
 from .network import Person, Post, SocialNetwork
-from dsa import Array, mergesort, Set
+from common import fnv1a_hash_spans, SizedIterable
+from dsa import Array, SinglyLinkedList
 
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
+from itertools import islice, takewhile
+import mmap
+import numpy
+import os
+from typing import BinaryIO, Hashable, Iterable, Iterator, Optional, Tuple, Union
 
 
 __all__ = [
+    "FileWorkers",
     "people_by_popularity",
     "posts_by_popularity",
     "read_event_file",
-    "read_network_file"
+    "read_network_file",
+    "top_people",
+    "top_posts"
 ]
 
 
 # Creates a network from a network file.
-def read_network_file(file_path: str, **network_args) -> SocialNetwork:
-    with open(file_path) as file:
-        lines = file.readlines()
-
-    # Note: allowed to use List for readlines().
-    split_lines: Array[List[str]] = Array(len(lines))
-    for i in range(len(split_lines)):
-        line = lines[i].rstrip("\n")
-        cols = line.split(":")
-        if not line or len(cols) not in (1, 2):
-            raise ValueError(f"line {i + 1} has invalid format.")
-        split_lines[i] = cols
-
-    # Pre-scan file to get number of people.
-    names = Set()
-    for i, columns in enumerate(split_lines, 1):
-        if len(columns) == 1:
-            name = columns[0]
-            if not name or name.isspace():
-                raise ValueError(f"line {i}: name cannot be blank or whitespace.")
-            names.add(name)
+# The file is memory mapped and its lines and columns are found with NumPy on the raw bytes, so the file is
+# never held as Python strings. Only people's names are decoded; follow lines are matched to people with NumPy,
+# by the hashes of their bytes.
+# (Splitting UTF-8 on b"\n" and b":" is exact, since those bytes never occur within multi-byte characters.)
+# workers: a FileWorkers to parse the file with, or the number of processes to start for this call only.
+# If >1 processes, the file is parsed with FileWorkers._parse_network_file(). The network is the same either way.
+def read_network_file(file_path: str, workers: Union[int, "FileWorkers", None] = None,
+                      **network_args) -> SocialNetwork:
+    if isinstance(workers, int) and workers < 1:
+        raise ValueError(f"workers must be >=1, but got {workers}.")
+    with open(file_path, "rb") as file:
+        # Empty files can't be memory mapped.
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if isinstance(workers, FileWorkers):
+                    network = workers._parse_network_file(file_path, data, network_args)
+                elif workers is not None and workers > 1:
+                    with FileWorkers(workers) as temporary_workers:
+                        network = temporary_workers._parse_network_file(file_path, data, network_args)
+                else:
+                    network = _parse_network_file(data, network_args)
+        else:
+            network = _parse_network_file(b"", network_args)
+    return network
+
+
+# Creates a network from the contents of a network file.
+def _parse_network_file(data, network_args) -> SocialNetwork:
+    starts, ends, colons = _split_lines(data)
+    _check_line_format(starts, ends, colons, 1)
+
+    # Pre-scan file to get the people, each given a handle (their index in the network's names).
+    person_names, blank_line = _scan_people(data, starts, ends, colons, 1)
+    _check_blank_name(blank_line)
+    # Follows are matched to people with NumPy, by the hashes of their names.
+    resolved = _resolve_hashed_names(data, starts, ends, colons, *_hash_names(data, starts, ends, colons))
+    if resolved is None:
+        # Different names have the same hash, so match them by name instead.
+        names = _intern_names(person_names, len(person_names))
+        resolved = (_interned_names(names), _follow_handles(data, starts, ends, colons, names))
+    person_names, follows = resolved
+    try:
+        network = SocialNetwork.from_edges(person_names, follows, **network_args)
+    except ValueError:
+        # Build the network again incrementally to find which line is invalid.
+        follow_lines = numpy.flatnonzero(colons >= 0)
+        follow_columns = ((i + 1, data[starts[i]:colons[i]].decode(), data[colons[i] + 1:ends[i]].decode())
+                          for i in follow_lines)
+        network = _build_network(person_names, follow_columns, network_args)
+    return network
+
+
+# A pool of worker processes for parsing network and event files, which can be kept for many files.
+class FileWorkers:
+    # count: number of worker processes.
+    def __init__(self, count: int) -> None:
+        if count < 1:
+            raise ValueError(f"count must be >=1, but got {count}.")
+        self._count = count
+        self._executor = ProcessPoolExecutor(count)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    # Stops the worker processes.
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "FileWorkers":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    # Like _parse_network_file(), but the file is split into a range of lines per worker, whose lines are found
+    # and names hashed in parallel. The main process then matches the follows to people by hash with NumPy, so
+    # only people's names are ever decoded, once each. Errors are reported for the same line as with
+    # _parse_network_file().
+    def _parse_network_file(self, file_path: str, data, network_args) -> SocialNetwork:
+        bounds, first_lines = _line_ranges(data, self._count)
+        futures = Array(self._count)
+        for i in range(self._count):
+            futures[i] = self._executor.submit(_scan_network_range, file_path, int(bounds[i]), int(bounds[i + 1]),
+                                               int(first_lines[i]))
+        # All format errors come before any blank name error, as with _parse_network_file().
+        results = Array(self._count)
+        for i, future in enumerate(futures):
+            results[i] = future.result()
+        for result in results:
+            _check_blank_name(result[5])
+        starts, ends, colons, hashes1, hashes2 = (numpy.concatenate(tuple(result[i] for result in results))
+                                                  for i in range(5))
+
+        resolved = _resolve_hashed_names(data, starts, ends, colons, hashes1, hashes2)
+        if resolved is None:
+            # Different names have the same hash, so match them by name instead.
+            network = _parse_network_file(data, network_args)
+        else:
+            person_names, follows = resolved
+            try:
+                network = SocialNetwork.from_edges(person_names, follows, **network_args)
+            except ValueError:
+                # Parse the file again without workers to find which line is invalid.
+                network = _parse_network_file(data, network_args)
+        return network
+
+    # Like _parse_events() for a whole event file, but the file is split into ranges of lines of about range_size
+    # bytes, parsed by the workers. Only 2 ranges per worker are parsed ahead of the events being used, so the
+    # file is still streamed. Events are produced in file order, up to the first invalid line.
+    def _parse_events(self, file_path: str, file: BinaryIO, range_size: int) -> Iterator[Tuple[int, str, Tuple]]:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ranges = _stream_line_ranges(data, range_size)
+            pending = SinglyLinkedList()
+            for start, stop, first_line in islice(ranges, 2 * self._count):
+                pending.insert_last(self._executor.submit(_parse_event_range, file_path, start, stop, first_line))
+            error = None
+            try:
+                # Ranges after an invalid line are never applied.
+                while pending and error is None:
+                    events, error = pending.peek_first().result()
+                    pending.remove_first()
+                    for start, stop, first_line in islice(ranges, 1 if error is None else 0):
+                        pending.insert_last(self._executor.submit(_parse_event_range, file_path, start, stop,
+                                                                  first_line))
+                    yield from events
+            finally:
+                for future in pending:
+                    future.cancel()
+        if error is not None:
+            raise error
+
+
+# Worker process task for FileWorkers._parse_network_file(): checks the format of the lines in bytes
+# [start, stop) of a network file, and hashes the names in them with fnv1a_hash_spans().
+# Returns a tuple of (start offsets, end offsets, colon offsets (as from _split_lines()), hash of each person's
+# name or followee's name, hash of each follower's name, line number of the first blank or whitespace name or
+# None). Offsets are in the whole file.
+def _scan_network_range(file_path: str, start: int, stop: int, first_line: int) \
+        -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, Optional[int]]:
+    data = _read_range(file_path, start, stop)
+    starts, ends, colons = _split_lines(data)
+    _check_line_format(starts, ends, colons, first_line)
+    _, blank_line = _scan_people(data, starts, ends, colons, first_line)
+    hashes1, hashes2 = _hash_names(data, starts, ends, colons)
+    return starts + start, ends + start, numpy.where(colons >= 0, colons + start, colons), hashes1, hashes2, \
+        blank_line
+
+
+# Hashes the names in lines found by _split_lines() with fnv1a_hash_spans().
+# Returns a tuple of (hash of each person's name or followee's name, hash of each follower's name).
+def _hash_names(data, starts: numpy.ndarray, ends: numpy.ndarray, colons: numpy.ndarray) \
+        -> Tuple[numpy.ndarray, numpy.ndarray]:
+    view = numpy.frombuffer(data, dtype=numpy.uint8)
+    follow = colons >= 0
+    # "A:B" means B follows A. Person lines have an empty follower name.
+    hashes1 = fnv1a_hash_spans(view, starts, numpy.where(follow, colons, ends))
+    hashes2 = fnv1a_hash_spans(view, numpy.where(follow, colons + 1, ends), ends)
+    return hashes1, hashes2
+
+
+# Finds the people and follows of a network file from the lines found by _split_lines() and names hashed by
+# _hash_names(). Hash matches are checked against the names' bytes, so are exact.
+# Returns a tuple of (distinct names in order of first appearance, (count, 2) array of the (follower, followee)
+# handles (indices of the names) of the follows, with -1 for names that aren't people), or None if different
+# people's names have the same hash.
+def _resolve_hashed_names(data, starts: numpy.ndarray, ends: numpy.ndarray, colons: numpy.ndarray,
+                          hashes1: numpy.ndarray, hashes2: numpy.ndarray) \
+        -> Optional[Tuple[Array[str], numpy.ndarray]]:
+    # Only copies of parts of the view are kept, so no view of data outlives this function (a memory map can't
+    # be closed while it is viewed).
+    view = numpy.frombuffer(data, dtype=numpy.uint8)
+    person_lines = numpy.flatnonzero(colons == -1)
+    person_starts = starts[person_lines]
+    person_ends = ends[person_lines]
+
+    # Group people's lines by hash. The stable sort puts each group's first line in the file first.
+    order = numpy.argsort(hashes1[person_lines], kind="stable")
+    sorted_hashes = hashes1[person_lines][order]
+    group_starts = numpy.ones(order.size, dtype=bool)
+    group_starts[1:] = sorted_hashes[1:] != sorted_hashes[:-1]
+    groups = numpy.cumsum(group_starts) - 1
+    # Distinct hashes, ascending, and the index (into person_lines) of the first line with each.
+    hashes = sorted_hashes[group_starts]
+    firsts = order[group_starts]
+
+    res = None
+    if numpy.all(_spans_equal(view, person_starts[order], person_ends[order], person_starts[firsts[groups]],
+                              person_ends[firsts[groups]])):
+        # Handles in order of first appearance.
+        first_order = numpy.argsort(firsts)
+        handles = numpy.empty(firsts.size, dtype=numpy.int64)
+        handles[first_order] = numpy.arange(firsts.size)
+        person_names = Array(firsts.size)
+        for handle, i in enumerate(firsts[first_order]):
+            person_names[handle] = data[person_starts[i]:person_ends[i]].decode()
+
+        # Returns the handles of the names in spans [name_starts, name_ends) with the given hashes.
+        def find(name_hashes: numpy.ndarray, name_starts: numpy.ndarray, name_ends: numpy.ndarray) \
+                -> numpy.ndarray:
+            found = numpy.full(name_hashes.size, -1, dtype=numpy.int64)
+            if hashes.size:
+                matches = numpy.minimum(numpy.searchsorted(hashes, name_hashes), hashes.size - 1)
+                lines = firsts[matches]
+                same = (hashes[matches] == name_hashes) & _spans_equal(view, name_starts, name_ends,
+                                                                       person_starts[lines], person_ends[lines])
+                found[same] = handles[matches[same]]
+            return found
+
+        follow_lines = numpy.flatnonzero(colons >= 0)
+        follow_starts = starts[follow_lines]
+        follow_ends = ends[follow_lines]
+        follow_colons = colons[follow_lines]
+        followers = find(hashes2[follow_lines], follow_colons + 1, follow_ends)
+        followees = find(hashes1[follow_lines], follow_starts, follow_colons)
+        res = (person_names, numpy.column_stack((followers, followees)))
+    return res
+
+
+# Returns a bool array of whether each span [starts1[i], ends1[i]) of a uint8 array has the same bytes as span
+# [starts2[i], ends2[i]).
+def _spans_equal(data: numpy.ndarray, starts1: numpy.ndarray, ends1: numpy.ndarray, starts2: numpy.ndarray,
+                 ends2: numpy.ndarray) -> numpy.ndarray:
+    lengths = ends1 - starts1
+    res = lengths == ends2 - starts2
+    width = int(lengths.max()) if lengths.size else 0
+    for j in range(width):
+        # Spans shorter than j + 1 bytes are finished.
+        active = numpy.flatnonzero(res & (lengths > j))
+        res[active] = data[starts1[active] + j] == data[starts2[active] + j]
+    return res
+
+
+# Returns bytes [start, stop) of a file.
+def _read_range(file_path: str, start: int, stop: int) -> bytes:
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        return file.read(stop - start)
+
+
+# Splits the contents of a file into count ranges of whole lines, of roughly equal size (some may be empty).
+# Returns a tuple of (bounds, first line numbers): range i is bytes [bounds[i], bounds[i + 1]), and its first
+# line is line first_lines[i] of the file.
+def _line_ranges(data, count: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    size = len(data)
+    bounds = numpy.linspace(0, size, count + 1).astype(numpy.int64)
+    for i in range(1, count):
+        # Move the boundary to the start of the next line (no earlier than the previous boundary).
+        newline = data.find(b"\n", max(int(bounds[i]) - 1, int(bounds[i - 1]) - 1, 0))
+        bounds[i] = size if newline < 0 else newline + 1
+
+    view = numpy.frombuffer(data, dtype=numpy.uint8)
+    first_lines = numpy.ones(count, dtype=numpy.int64)
+    for i in range(1, count):
+        # Every range but the last ends with a newline, so contains as many lines as newlines.
+        first_lines[i] = first_lines[i - 1] + numpy.count_nonzero(view[bounds[i - 1]:bounds[i]] == ord("\n"))
+    # A memory map can't be closed while it is viewed.
+    del view
+    return bounds, first_lines
+
+
+# Splits the contents of a file into ranges of whole lines, of about size bytes each (at least 1 line).
+# Iterates tuples of (start, stop, first line number): each range is bytes [start, stop), and its first line is
+# that line of the file. Only one range of the contents is read at a time.
+def _stream_line_ranges(data, size: int) -> Iterator[Tuple[int, int, int]]:
+    start = 0
+    first_line = 1
+    while start < len(data):
+        newline = data.find(b"\n", start + max(size, 1) - 1)
+        stop = len(data) if newline < 0 else newline + 1
+        yield start, stop, first_line
+        first_line += data[start:stop].count(b"\n")
+        start = stop
+
+
+# Raises ValueError if any of the lines found by _split_lines() isn't a name or a follow.
+# first_line: the line number of the first line.
+def _check_line_format(starts: numpy.ndarray, ends: numpy.ndarray, colons: numpy.ndarray, first_line: int) -> None:
+    invalid = numpy.flatnonzero((starts == ends) | (colons == -2))
+    if invalid.size:
+        raise ValueError(f"line {invalid[0] + first_line} has invalid format.")
+
+
+# Decodes the names of the people in lines found by _split_lines(), in file order (including repeats).
+# Returns a tuple of (names, line number of the first blank or whitespace name, or None if there isn't one).
+# first_line: the line number of the first line.
+def _scan_people(data, starts: numpy.ndarray, ends: numpy.ndarray, colons: numpy.ndarray, first_line: int) \
+        -> Tuple[Array[str], Optional[int]]:
+    person_lines = numpy.flatnonzero(colons == -1)
+    names = Array(person_lines.size)
+    blank_line = None
+    for j, i in enumerate(person_lines):
+        names[j] = data[starts[i]:ends[i]].decode()
+        if blank_line is None and names[j].isspace():
+            blank_line = int(i) + first_line
+    return names, blank_line
+
+
+def _check_blank_name(blank_line: Optional[int]) -> None:
+    if blank_line is not None:
+        raise ValueError(f"line {blank_line}: name cannot be blank or whitespace.")
+
+
+# Returns an interner giving each distinct name a handle, in order of first appearance.
+# Names are interned as bytes (so lines can be matched without decoding them), with the name in their slot.
+# capacity: expected number of distinct names.
+def _intern_names(names: Iterable[str], capacity: Optional[int] = None) -> NameInterner:
+    interner = NameInterner(capacity)
+    for name in names:
+        interner.put(interner.intern(name.encode()), name)
+    return interner
+
+
+# Returns the names interned by _intern_names(), indexed by handle.
+def _interned_names(names: NameInterner) -> Array[str]:
+    res = Array(len(names))
+    for handle in range(len(names)):
+        res[handle] = names.get(handle)
+    return res
+
 
+# Returns a (count, 2) array of the (follower, followee) handles of the follows in lines found by _split_lines().
+# Names that aren't people get -1, which from_edges rejects.
+def _follow_handles(data, starts: numpy.ndarray, ends: numpy.ndarray, colons: numpy.ndarray,
+                    names: NameInterner) -> numpy.ndarray:
+    follow_lines = numpy.flatnonzero(colons >= 0)
+    followers = Array(follow_lines.size, numpy.int64)
+    followees = Array(follow_lines.size, numpy.int64)
+    find = lru_cache(NAME_CACHE_SIZE)(partial(_handle_or_missing, names))
+    for j, i in enumerate(follow_lines):
+        # "A:B" means B follows A.
+        followers[j] = find(data[colons[i] + 1:ends[i]])
+        followees[j] = find(data[starts[i]:colons[i]])
+    return numpy.stack((followers, followees), axis=1)
+
+
+# Finds the lines of a file's contents, without their line endings ("\n" or "\r\n").
+# Returns a tuple of (start offsets, end offsets, colon offsets) arrays with an element per line. The colon
+# offset is -1 if the line has no colon, or -2 if it has more than one.
+def _split_lines(data) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    # Only offsets are returned, so no view of data outlives this function (a memory map can't be closed
+    # while it is viewed).
+    data = numpy.frombuffer(data, dtype=numpy.uint8)
+    newlines = numpy.flatnonzero(data == ord("\n"))
+    # A final line without a newline is still a line.
+    line_count = newlines.size + (data.size > 0 and data[-1] != ord("\n"))
+    starts = numpy.zeros(line_count, dtype=numpy.int64)
+    starts[1:] = newlines[:line_count - 1] + 1
+    ends = numpy.full(line_count, data.size, dtype=numpy.int64)
+    ends[:newlines.size] = newlines
+    carriage_returns = ends > starts
+    carriage_returns[carriage_returns] = data[ends[carriage_returns] - 1] == ord("\r")
+    ends[carriage_returns] -= 1
+
+    colon_offsets = numpy.flatnonzero(data == ord(":"))
+    first_colons = numpy.searchsorted(colon_offsets, starts)
+    colon_counts = numpy.searchsorted(colon_offsets, ends) - first_colons
+    colons = numpy.where(colon_counts == 0, -1, -2)
+    single = colon_counts == 1
+    colons[single] = colon_offsets[first_colons[single]]
+    return starts, ends, colons
+
+
+# Returns the handle of an interned name, or -1 if it hasn't been interned.
+def _handle_or_missing(names: NameInterner, name: Hashable) -> int:
+    handle = names.find(name)
+    return -1 if handle is None else handle
+
+
+# Creates a network one person and follow at a time, reporting errors with their line number.
+# follows: tuples of (line number, followee name, follower name).
+def _build_network(names: Array[str], follows: Iterator[Tuple[int, str, str]], network_args) -> SocialNetwork:
     network_args["expected_people"] = len(names)
     network = SocialNetwork(**network_args)
     for name in names:
         network.add_person(name)
 
-    for i, columns in enumerate(split_lines):
-        if len(columns) == 2:
-            try:
-                person1 = network.find_person(columns[0])
-                person2 = network.find_person(columns[1])
-                person2.follow(person1)
-            except ValueError as e:
-                raise ValueError(f"line {i}: {e}")
+    for i, name1, name2 in follows:
+        try:
+            person1 = network.find_person(name1)
+            person2 = network.find_person(name2)
+            person2.follow(person1)
+        except ValueError as e:
+            raise ValueError(f"line {i}: {e}")
 
     return network
 
 
+# Number of bytes read from an event file at a time.
+EVENT_CHUNK_SIZE = 1 << 20
+
+# Maximum number of consecutive events of the same kind applied together.
+EVENT_BATCH_SIZE = 4096
+
+
 # Reads an event file and applies the events to a network.
-def read_event_file(file_path: str, network: SocialNetwork) -> None:
-    with open(file_path) as file:
-        for i, line in enumerate(file, 1):
-            line = line.rstrip("\n")
-            cols = line.split(":")
-            if len(cols) == 2 and cols[0] in ("A", "a"):
-                name = cols[1]
-                if not name or name.isspace():
-                    raise ValueError(f"line {i}: name cannot be blank or whitespace.")
-                try:
-                    network.add_person(name)
-                except ValueError as e:
-                    raise ValueError(f"line {i}: {e}")
-            elif len(cols) == 2 and cols[0] in ("R", "r"):
-                try:
-                    network.delete_person(network.find_person(cols[1]))
-                except ValueError as e:
-                    raise ValueError(f"line {i}: {e}")
-            elif len(cols) == 3 and cols[0] in ("F", "f"):
-                try:
-                    person1 = network.find_person(cols[1])
-                    person2 = network.find_person(cols[2])
-                    person2.follow(person1)
-                except ValueError as e:
-                    raise ValueError(f"line {i}: {e}")
-            elif len(cols) == 3 and cols[0] in ("U", "u"):
-                try:
-                    person1 = network.find_person(cols[1])
-                    person2 = network.find_person(cols[2])
+# The file is streamed in chunks of chunk_size bytes, so it need not fit in memory.
+# Events before an invalid line are still applied.
+# workers: a FileWorkers to parse the file with, or the number of processes to start for this call only.
+# If >1 processes, the file is parsed with FileWorkers._parse_events(), in ranges of about chunk_size bytes.
+# Events are still applied in file order by this process.
+# Returns the number of posts made.
+def read_event_file(file_path: str, network: SocialNetwork, chunk_size: int = EVENT_CHUNK_SIZE,
+                    workers: Union[int, "FileWorkers", None] = None) -> int:
+    if isinstance(workers, int) and workers < 1:
+        raise ValueError(f"workers must be >=1, but got {workers}.")
+    with open(file_path, "rb") as file:
+        # Empty files can't be memory mapped.
+        if not os.fstat(file.fileno()).st_size or workers is None or workers == 1:
+            post_count = _apply_event_file(_parse_events(_read_lines(file, chunk_size)), network)
+        elif isinstance(workers, FileWorkers):
+            post_count = _apply_event_file(workers._parse_events(file_path, file, chunk_size), network)
+        else:
+            with FileWorkers(workers) as temporary_workers:
+                post_count = _apply_event_file(temporary_workers._parse_events(file_path, file, chunk_size),
+                                               network)
+    return post_count
+
+
+# Applies the events of an event file, from _parse_events(), to a network.
+# Returns the number of posts made.
+def _apply_event_file(events: Iterator[Tuple[int, str, Tuple]], network: SocialNetwork) -> int:
+    # Names are interned into handles, whose slots hold the person with that name, so events only look up each
+    # name in the network once (or not at all, if it was seen recently). Slots are filled on first use, so only
+    # the names in the file are interned, not everyone in the network.
+    people = NameInterner()
+    post_count = 0
+    for kind, batch in _event_batches(events, people):
+        _apply_events(kind, batch, network, people)
+        if kind == "P":
+            post_count += len(batch)
+    return post_count
+
+
+# Iterates (line number, line) for each line of a binary file, reading chunk_size bytes at a time.
+# first_line: the line number of the first line.
+def _read_lines(file: BinaryIO, chunk_size: int, first_line: int = 1) -> Iterator[Tuple[int, str]]:
+    line_number = first_line
+    remainder = b""
+    chunk = file.read(chunk_size)
+    while chunk:
+        data = remainder + chunk
+        # Only decode up to the last newline, so multi-byte characters are never split.
+        end = data.rfind(b"\n") + 1
+        remainder = data[end:]
+        # Note: allowed to use List for split().
+        lines = data[:end].decode().split("\n")
+        for line in lines[:-1]:
+            yield line_number, line.rstrip("\r")
+            line_number += 1
+        chunk = file.read(chunk_size)
+    if remainder:
+        yield line_number, remainder.decode().rstrip("\r")
+
+
+# Iterates (line number, event kind, event arguments) for each line, parsed with _parse_event().
+# Raises ValueError when an invalid line is reached.
+def _parse_events(lines: Iterator[Tuple[int, str]]) -> Iterator[Tuple[int, str, Tuple]]:
+    for i, line in lines:
+        kind, args = _parse_event(i, line)
+        yield i, kind, args
+
+
+# Worker process task for FileWorkers._parse_events(): parses the lines in bytes [start, stop) of an event file.
+# Returns a tuple of (events before the first invalid line, as from _parse_events(), error raised for the invalid
+# line, or None if every line is valid).
+def _parse_event_range(file_path: str, start: int, stop: int, first_line: int) \
+        -> Tuple[Array[Tuple[int, str, Tuple]], Optional[ValueError]]:
+    lines = _read_lines(BytesIO(_read_range(file_path, start, stop)), EVENT_CHUNK_SIZE, first_line)
+    events = SinglyLinkedList()
+    error = None
+    try:
+        for event in _parse_events(lines):
+            events.insert_last(event)
+    except ValueError as e:
+        error = e
+    # Linked lists are pickled recursively, so could overflow the stack.
+    return Array(events), error
+
+
+# Groups consecutive events of the same kind into batches of (line number, event arguments).
+# Iterates tuples of (event kind, batch). If a line is invalid, the events before it are still
+# produced before the error is raised.
+# people: names in the events are replaced with their handles in this.
+def _event_batches(events: Iterator[Tuple[int, str, Tuple]], people: NameInterner) \
+        -> Iterator[Tuple[str, SinglyLinkedList[Tuple[int, Tuple]]]]:
+    batch_kind = None
+    batch = SinglyLinkedList()
+    error = None
+    try:
+        for i, kind, args in events:
+            if kind != batch_kind or len(batch) >= EVENT_BATCH_SIZE:
+                if batch:
+                    yield batch_kind, batch
+                batch_kind = kind
+                batch = SinglyLinkedList()
+            batch.insert_last((i, _intern_event_names(kind, args, people)))
+    except ValueError as e:
+        error = e
+    if batch:
+        yield batch_kind, batch
+    if error is not None:
+        raise error
+
+
+# Parses one line of an event file into a tuple of (event kind, event arguments).
+# i is the line number, for error messages.
+def _parse_event(i: int, line: str) -> Tuple[str, Tuple]:
+    cols = line.split(":")
+    kind = cols[0].upper()
+    if len(cols) == 2 and kind in ("A", "R"):
+        name = cols[1]
+        if kind == "A" and (not name or name.isspace()):
+            raise ValueError(f"line {i}: name cannot be blank or whitespace.")
+        args = (name,)
+    elif len(cols) == 3 and kind in ("F", "U"):
+        args = (cols[1], cols[2])
+    elif len(cols) == 3 and kind == "P":
+        args = (cols[1], cols[2], 1)
+    elif len(cols) == 4 and kind == "P":
+        try:
+            clickbait_factor = int(cols[3])
+        except ValueError:
+            raise ValueError(f"line {i}: invalid clickbait factor.")
+        args = (cols[1], cols[2], clickbait_factor)
+    else:
+        raise ValueError(f"line {i} has invalid format.")
+    return kind, args
+
+
+# Returns the arguments of a parsed event with names replaced by their handles in people.
+def _intern_event_names(kind: str, args: Tuple, people: NameInterner) -> Tuple:
+    if kind in ("F", "U"):
+        res = (people.intern(args[0]), people.intern(args[1]))
+    else:
+        res = (people.intern(args[0]),) + args[1:]
+    return res
+
+
+# Applies a batch of events of the same kind to a network, keeping the person slots of people up to date.
+def _apply_events(kind: str, events: SinglyLinkedList[Tuple[int, Tuple]], network: SocialNetwork,
+                  people: NameInterner) -> None:
+    if kind == "R":
+        _delete_people(events, network, people)
+    elif kind == "F":
+        _follow_people(events, network, people)
+    else:
+        if kind == "A":
+            network.reserve(person_count=network.person_count + len(events))
+        for i, args in events:
+            try:
+                if kind == "A":
+                    people.put(args[0], network.add_person(people.name(args[0])))
+                elif kind == "U":
+                    person1 = _find_person(people, network, args[0])
+                    person2 = _find_person(people, network, args[1])
                     person1.unfollow(person2)
-                except ValueError as e:
-                    raise ValueError(f"line {i}: {e}")
-            elif len(cols) == 3 and cols[0] in ("P", "p"):
-                try:
-                    person = network.find_person(cols[1])
-                    person.make_post(cols[2])
-                except ValueError as e:
-                    raise ValueError(f"line {i}: {e}")
-            elif len(cols) == 4 and cols[0] in ("P", "p"):
-                try:
-                    clickbait_factor = int(cols[3])
-                except ValueError:
-                    raise ValueError(f"line {i}: invalid clickbait factor.")
                 else:
-                    try:
-                        person = network.find_person(cols[1])
-                        person.make_post(cols[2], clickbait_factor)
-                    except ValueError as e:
-                        raise ValueError(f"line {i}: {e}")
-            else:
-                raise ValueError(f"line {i} has invalid format.")
+                    _find_person(people, network, args[0]).make_post(args[1], args[2])
+            except ValueError as e:
+                raise ValueError(f"line {i}: {e}")
+
+
+# Applies a batch of R events with a single SocialNetwork.delete_people() call.
+# If an event is invalid, the events before it are still applied before the error is raised.
+def _delete_people(events: SinglyLinkedList[Tuple[int, Tuple]], network: SocialNetwork,
+                   people: NameInterner) -> None:
+    deleted: SinglyLinkedList[Person] = SinglyLinkedList()
+    # Marks the people in deleted.
+    mark = network._new_mark()
+    error = None
+    for i, args in takewhile(lambda _: error is None, events):
+        try:
+            person = _find_person(people, network, args[0])
+            if person._mark == mark:
+                raise ValueError(f"{person} doesn't exist in network.")
+        except ValueError as e:
+            error = ValueError(f"line {i}: {e}")
+        else:
+            person._mark = mark
+            deleted.insert_last(person)
+            # So later events find out the person no longer exists.
+            people.put(args[0], None)
+    network.delete_people(deleted)
+    if error is not None:
+        raise error
+
+
+# Applies a batch of F events with a single SocialNetwork.add_follows() call.
+# If an event is invalid, the events before it are still applied before the error is raised.
+def _follow_people(events: SinglyLinkedList[Tuple[int, Tuple]], network: SocialNetwork,
+                   people: NameInterner) -> None:
+    # (line number, follower, followee), with the event "F:a:b" meaning b follows a.
+    follows: SinglyLinkedList[Tuple[int, Person, Person]] = SinglyLinkedList()
+    error = None
+    for i, args in takewhile(lambda _: error is None, events):
+        try:
+            followee = _find_person(people, network, args[0])
+            follows.insert_last((i, _find_person(people, network, args[1]), followee))
+        except ValueError as e:
+            error = ValueError(f"line {i}: {e}")
+    try:
+        network.add_follows((follower, followee) for _, follower, followee in follows)
+    except ValueError:
+        # Some follow is invalid, and add_follows() made none of them. Making them individually applies the
+        # ones before the first invalid follow, and finds which line it's on.
+        for i, follower, followee in follows:
+            try:
+                follower.follow(followee)
+            except ValueError as e:
+                raise ValueError(f"line {i}: {e}")
+    if error is not None:
+        raise error
+
+
+# Returns the person in the slot of the given handle, like SocialNetwork.find_person().
+# If the slot is empty, the person is found in the network and kept in the slot.
+def _find_person(people: NameInterner, network: SocialNetwork, handle: int) -> Person:
+    person = people.get(handle)
+    if person is None:
+        person = network.find_person(people.name(handle))
+        people.put(handle, person)
+    return person
 
 
 # Returns an array of a network's people sorted descending by follower count.
+# People with the same follower count are in the order of network.people.
 def people_by_popularity(network: SocialNetwork) -> Array[Person]:
     people = Array(network.people)
-    # Mergesort to avoid slowdown of quicksort if many people have similar follower count.
-    # (Which will happen as simulations progress.)
-    mergesort(people, reverse=True, key=lambda p: p.follower_count)
-    return people
+    return _by_count(people, numpy.fromiter((person.follower_count for person in people), numpy.int64, len(people)))
 
 
 # Returns an array of a network's posts sorted descending by like count.
+# Posts with the same like count are in the order of network.posts.
 def posts_by_popularity(network: SocialNetwork) -> Array[Post]:
     posts = Array(network.posts)
-    # Mergesort to avoid slowdown of quicksort if many posts have similar like count.
-    # (Which will happen as simulations progress.)
-    mergesort(posts, reverse=True, key=lambda p: p.like_count)
-    return posts
+    return _by_count(posts, numpy.fromiter((post.like_count for post in posts), numpy.int64, len(posts)))
+
+
+# Returns items sorted descending by their counts, keeping the order of items with the same count, as a stable
+# descending sort of the items would.
+# (The rankings kept by the network order ties by when items reached their count, so aren't used here.)
+def _by_count(items: Array, counts: numpy.ndarray) -> Array:
+    return items[numpy.argsort(-counts, kind="stable")]
+
+
+# Returns an array of the (at most) k people with the most followers, sorted descending by follower count.
+def top_people(network: SocialNetwork, k: int) -> Array[Person]:
+    if k < 0:
+        raise ValueError(f"k must be >=0, got {k}.")
+    # Reads only the top of the network's ranking, so takes O(k) time rather than sorting everyone.
+    return Array(SizedIterable(network._person_ranking.top(k), min(k, network.person_count)))
+
+
+# Returns an array of the (at most) k posts with the most likes, sorted descending by like count.
+def top_posts(network: SocialNetwork, k: int) -> Array[Post]:
+    if k < 0:
+        raise ValueError(f"k must be >=0, got {k}.")
+    # Reads only the top of the network's ranking, so takes O(k) time rather than sorting every post.
+    return Array(SizedIterable(network._post_ranking.top(k), min(k, network.post_count)))
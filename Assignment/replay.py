@@ -0,0 +1,122 @@
+from dsa import HashTable
+from log_writer import format_timestep, snapshot_timestep
+from network import load_snapshot, Post, SocialNetwork
+
+import bz2
+import gzip
+from itertools import takewhile
+import lzma
+import os
+import sys
+from typing import Optional, TextIO, Tuple
+
+
+# Rebuilds the state of a simulated network at any timestep from a delta log (see simulation_mode.LOG_MODE)
+# and the checkpoints it refers to.
+# Usage: python3 replay.py <delta log> <timestep> [output file]
+# Writes the network state at that timestep in the same format as the full log.
+
+
+def print_usage() -> None:
+    print("Usage:")
+    print("\t python3 replay.py <delta log> <timestep> [output file]")
+
+
+# Opens a (possibly compressed) delta log for reading text.
+def open_log(log_path: str) -> TextIO:
+    if log_path.endswith(".gz"):
+        file = gzip.open(log_path, "rt")
+    elif log_path.endswith(".bz2"):
+        file = bz2.open(log_path, "rt")
+    elif log_path.endswith(".xz"):
+        file = lzma.open(log_path, "rt")
+    else:
+        file = open(log_path)
+    return file
+
+
+# Returns the network as it was after the given timestep of the simulation that wrote the delta log.
+# Starts from the latest checkpoint at or before the timestep and applies the logged changes after it.
+# network_args: arguments for the SocialNetwork constructor.
+# Raises ValueError if the log is invalid or doesn't reach the timestep.
+def replay(log_path: str, timestep: int, **network_args) -> SocialNetwork:
+    checkpoint_line, checkpoint_path, last_timestep = _find_checkpoint(log_path, timestep)
+    if checkpoint_path is None:
+        raise ValueError(f"No checkpoint at or before timestep {timestep}.")
+    if last_timestep < timestep:
+        raise ValueError(f"Log only reaches timestep {last_timestep}.")
+    # Checkpoints are saved alongside the log.
+    network = load_snapshot(os.path.join(os.path.dirname(log_path), checkpoint_path), **network_args)
+
+    # Posts by (poster name, position in poster's posts), as identified in the log (see format_changes()).
+    posts: HashTable[Tuple[str, int], Post] = HashTable(capacity=max(network.post_count, 1))
+    for person in network.people:
+        for i, post in enumerate(person.posts):
+            posts[(person.name, i)] = post
+
+    current_timestep = None
+    with open_log(log_path) as file:
+        lines = enumerate(file, 1)
+        for i, line in takewhile(lambda _: current_timestep is None or current_timestep <= timestep, lines):
+            if i > checkpoint_line:
+                cols = line.rstrip("\n").split(":")
+                try:
+                    if cols[0] == "T":
+                        current_timestep = int(cols[1])
+                    elif current_timestep is not None and current_timestep <= timestep:
+                        _apply_change(cols, network, posts)
+                except (ValueError, KeyError, IndexError) as e:
+                    raise ValueError(f"line {i}: {e}")
+    return network
+
+
+# Returns a tuple of (line number, snapshot path) of the latest checkpoint at or before the given timestep
+# (path is None if there is none), and the last timestep in the log.
+def _find_checkpoint(log_path: str, timestep: int) -> Tuple[int, Optional[str], int]:
+    checkpoint_line = 0
+    checkpoint_path = None
+    last_timestep = 0
+    with open_log(log_path) as file:
+        for i, line in enumerate(file, 1):
+            if line.startswith("T:"):
+                last_timestep = int(line[2:])
+            elif line.startswith("C:"):
+                cols = line.rstrip("\n").split(":", 2)
+                if int(cols[1]) <= timestep:
+                    checkpoint_line = i
+                    checkpoint_path = cols[2]
+    return checkpoint_line, checkpoint_path, last_timestep
+
+
+# Applies one like or follow line of a delta log. Checkpoint lines are ignored.
+def _apply_change(cols, network: SocialNetwork, posts: HashTable[Tuple[str, int], Post]) -> None:
+    if cols[0] == "L":
+        network.find_person(cols[1]).like_post(posts[(cols[2], int(cols[3]))])
+    elif cols[0] == "F":
+        network.find_person(cols[1]).follow(network.find_person(cols[2]))
+    elif cols[0] != "C":
+        raise ValueError("invalid format.")
+
+
+def main() -> None:
+    try:
+        timestep = int(sys.argv[2])
+        network = replay(sys.argv[1], timestep)
+    except FileNotFoundError as e:
+        print(f"Error: file not found: {e.filename}")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+    else:
+        text = format_timestep(snapshot_timestep(network, timestep))
+        if len(sys.argv) == 4:
+            with open(sys.argv[3], "w") as file:
+                file.write(text)
+        else:
+            print(text, end="")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) in (3, 4):
+        main()
+    else:
+        print_usage()
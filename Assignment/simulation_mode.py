@@ -1,9 +1,13 @@
 from common import unique_file
-from network import evolve_network, people_by_popularity, Person, posts_by_popularity,\
-    read_network_file, read_event_file, SocialNetwork
+from dsa import HashTable, OpenHashTable
+from log_writer import COMPRESSION_EXTENSIONS, LogWriter
+from network import evolve_network, EvolutionWorkers, possible_connections, read_network_file, read_event_file, \
+    save_snapshot, SocialNetwork, TimestepChanges
 
 from contextlib import ExitStack
-from itertools import takewhile
+import numpy
+import os
+import random
 import sys
 import time
 from typing import Tuple
@@ -13,12 +17,47 @@ from typing import Tuple
 # (Typically want this on for "normal" operation.)
 LOGS_ENABLED = True
 
+# "full" logs the whole network state each timestep. "delta" logs only the new likes and follows of each
+# timestep, plus a snapshot of the full network every CHECKPOINT_INTERVAL timesteps.
+# (Use replay.py to get the full network state at any timestep from a delta log.)
+LOG_MODE = "full"
+
+# Number of timesteps between full network snapshots in delta log mode.
+CHECKPOINT_INTERVAL = 100
+
+# Compression of the timestep log: None, "gzip", "bz2" or "lzma".
+LOG_COMPRESSION = None
+
 # If true, enables logging of additional network statistics for performance analysis.
 # (Mainly for the investigation and report, feel free to ignore.)
 STATS_ENABLED = False
 
+# If true, network evolution runs against compact integer-indexed arrays instead of the object graph.
+# (The object graph is still kept up to date, in bulk, each timestep, so this mainly speeds up finding candidate
+# posts, at the cost of some extra memory. Incremental evolution uses the arrays either way.)
+COMPACT_BACKEND = False
+
+# Number of processes each timestep's evolution is split across.
+# (Only worthwhile for large networks. The processes are started once, for the whole simulation.)
+EVOLUTION_WORKERS = 1
+
+# If true, each timestep only considers people who might still make new likes or follows.
+# (Much faster as the network approaches saturation. A given RANDOM_SEED gives exactly the same results as with
+# this disabled.)
+INCREMENTAL_EVOLUTION = True
+
+# Seed for the simulation's random number generator, for reproducible simulations.
+# If None, a fresh seed is taken from the operating system.
+RANDOM_SEED = None
+
+# Hash table implementation used by the network: HashTable (separate chaining)
+# or OpenHashTable (open addressing).
+HASHTABLE_TYPE = HashTable
+
 # Default parameters for the network's hash tables.
 # Keeping the hash tables at high load factor seems to make the simulation more performant.
+# (With STATS_ENABLED, the last line of the stats file has the hash tables' resize and probe counts to tune these
+# with. A "resize_policy" (see dsa.resize_policy) can also be given.)
 HASHTABLE_ARGS = {
     "load_factor": 10,
     "min_load_factor": 5,
@@ -27,9 +66,21 @@ HASHTABLE_ARGS = {
     "growth_factor": 0.5
 }
 
+# Parameters used instead of HASHTABLE_ARGS if HASHTABLE_TYPE is OpenHashTable (load factors must be <1).
+OPEN_HASHTABLE_ARGS = {
+    "load_factor": 0.5,
+    "min_load_factor": 0.2,
+    "max_load_factor": 0.75,
+    "shrink_factor": 0.25,
+    "growth_factor": 0.5
+}
+
 
 # Simulation mode entry point.
 def main() -> None:
+    if RANDOM_SEED is not None:
+        # Person and post IDs come from the random module, and they decide iteration order.
+        random.seed(RANDOM_SEED)
     like_chance, follow_chance = get_probabilities()
     valid = None not in (like_chance, follow_chance)
 
@@ -73,37 +124,35 @@ def setup_network() -> SocialNetwork:
     eventfile_path = sys.argv[3]
     network = None
 
+    if HASHTABLE_TYPE is OpenHashTable:
+        network_args = OPEN_HASHTABLE_ARGS.copy()
+    else:
+        network_args = HASHTABLE_ARGS.copy()
+    network_args["hashtable_type"] = HASHTABLE_TYPE
+    network_args["compact_backend"] = COMPACT_BACKEND
+
     try:
-        print("Prescanning event file... ", end="")
-        post_count = prescan_post_count(eventfile_path)
+        print("Reading network file... ", end="")
+        network = read_network_file(netfile_path, **network_args)
         print("done")
     except FileNotFoundError:
         print("Error: file not found.")
-    except OSError as e:
+    except (OSError, ValueError) as e:
         print(f"Error: {e}")
     else:
-        network_args = HASHTABLE_ARGS.copy()
-        network_args["expected_posts"] = post_count
-
         try:
-            print("Reading network file... ", end="")
-            network = read_network_file(netfile_path, **network_args)
+            print("Reading event file... ", end="")
+            post_count = read_event_file(eventfile_path, network)
             print("done")
         except FileNotFoundError:
             print("Error: file not found.")
+            network = None
         except (OSError, ValueError) as e:
             print(f"Error: {e}")
+            network = None
         else:
-            try:
-                print("Reading event file... ", end="")
-                read_event_file(eventfile_path, network)
-                print("done")
-            except FileNotFoundError:
-                print("Error: file not found.")
-                network = None
-            except (OSError, ValueError) as e:
-                print(f"Error: {e}")
-                network = None
+            # Now the number of posts is known, make room for them in the post ranking.
+            network.reserve(post_count=post_count)
     return network
 
 
@@ -112,10 +161,20 @@ def run_simulation(network: SocialNetwork, like_chance: float, follow_chance: fl
     print("Preliminary calculations... ", end="")
     annotate_solution(network)
     print("done")
+    rng = numpy.random.default_rng(RANDOM_SEED)
     try:
         with ExitStack() as stack:
             if LOGS_ENABLED:
-                output_file = stack.enter_context(unique_file("simulation", ".txt"))
+                output_file = stack.enter_context(
+                    unique_file("simulation", ".txt" + COMPRESSION_EXTENSIONS[LOG_COMPRESSION], True))
+                # Logs are written in the background while the simulation continues.
+                log_writer = stack.enter_context(LogWriter(output_file, LOG_COMPRESSION))
+                if LOG_MODE == "delta":
+                    log_checkpoint(network, 0, output_file.name, log_writer)
+            if EVOLUTION_WORKERS > 1:
+                workers = stack.enter_context(EvolutionWorkers(EVOLUTION_WORKERS))
+            else:
+                workers = 1
             if STATS_ENABLED:
                 stats_file = stack.enter_context(unique_file("stats", ".txt"))
                 stats_file.write(f"{network.person_count} {like_chance} {follow_chance}\n")
@@ -125,138 +184,66 @@ def run_simulation(network: SocialNetwork, like_chance: float, follow_chance: fl
             while not done:
                 print(f"Running timestep {i}... ", end="")
 
+                changes = TimestepChanges()
                 start_time = time.perf_counter()
-                new_likes, new_follows = evolve_network(network, like_chance, follow_chance)
+                new_likes, new_follows = evolve_network(network, like_chance, follow_chance, rng, workers,
+                                                        changes, INCREMENTAL_EVOLUTION)
                 end_time = time.perf_counter()
 
-                if LOGS_ENABLED:
-                    log_timestep(network, i, output_file)
+                if LOGS_ENABLED and LOG_MODE == "delta":
+                    log_writer.log_changes(i, changes)
+                    if i % CHECKPOINT_INTERVAL == 0:
+                        log_checkpoint(network, i, output_file.name, log_writer)
+                elif LOGS_ENABLED:
+                    log_writer.log(network, i)
 
+                like_completion, follow_completion = completion_analysis(network)
                 if STATS_ENABLED:
-                    like_completion, follow_completion = completion_analysis(network)
                     stats_file.write(f"{i} {end_time - start_time} {new_likes} {new_follows} {like_completion} {follow_completion}\n")
-                    done = like_completion == 1 and follow_completion == 1
-                else:
-                    done = simulation_complete(network)
+                done = simulation_complete(network)
 
                 i += 1
-                print("done")
+                print(f"done ({like_completion:.1%} of likes, {follow_completion:.1%} of follows)")
+            if STATS_ENABLED:
+                # Totals for the network's hash tables, for tuning HASHTABLE_ARGS.
+                stats = network.hashtable_stats()
+                stats_file.write(f"hashtables {stats.resizes} {stats.rehashed} {stats.lookups} {stats.probes} "
+                                 f"{stats.longest_probe}\n")
             print("Simulation complete.")
-    except OSError as e:
+    except (OSError, UnicodeError) as e:
+        # UnicodeError if a name can't be encoded for the log.
         print(f"Error writing to output file: {e}")
 
 
-# Writes people sorted by follower count, posts by like count, following list,
-# and post like lists to the given file.
-def log_timestep(network: SocialNetwork, timestep: int, file) -> None:
-    file.write(f"Timestep {timestep}\n")
-
-    file.write("  People by popularity:\n")
-    for person in people_by_popularity(network):
-        file.write(f"    {person.follower_count} followers : {person}\n")
-
-    file.write("  Posts by popularity:\n")
-    for post in posts_by_popularity(network):
-        file.write(f"    {post.like_count} likes : {post}\n")
-
-    file.write("  Following:\n")
-    for person in network.people:
-        following_str = ", ".join(map(str, person.following))
-        file.write(f"    {person} : {following_str}\n")
-
-    file.write("  Post likes:\n")
-    for post in network.posts:
-        likers_str = ", ".join(map(str, post.liked_by))
-        file.write(f"    {post} : {likers_str}\n")
-
-    file.write("\n")
+# Saves a snapshot of the network next to the log file, and records it in the (delta) log.
+def log_checkpoint(network: SocialNetwork, timestep: int, log_path: str, log_writer: LogWriter) -> None:
+    # Named after the log file, without its extensions.
+    name = os.path.basename(log_path).split(".")[0]
+    snapshot_path = os.path.join(os.path.dirname(log_path), f"{name}-{timestep}.snapshot")
+    save_snapshot(network, snapshot_path)
+    log_writer.log_checkpoint(timestep, os.path.basename(snapshot_path))
 
 
-# The entire simulation can actually be solved instantly via a series of
-# depth-first searches. So we can "solve" it once at the start and then keep
-# that info around to check when the full simulation is complete.
+# The entire simulation can actually be solved instantly, from what each person can reach through
+# follows. So we can "solve" it once at the start and then keep the total numbers of likes and follows
+# there will be around to check when the full simulation is complete.
 def annotate_solution(network: SocialNetwork) -> None:
-    # Counts the maximum number of liked posts and following people obtainable via network simulation.
-    def possible_connections(network: SocialNetwork, person: Person) -> Tuple[int, int]:
-        # Effectively a depth-first search, following only edges that represent
-        # "follows person" and "likes post".
-        def _possible_connections(target_person: Person, person: Person,
-                                  likes: int, following: int) -> Tuple[int, int]:
-            person._visited = True
-            if person is not target_person:
-                new_likes = 0
-                for p in person.posts:
-                    if not hasattr(p, "_visited"):
-                        new_likes += 1
-                        p._visited = True
-                likes += new_likes
-                if new_likes > 0:
-                    # People target_person is following will be counted separately,
-                    # don't want to double up.
-                    if not target_person.is_following(person):
-                        following += 1
-            # Don't need to inspect liked posts, since network always starts with no post likes.
-            for p in person.following:
-                if not hasattr(p, "_visited"):
-                    # Network probably won't be enormous, so recursion should be ok.
-                    # Can easily change if not the case.
-                    likes, following = _possible_connections(target_person, p, likes, following)
-            return likes, following
-
-        likes, following = _possible_connections(person, person, 0, person.following_count)
-        for person in network.people:
-            try:
-                del person._visited
-            except AttributeError:
-                pass
-            for post in person.posts:
-                try:
-                    del post._visited
-                except AttributeError:
-                    pass
-        return likes, following
-
-    for person in network.people:
-        person._max_liked_posts, person._max_following = possible_connections(network, person)
+    max_likes, max_following = possible_connections(network.compact_view)
+    network._max_like_count = int(max_likes.sum())
+    network._max_follow_count = int(max_following.sum())
 
 
 # Checks if the network has evolved to a state where it will not evolve any further,
 # i.e. when everyone is following everyone they can, and everyone likes every post they can.
+# Nobody can exceed what they can reach, so this is when the network's totals reach the maximum totals.
 def simulation_complete(network: SocialNetwork) -> bool:
-    saturated = True
-    for person in takewhile(lambda _: saturated, network.people):
-        if person.following_count < person._max_following:
-            saturated = False
-        elif person.liked_post_count < person._max_liked_posts:
-            saturated = False
-    return saturated
+    return network.like_count >= network._max_like_count and network.follow_count >= network._max_follow_count
 
 
 # Returns a tuple of (like completion, follow completion) indicating the percentage of simulation
 # completion for likes and follows.
 # I.e gives the proportion of likes/follows that currently exist in the network out of all possible likes/follows.
-# Only used if additional statistics are enabled.
 def completion_analysis(network: SocialNetwork) -> Tuple[float, float]:
-    actual_likes = 0
-    actual_follows = 0
-    max_likes = 0
-    max_follows = 0
-    for person in network.people:
-        actual_likes += person.liked_post_count
-        actual_follows += person.following_count
-        max_likes += person._max_liked_posts
-        max_follows += person._max_following
-    return actual_likes / max_likes, actual_follows / max_follows
-
-
-# Scans an event file to get the total number of posts.
-# This is so that the network's expected_posts argument can be set, for optimum performance.
-# Does not check the event file for errors.
-def prescan_post_count(eventfile_path: str) -> int:
-    count = 0
-    with open(eventfile_path) as file:
-        for line in file:
-            cols = line.rstrip("\n").split(":")
-            if len(cols) in (3, 4) and cols[0] in ("P", "p"):
-                count += 1
-    return count
+    like_completion = network.like_count / network._max_like_count if network._max_like_count else 1.0
+    follow_completion = network.follow_count / network._max_follow_count if network._max_follow_count else 1.0
+    return like_completion, follow_completion
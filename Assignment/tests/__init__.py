@@ -1,6 +1,19 @@
 from .array_test import *
+from .common_test import *
+from .compact_test import *
 from .hash_table_test import *
+from .interning_test import *
+from .log_writer_test import *
+from .network_file_test import *
 from .network_test import *
+from .open_hash_table_test import *
+from .ordered_set_test import *
+from .ranking_test import *
+from .reachability_test import *
+from .replay_test import *
+from .resize_policy_test import *
 from .set_test import *
 from .singly_linked_list_test import *
+from .simulation_test import *
+from .snapshot_test import *
 from .sorting_test import *
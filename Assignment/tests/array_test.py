@@ -1,5 +1,6 @@
 from dsa import Array
 
+import numpy
 import random
 from unittest import TestCase
 
@@ -60,3 +61,47 @@ class ArrayTest(TestCase):
         self.assertIsNot(copy, self._array)
         for o1, o2 in zip(self._array, copy):
             self.assertIs(o1, o2)
+
+    def test_dtype(self) -> None:
+        self.assertEqual(object, self._array.dtype)
+        data = random.choices(range(self.TEST_SIZE), k=self.TEST_SIZE)
+        for source in (data, Array(data), numpy.array(data)):
+            array = Array(source, numpy.int64)
+            self.assertEqual(numpy.int64, array.dtype)
+            self.assertEqual(data, [int(i) for i in array])
+        array = Array(range(10), numpy.float64)
+        self.assertEqual(numpy.float64, array.copy().dtype)
+        self.assertIs(array._array, numpy.asarray(array))
+
+        # Items which are sequences are kept whole in object arrays.
+        array = Array([(1, 2), (3, 4)])
+        self.assertEqual((3, 4), array[1])
+        self.assertEqual((3, 4), Array(array)[1])
+
+    def test_slice(self) -> None:
+        array = Array(range(10), numpy.int64)
+        view = array[2:8:2]
+        self.assertIsInstance(view, Array)
+        self.assertEqual([2, 4, 6], list(view))
+        view[1] = -1
+        self.assertEqual(-1, array[4])
+        array[0:3] = Array([7, 8, 9], numpy.int64)
+        self.assertEqual([7, 8, 9, 3], list(array[:4]))
+
+        copy = array.copy()
+        copy[0] = 0
+        self.assertEqual(7, array[0])
+
+    def test_index_arrays(self) -> None:
+        array = Array(range(10), numpy.int64)
+        mask = numpy.arange(10) % 4 == 1
+        for idx, expected in (([1, 3], [1, 3]), (numpy.array([1, 3]), [1, 3]), (Array([1, 3], numpy.int64), [1, 3]),
+                              (mask, [1, 5, 9]), (Array(mask, bool), [1, 5, 9])):
+            selected = array[idx]
+            self.assertIsInstance(selected, Array)
+            self.assertEqual(numpy.int64, selected.dtype)
+            self.assertEqual(expected, list(selected))
+        selected[0] = -1
+        self.assertEqual(1, array[1])
+        array[numpy.array([0, 2])] = -1
+        self.assertEqual([-1, 1, -1], list(array[:3]))
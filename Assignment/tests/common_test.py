@@ -0,0 +1,98 @@
+from common import CachedHasher, fnv1a_hash, fnv1a_hash_spans, hash_many, str_hash
+from dsa import Array, HashTable, OpenHashTable
+from network import SocialNetwork
+
+import numpy
+import pickle
+import random
+from unittest import TestCase
+
+
+__all__ = [
+    "HashingTest"
+]
+
+
+class HashingTest(TestCase):
+    TEST_SIZE = 1000
+
+    def setUp(self) -> None:
+        random.seed(0)
+        alphabet = "abcXYZ09 :\x00éß日本"
+        self._strings = Array(self.TEST_SIZE)
+        for i in range(self.TEST_SIZE):
+            self._strings[i] = "".join(random.choice(alphabet) for _ in range(random.randrange(40)))
+
+    def test_fnv1a_hash(self) -> None:
+        # Published FNV-1a 64 test vectors.
+        self.assertEqual(0xcbf29ce484222325, fnv1a_hash(""))
+        self.assertEqual(0xaf63dc4c8601ec8c, fnv1a_hash("a"))
+        self.assertEqual(0x85944171f73967e8, fnv1a_hash("foobar"))
+        for s in self._strings:
+            self.assertLess(fnv1a_hash(s), 2 ** 64)
+
+    def test_hash_many(self) -> None:
+        for hasher in (fnv1a_hash, CachedHasher(fnv1a_hash), str_hash):
+            hashes = hash_many(self._strings, hasher)
+            self.assertEqual(self.TEST_SIZE, len(hashes))
+            for s, h in zip(self._strings, hashes):
+                self.assertEqual(hasher(s), int(h))
+            self.assertEqual(0, len(hash_many(Array(0), hasher)))
+        self.assertEqual(numpy.uint64, hash_many(self._strings).dtype)
+        self.assertEqual(fnv1a_hash(""), int(hash_many(Array(("",)))[0]))
+
+    def test_hash_spans(self) -> None:
+        encoded = Array(self.TEST_SIZE)
+        for i, s in enumerate(self._strings):
+            encoded[i] = s.encode()
+        lengths = numpy.fromiter(map(len, encoded), numpy.int64, len(encoded))
+        ends = numpy.cumsum(lengths)
+        data = numpy.frombuffer(b"".join(encoded), numpy.uint8)
+        hashes = fnv1a_hash_spans(data, ends - lengths, ends)
+        self.assertEqual(numpy.uint64, hashes.dtype)
+        for s, h in zip(self._strings, hashes):
+            self.assertEqual(fnv1a_hash(s), int(h))
+        empty = numpy.empty(0, numpy.int64)
+        self.assertEqual(0, len(fnv1a_hash_spans(data, empty, empty)))
+
+    def test_cached_hasher(self) -> None:
+        hasher = CachedHasher(fnv1a_hash, 10)
+        for _ in range(2):
+            for s in self._strings:
+                self.assertEqual(fnv1a_hash(s), hasher(s))
+        hasher = pickle.loads(pickle.dumps(hasher))
+        self.assertEqual(10, hasher.cache_size)
+        self.assertEqual(fnv1a_hash("abc"), hasher("abc"))
+        with self.assertRaises(ValueError):
+            CachedHasher(cache_size=0)
+
+    def test_hash_table_hasher(self) -> None:
+        for hashtable_type in (HashTable, OpenHashTable):
+            hashtable = hashtable_type(10, str_hasher=CachedHasher(fnv1a_hash))
+            hashes = hash_many(self._strings)
+            for i, (s, h) in enumerate(zip(self._strings, hashes)):
+                # Keys with known hashes must be found just like keys hashed by the table.
+                if i % 2:
+                    hashtable.set(s, i, int(h))
+                else:
+                    hashtable[s] = i
+            for i, s in enumerate(self._strings):
+                self.assertIn(s, hashtable)
+            # Random strings may repeat, so later values win.
+            for s in self._strings:
+                self.assertEqual(max(i for i, t in enumerate(self._strings) if t == s), hashtable[s])
+            hashtable = pickle.loads(pickle.dumps(hashtable))
+            for s in self._strings:
+                self.assertIn(s, hashtable)
+
+    def test_network_hasher(self) -> None:
+        # Bulk loading hashes all the names at once with the network's hash function.
+        names = Array(numpy.arange(self.TEST_SIZE).astype(str))
+        edges = numpy.stack((numpy.arange(1, self.TEST_SIZE), numpy.zeros(self.TEST_SIZE - 1)), axis=1)
+        for hasher in (str_hash, fnv1a_hash, CachedHasher()):
+            network = SocialNetwork.from_edges(names, edges, str_hasher=hasher)
+            for name in names:
+                self.assertEqual(name, network.find_person(name).name)
+            self.assertEqual(self.TEST_SIZE - 1, network.find_person("0").follower_count)
+            person = network.add_person("new")
+            self.assertIs(person, network.find_person("new"))
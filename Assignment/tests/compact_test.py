@@ -0,0 +1,132 @@
+from .util import assert_same_state, random_network
+from dsa import Array
+from network import CompactNetwork, evolve_network, Post, SocialNetwork, top_people, top_posts
+
+from itertools import islice
+import numpy
+import random
+from unittest import TestCase
+
+
+__all__ = [
+    "CompactNetworkTest"
+]
+
+
+class CompactNetworkTest(TestCase):
+    TEST_SIZE = 60
+
+    def setUp(self) -> None:
+        self._seed = random.randrange(2 ** 32)
+        self._network = random_network(self._seed, self.TEST_SIZE)
+
+    def test_relations(self) -> None:
+        compact = CompactNetwork(self._network)
+        self.assertEqual(self._network.person_count, compact.person_count)
+        self.assertEqual(self._network.post_count, compact.post_count)
+        self.assertMatchesNetwork(compact)
+
+    def test_candidate_pairs(self) -> None:
+        compact = CompactNetwork(self._network)
+        persons, posts = compact.candidate_pairs()
+        expected_count = 0
+        for person in self._network.people:
+            candidates = Array(posts[persons == compact.people.index(person)])
+            expected = 0
+            for following in person.following:
+                for post in following.posts:
+                    if post.poster is not person:
+                        self.assertIn(compact.posts.index(post), candidates)
+                for post in following.liked_posts:
+                    if post.poster is not person:
+                        self.assertIn(compact.posts.index(post), candidates)
+            for i in candidates:
+                post = compact.posts[i]
+                self.assertIsNot(person, post.poster)
+                self.assertTrue(any(following.likes_post(post) or post.poster is following
+                                    for following in person.following))
+                expected += 1
+            self.assertEqual(len(candidates), expected)
+            expected_count += expected
+        self.assertEqual(expected_count, len(persons))
+
+    def test_compact_view(self) -> None:
+        compact = self._network.compact_view
+        self.assertIs(compact, self._network.compact_view)
+        person = self._network.add_person("new")
+        self.assertIsNot(compact, self._network.compact_view)
+        self.assertIn(person, self._network.compact_view.people)
+
+    def test_evolve_matches_objects(self) -> None:
+        # With certain likes and follows, evolution is deterministic, so both backends must agree.
+        network = random_network(self._seed, self.TEST_SIZE, compact_backend=True)
+        for _ in range(3):
+            expected = evolve_network(self._network, 1, 1)
+            actual = evolve_network(network, 1, 1)
+            self.assertEqual(expected, actual)
+            assert_same_state(self, self._network, network)
+
+    def test_evolve_keeps_arrays_current(self) -> None:
+        self._network._compact_backend = True
+        for _ in range(3):
+            evolve_network(self._network, 0.3, 0.3)
+            self.assertMatchesNetwork(self._network.compact_view)
+        self.assertMatchesNetwork(CompactNetwork(self._network))
+
+    def test_add_in_bulk(self) -> None:
+        # Bulk likes and follows must leave the network as making them one at a time does.
+        network = random_network(self._seed, self.TEST_SIZE)
+        compact = self._network.compact_view
+        persons, posts = compact.candidate_pairs()
+        new = ~compact.likes.contains(persons, posts)
+        persons = persons[new][::2]
+        posts = posts[new][::2]
+        follow_persons = numpy.arange(compact.person_count)
+        followees = (follow_persons + 1) % compact.person_count
+        new = ~compact.following.contains(follow_persons, followees)
+        follow_persons = follow_persons[new]
+        followees = followees[new]
+        for i, j in zip(persons, posts):
+            network.find_person(compact.people[i].name).like_post(_find_post(network, compact.posts[j]))
+        for i, j in zip(follow_persons, followees):
+            network.find_person(compact.people[i].name).follow(network.find_person(compact.people[j].name))
+
+        compact.add_likes(persons, posts, self._network)
+        compact.add_follows(follow_persons, followees, self._network)
+        self.assertIs(compact, self._network.compact_view)
+        self.assertMatchesNetwork(compact)
+        assert_same_state(self, network, self._network)
+        self.assertEqual(network.like_count, self._network.like_count)
+        self.assertEqual(network.follow_count, self._network.follow_count)
+        for post in self._network.posts:
+            self.assertEqual([p.name for p in _find_post(network, post).liked_by], [p.name for p in post.liked_by])
+        # The rankings have the same counts. (People with equal counts may be in a different order, as each
+        # person reaches their count in one move rather than one follow at a time.)
+        self.assertEqual([p.follower_count for p in top_people(network, network.person_count)],
+                         [p.follower_count for p in top_people(self._network, network.person_count)])
+        self.assertEqual([p.like_count for p in top_posts(network, network.post_count)],
+                         [p.like_count for p in top_posts(self._network, network.post_count)])
+
+    def assertMatchesNetwork(self, compact: CompactNetwork) -> None:
+        for i, person in enumerate(compact.people):
+            following = compact.following.indices[compact.following.offsets[i]:compact.following.offsets[i + 1]]
+            self.assertEqual(person.following_count, len(following))
+            for j in following:
+                self.assertTrue(person.is_following(compact.people[j]))
+            posts = compact.authored.indices[compact.authored.offsets[i]:compact.authored.offsets[i + 1]]
+            self.assertEqual(person.post_count, len(posts))
+            for j in posts:
+                self.assertIs(person, compact.posts[j].poster)
+            liked = compact.likes.indices[compact.likes.offsets[i]:compact.likes.offsets[i + 1]]
+            self.assertEqual(person.liked_post_count, len(liked))
+            for j in liked:
+                self.assertTrue(person.likes_post(compact.posts[j]))
+        for i, post in enumerate(compact.posts):
+            self.assertIs(post.poster, compact.people[compact.poster[i]])
+            self.assertEqual(post.clickbait_factor, compact.clickbait[i])
+
+
+# Returns the post in network with the same poster name and position in its poster's posts as post.
+def _find_post(network: SocialNetwork, post: Post) -> Post:
+    position = next(i for i, p in enumerate(post.poster.posts) if p is post)
+    return next(islice(network.find_person(post.poster.name).posts, position, None))
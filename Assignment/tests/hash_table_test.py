@@ -153,6 +153,114 @@ class HashTableTest(TestCase):
             self.assertIn(value, values)
         self.assertEqual(len(values), visited)
 
+    def test_reserve(self) -> None:
+        self._hashtable[-1] = -1
+        self._hashtable.reserve(self.TEST_SIZE + 1)
+        capacity = self._hashtable._capacity
+        self.assertEqual(-1, self._hashtable[-1])
+
+        # Assert no resizes happen while filling up to the reserved size.
+        keys = Array(random.sample(range(self.TEST_SIZE), self.TEST_SIZE))
+        for key in keys:
+            self._hashtable[key] = key
+            self.assertEqual(capacity, self._hashtable._capacity)
+        for key in keys:
+            self.assertEqual(key, self._hashtable[key])
+
+        # Assert reserving less than the current capacity does nothing.
+        self._hashtable.reserve(0)
+        self.assertEqual(capacity, self._hashtable._capacity)
+
+    def test_deferred_shrink(self) -> None:
+        keys = Array(random.sample(range(self.TEST_SIZE), self.TEST_SIZE))
+        for key in keys:
+            self._hashtable[key] = key
+        capacity = self._hashtable._capacity
+        for key in keys[10:]:
+            self._hashtable.remove(key, shrink=False)
+            self.assertEqual(capacity, self._hashtable._capacity)
+        self._hashtable.shrink()
+        self.assertLess(self._hashtable._capacity, capacity)
+        self.assertGreater(self._hashtable.load_factor, self._hashtable._policy.min_load_factor)
+        self.assertEqual(10, len(self._hashtable))
+        for key in keys[:10]:
+            self.assertEqual(key, self._hashtable[key])
+
+        # Shrinking again changes nothing.
+        capacity = self._hashtable._capacity
+        self._hashtable.shrink()
+        self.assertEqual(capacity, self._hashtable._capacity)
+        for key in keys[:10]:
+            self._hashtable.remove(key, shrink=False)
+        self._hashtable.shrink()
+        self.assertEqual(0, len(self._hashtable))
+        for _ in self._hashtable:
+            self.fail()
+
+    def test_stats(self) -> None:
+        # Stats are only collected if asked for.
+        for key in range(self.TEST_SIZE):
+            self._hashtable[key] = key
+        self.assertEqual(0, self._hashtable.stats.lookups)
+        self.assertEqual(0, self._hashtable.stats.resizes)
+
+        self._hashtable = type(self._hashtable)(self.TEST_SIZE // 10, collect_stats=True)
+        stats = self._hashtable.stats
+        self.assertEqual(0, stats.resizes)
+        self.assertEqual(0, stats.lookups)
+        self.assertEqual(0.0, stats.mean_probe)
+        for key in range(self.TEST_SIZE):
+            self._hashtable[key] = key
+        for key in range(self.TEST_SIZE):
+            self.assertIn(key, self._hashtable)
+        stats = self._hashtable.stats
+        self.assertGreater(stats.resizes, 0)
+        self.assertGreaterEqual(stats.rehashed, stats.resizes)
+        self.assertEqual(2 * self.TEST_SIZE, stats.lookups)
+        # Every successful search examines at least 1 entry or slot.
+        self.assertGreaterEqual(stats.probes, self.TEST_SIZE)
+        self.assertGreaterEqual(stats.longest_probe, 1)
+        self.assertLessEqual(stats.longest_probe, self.TEST_SIZE)
+
+        total = stats + stats
+        self.assertEqual(2 * stats.lookups, total.lookups)
+        self.assertEqual(2 * stats.resizes, total.resizes)
+        self.assertEqual(stats.longest_probe, total.longest_probe)
+
+    def test_colliding_hashes(self) -> None:
+        # Distinct keys with the same hash must still be kept apart.
+        keys = Array(range(-3, 3))
+        for key in keys:
+            self._hashtable[key] = key
+        for key in keys:
+            self.assertEqual(key, self._hashtable[key])
+        del self._hashtable[-1]
+        self.assertNotIn(-1, self._hashtable)
+        self.assertEqual(-2, self._hashtable[-2])
+
+    def test_lazy_buckets(self) -> None:
+        # Buckets are only allocated when something is put in them, and freed when emptied.
+        # (Specific to HashTable's separate chaining.)
+        hashtable = HashTable(self.TEST_SIZE // 10)
+
+        def allocated() -> int:
+            return sum(chain is not None for chain in hashtable._array)
+
+        self.assertEqual(0, allocated())
+        for key in range(5):
+            hashtable[key] = key
+        self.assertEqual(5, allocated())
+        hashtable.reserve(self.TEST_SIZE)
+        self.assertEqual(5, allocated())
+        for key in range(5):
+            self.assertEqual(key, hashtable[key])
+        for key in range(5):
+            del hashtable[key]
+            self.assertNotIn(key, hashtable)
+        self.assertEqual(0, allocated())
+        with self.assertRaises(KeyError):
+            del hashtable[0]
+
     def test_serialise(self) -> None:
         b = pickle.dumps(self._hashtable)
         hashtable = pickle.loads(b)
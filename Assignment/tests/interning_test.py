@@ -0,0 +1,50 @@
+from dsa import Array
+from network import NameInterner
+
+import random
+from unittest import TestCase
+
+
+__all__ = [
+    "NameInternerTest"
+]
+
+
+class NameInternerTest(TestCase):
+    TEST_SIZE = 1000
+
+    def test_intern(self) -> None:
+        # Small cache and capacity, so that both evictions and growth happen.
+        interner = NameInterner(10, cache_size=16)
+        names = Array(self.TEST_SIZE)
+        for i in range(self.TEST_SIZE):
+            names[i] = str(i)
+        for handle, name in enumerate(names):
+            self.assertNotIn(name, interner)
+            self.assertIsNone(interner.find(name))
+            self.assertEqual(handle, interner.intern(name))
+            self.assertEqual(handle + 1, len(interner))
+        for _ in range(self.TEST_SIZE):
+            handle = random.randrange(self.TEST_SIZE)
+            self.assertEqual(handle, interner.intern(names[handle]))
+            self.assertEqual(handle, interner.find(names[handle]))
+            self.assertEqual(names[handle], interner.name(handle))
+        self.assertEqual(self.TEST_SIZE, len(interner))
+
+    def test_slots(self) -> None:
+        interner = NameInterner()
+        for i in range(self.TEST_SIZE):
+            self.assertIsNone(interner.get(interner.intern(str(i))))
+        for handle in range(0, self.TEST_SIZE, 3):
+            interner.put(handle, handle * 2)
+        for handle in range(self.TEST_SIZE):
+            self.assertEqual(handle * 2 if handle % 3 == 0 else None, interner.get(handle))
+        for handle in (-1, self.TEST_SIZE):
+            with self.assertRaises(KeyError):
+                interner.get(handle)
+            with self.assertRaises(KeyError):
+                interner.put(handle, 0)
+            with self.assertRaises(KeyError):
+                interner.name(handle)
+        with self.assertRaises(ValueError):
+            NameInterner(cache_size=0)
@@ -0,0 +1,108 @@
+from .util import random_network
+from log_writer import COMPRESSION_EXTENSIONS, format_timestep, LogWriter, snapshot_timestep
+from network import evolve_network, people_by_popularity, posts_by_popularity
+
+import bz2
+import gzip
+import io
+import lzma
+import random
+from unittest import TestCase
+
+
+__all__ = [
+    "LogWriterTest"
+]
+
+
+class LogWriterTest(TestCase):
+    TEST_SIZE = 50
+
+    def setUp(self) -> None:
+        self._network = random_network(random.randrange(2 ** 32), self.TEST_SIZE, compact_backend=True)
+
+    def test_format(self) -> None:
+        text = format_timestep(snapshot_timestep(self._network, 3))
+        lines = io.StringIO(text).readlines()
+        self.assertEqual("Timestep 3\n", lines[0])
+        self.assertEqual(6 + 2 * self._network.person_count + 2 * self._network.post_count, len(lines))
+
+        people = lines[2:2 + self._network.person_count]
+        counts = tuple(int(line.split()[0]) for line in people)
+        self.assertEqual(tuple(sorted(counts, reverse=True)), counts)
+        for line in people:
+            count, name = line.strip().split(" followers : ")
+            self.assertEqual(int(count), self._network.find_person(name).follower_count)
+
+        start = 4 + self._network.person_count + self._network.post_count
+        for line in lines[start:start + self._network.person_count]:
+            name, following = line.rstrip("\n")[4:].split(" : ")
+            person = self._network.find_person(name)
+            self.assertEqual(person.following_count, len(following.split(", ")) if following else 0)
+            for other in following.split(", ") if following else ():
+                self.assertTrue(person.is_following(self._network.find_person(other)))
+
+    def test_format_matches_network(self) -> None:
+        # Ties, following lists and likers are in the order the network iterates them.
+        for compact_backend in (False, True):
+            network = random_network(random.randrange(2 ** 32), self.TEST_SIZE, compact_backend=compact_backend)
+            evolve_network(network, 0.5, 0.5)
+            expected = "".join((
+                "Timestep 2\n",
+                "  People by popularity:\n",
+                "".join(f"    {p.follower_count} followers : {p}\n" for p in people_by_popularity(network)),
+                "  Posts by popularity:\n",
+                "".join(f"    {p.like_count} likes : {p}\n" for p in posts_by_popularity(network)),
+                "  Following:\n",
+                "".join(f"    {p} : {', '.join(map(str, p.following))}\n" for p in network.people),
+                "  Post likes:\n",
+                "".join(f"    {p} : {', '.join(map(str, p.liked_by))}\n" for p in network.posts),
+                "\n"
+            ))
+            self.assertEqual(expected, format_timestep(snapshot_timestep(network, 2)))
+
+    def test_snapshot_unaffected_by_evolution(self) -> None:
+        snapshot = snapshot_timestep(self._network, 1)
+        expected = format_timestep(snapshot)
+        evolve_network(self._network, 1, 1)
+        self.assertEqual(expected, format_timestep(snapshot))
+
+    def test_compression(self) -> None:
+        decompressors = {None: bytes, "gzip": gzip.decompress, "bz2": bz2.decompress, "lzma": lzma.decompress}
+        for compression in COMPRESSION_EXTENSIONS:
+            network = random_network(1, self.TEST_SIZE, compact_backend=True)
+            expected = ""
+            file = _UnclosedBytesIO()
+            with LogWriter(file, compression, 1) as writer:
+                for i in range(1, 4):
+                    expected += format_timestep(snapshot_timestep(network, i))
+                    writer.log(network, i)
+                    evolve_network(network, 1, 1)
+            self.assertTrue(file.closed_called)
+            self.assertEqual(expected, decompressors[compression](file.getvalue()).decode())
+
+    def test_format_error(self) -> None:
+        # Names with lone surrogates can't be encoded. The error must be reported rather than stopping the
+        # background thread, which would leave log() and close() blocked.
+        file = _UnclosedBytesIO()
+        writer = LogWriter(file, None, 1)
+        with self.assertRaises(UnicodeEncodeError):
+            for i in range(10):
+                writer.log_checkpoint(i, "\ud800")
+        with self.assertRaises(UnicodeEncodeError):
+            writer.close()
+        self.assertTrue(file.closed_called)
+
+    def test_invalid_args(self) -> None:
+        with self.assertRaises(ValueError):
+            LogWriter(io.BytesIO(), "zip")
+        with self.assertRaises(ValueError):
+            LogWriter(io.BytesIO(), None, 0)
+
+
+# BytesIO whose contents are still readable after close().
+class _UnclosedBytesIO(io.BytesIO):
+    closed_called = False
+
+    def close(self) -> None:
+        self.closed_called = True
@@ -0,0 +1,174 @@
+from .util import assert_same_state
+from network import FileWorkers, read_event_file, read_network_file
+from network.util import _resolve_hashed_names, _split_lines
+from network_generator import random_network
+
+import numpy
+import os
+import random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+
+__all__ = [
+    "NetworkFileTest"
+]
+
+
+class NetworkFileTest(TestCase):
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self._netfile_path = os.path.join(self._directory.name, "netfile.txt")
+        self._eventfile_path = os.path.join(self._directory.name, "eventfile.txt")
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_read_network_file(self) -> None:
+        self.write_files("A\nB\nC\nA:B\nC:B\n", "")
+        network = read_network_file(self._netfile_path)
+        self.assertEqual(3, network.person_count)
+        person1 = network.find_person("A")
+        person2 = network.find_person("B")
+        person3 = network.find_person("C")
+        self.assertTrue(person2.is_following(person1))
+        self.assertTrue(person2.is_following(person3))
+        self.assertEqual(0, person1.following_count)
+        self.assertEqual(0, person3.following_count)
+
+        for netfile in ("A\nB\nA:B\nA:B\n", "A\nB\nA:A\n", "A\nA:B\n"):
+            self.write_files(netfile, "")
+            with self.assertRaisesRegex(ValueError, "^line "):
+                read_network_file(self._netfile_path)
+
+    def test_network_file_format(self) -> None:
+        # Windows line endings, no final newline, non-ASCII names and repeated people.
+        with open(self._netfile_path, "wb") as file:
+            file.write("A\r\nB\u00e9\r\nA\nC\u6f22\nB\u00e9:C\u6f22\r\nA:B\u00e9".encode())
+        network = read_network_file(self._netfile_path)
+        self.assertEqual(3, network.person_count)
+        person1 = network.find_person("A")
+        person2 = network.find_person("B\u00e9")
+        person3 = network.find_person("C\u6f22")
+        self.assertTrue(person3.is_following(person2))
+        self.assertTrue(person2.is_following(person1))
+        self.assertEqual(1, person2.follower_count)
+
+        self.write_files("", "")
+        self.assertEqual(0, read_network_file(self._netfile_path).person_count)
+
+        for netfile, message in (("A\n\nB\n", "line 2 has invalid format"),
+                                 ("A\nB\nA:B:C\n", "line 3 has invalid format"),
+                                 ("A\n \n", "line 2: name cannot be blank"),
+                                 ("A\nB\nA:B\nA:\n", 'line 4: Person with name "" doesn\'t exist')):
+            self.write_files(netfile, "")
+            with self.assertRaisesRegex(ValueError, message):
+                read_network_file(self._netfile_path)
+
+    def test_chunk_sizes(self) -> None:
+        random.seed(0)
+        netfile, eventfile = random_network(100, 10, 3, 2, 1)
+        self.write_files(netfile, eventfile)
+        random.seed(1)
+        expected = read_network_file(self._netfile_path)
+        expected_posts = read_event_file(self._eventfile_path, expected)
+        self.assertEqual(expected.post_count, expected_posts)
+        for chunk_size in (1, 7, 100):
+            random.seed(1)
+            network = read_network_file(self._netfile_path)
+            self.assertEqual(expected_posts, read_event_file(self._eventfile_path, network, chunk_size))
+            assert_same_state(self, expected, network)
+
+    def test_workers(self) -> None:
+        random.seed(0)
+        netfile, eventfile = random_network(100, 10, 3, 2, 1)
+        self.write_files(netfile, eventfile)
+        random.seed(1)
+        expected = read_network_file(self._netfile_path)
+        expected_posts = read_event_file(self._eventfile_path, expected)
+        for workers in (2, 3, 8):
+            random.seed(1)
+            network = read_network_file(self._netfile_path, workers)
+            self.assertEqual(expected_posts, read_event_file(self._eventfile_path, network, workers=workers))
+            assert_same_state(self, expected, network)
+        # The same workers can parse many files, and events can be parsed in many small ranges.
+        with FileWorkers(2) as workers:
+            for chunk_size in (1, 50, 1000):
+                random.seed(1)
+                network = read_network_file(self._netfile_path, workers)
+                self.assertEqual(expected_posts, read_event_file(self._eventfile_path, network, chunk_size, workers))
+                assert_same_state(self, expected, network)
+
+        # Errors are reported for the same line as without workers.
+        for netfile, message in (("A\n \nB\nA:B:C\n", "line 4 has invalid format"),
+                                 ("A\nB\nC\n \nA:B\n", "line 4: name cannot be blank"),
+                                 ("A\nB\nA:B\nC\nB:C\nA:B\n", "line 6: B already follows A")):
+            self.write_files(netfile, "")
+            with self.assertRaisesRegex(ValueError, message):
+                read_network_file(self._netfile_path, 3)
+        self.write_files("A\n", "A:C\nF:A:C\nA:D\nR:D\nA:E\nR:X\nA:F\nA:G\n")
+        network = read_network_file(self._netfile_path)
+        with self.assertRaisesRegex(ValueError, 'line 6: Person with name "X" doesn\'t exist'):
+            read_event_file(self._eventfile_path, network, workers=3)
+        self.assertEqual(3, network.person_count)
+        with self.assertRaises(ValueError):
+            read_network_file(self._netfile_path, 0)
+
+    def test_hash_collisions(self) -> None:
+        data = "A\nB\nA\nA:B\nB:C\n".encode()
+        starts, ends, colons = _split_lines(data)
+        # Names are matched exactly, not just by hash: C has the same hash as A.
+        hashes1 = numpy.array([1, 2, 1, 1, 2], numpy.uint64)
+        hashes2 = numpy.array([0, 0, 0, 2, 1], numpy.uint64)
+        person_names, follows = _resolve_hashed_names(data, starts, ends, colons, hashes1, hashes2)
+        self.assertEqual(["A", "B"], list(person_names))
+        self.assertEqual([[1, 0], [-1, 1]], follows.tolist())
+        # Different people's names with the same hash can't be told apart.
+        hashes1 = numpy.zeros(starts.size, numpy.uint64)
+        self.assertIsNone(_resolve_hashed_names(data, starts, ends, colons, hashes1, hashes2))
+
+        # Then files are parsed by matching names.
+        self.write_files("A\nB\nA\nA:B\nB:C\n", "")
+        with patch("network.util.fnv1a_hash_spans", lambda _, starts, __: numpy.zeros(starts.size, numpy.uint64)):
+            with self.assertRaisesRegex(ValueError, 'line 5: Person with name "C" doesn\'t exist'):
+                read_network_file(self._netfile_path)
+            self.write_files("A\nB\nA\nA:B\n", "")
+            network = read_network_file(self._netfile_path)
+        self.assertTrue(network.find_person("B").is_following(network.find_person("A")))
+
+    def test_events(self) -> None:
+        self.write_files("A\nB\n", "a:C\nF:A:C\nf:C:B\nP:A:hello\np:B:hi:3\nU:C:A\nR:B\nA:B\n")
+        network = read_network_file(self._netfile_path)
+        self.assertEqual(2, read_event_file(self._eventfile_path, network, 5))
+        person1 = network.find_person("A")
+        person2 = network.find_person("B")
+        person3 = network.find_person("C")
+        self.assertEqual(0, person3.following_count)
+        self.assertEqual(0, person2.following_count)
+        self.assertEqual(1, person1.post_count)
+        self.assertEqual(1, network.post_count)
+
+    def test_invalid_events(self) -> None:
+        # Events before the invalid line must still be applied.
+        for eventfile, message in (("A:C\nF:A:C\nX\nA:D\n", "line 3 has invalid format"),
+                                   ("A:C\nF:A:C\nP:A:hi:x\nA:D\n", "line 3: invalid clickbait factor"),
+                                   ("A:C\nF:A:C\nF:A:C\nA:D\n", "line 3: C already follows A"),
+                                   ("A:C\nF:A:C\nF:C:C\nA:D\n", "line 3: Cannot follow self"),
+                                   ("A:C\nF:A:C\nF:X:Y\nA:D\n", 'line 3: Person with name "X" doesn\'t exist'),
+                                   ("A:C\nF:A:C\nA: \nA:D\n", "line 3: name cannot be blank"),
+                                   ("A:C\nF:A:C\nA:D\nR:D\nR:X\n", 'line 5: Person with name "X" doesn\'t exist'),
+                                   ("A:C\nF:A:C\nA:D\nR:D\nR:D\n", "line 5: D doesn't exist")):
+            self.write_files("A\n", eventfile)
+            network = read_network_file(self._netfile_path)
+            with self.assertRaisesRegex(ValueError, message):
+                read_event_file(self._eventfile_path, network, 4)
+            self.assertTrue(network.find_person("C").is_following(network.find_person("A")))
+            with self.assertRaises(ValueError):
+                network.find_person("D")
+
+    def write_files(self, netfile: str, eventfile: str) -> None:
+        with open(self._netfile_path, "w") as file:
+            file.write(netfile)
+        with open(self._eventfile_path, "w") as file:
+            file.write(eventfile)
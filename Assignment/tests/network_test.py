@@ -1,11 +1,15 @@
-from dsa import SinglyLinkedList
-from network import SocialNetwork
+from .util import assert_same_state, random_network
+from dsa import Array, OpenHashTable, SinglyLinkedList
+from network import people_by_popularity, posts_by_popularity, SocialNetwork
 
+import numpy
 import pickle
+import random
 from unittest import TestCase
 
 
 __all__ = [
+    "OpenAddressingSocialNetworkTest",
     "SocialNetworkTest"
 ]
 
@@ -78,6 +82,85 @@ class SocialNetworkTest(TestCase):
         self.assertNotIn(person2, post.liked_by)
         self.assertEqual(0, post.like_count)
 
+    def test_delete_person_3(self) -> None:
+        # Likes of a post stay in the order they were made after likers are deleted.
+        poster = self._network.add_person("poster")
+        post = poster.make_post("viral")
+        people = SinglyLinkedList()
+        for i in range(self.TEST_SIZE):
+            person = self._network.add_person(str(i))
+            person.like_post(post)
+            people.insert_last(person)
+        for i, person in enumerate(people):
+            if i % 3 == 0:
+                self._network.delete_person(person)
+        remaining = Array(SinglyLinkedList(person.name for i, person in enumerate(people) if i % 3))
+        self.assertEqual(len(remaining), post.like_count)
+        for name, person in zip(remaining, post.liked_by):
+            self.assertEqual(name, person.name)
+            self.assertTrue(post.is_liked_by(person))
+        self.assertEqual(len(remaining), self._network.like_count)
+
+    def test_delete_people(self) -> None:
+        # Deleting in bulk must give the same result as deleting one at a time.
+        network1 = random_network(0, self.TEST_SIZE)
+        network2 = random_network(0, self.TEST_SIZE)
+        names = Array(SinglyLinkedList(str(i) for i in range(0, self.TEST_SIZE, 3)))
+        for name in names:
+            network1.delete_person(network1.find_person(name))
+        network2.delete_people(network2.find_person(name) for name in names)
+        assert_same_state(self, network1, network2)
+        for network in (network1, network2):
+            self.assertEqual(sum(p.following_count for p in network.people), network.follow_count)
+            self.assertEqual(sum(p.like_count for p in network.posts), network.like_count)
+            self.assertEqual(network.person_count, len(people_by_popularity(network)))
+            self.assertEqual(network.post_count, len(posts_by_popularity(network)))
+
+        # Invalid batches don't delete anyone.
+        person = network2.find_person("1")
+        deleted = network1.add_person("deleted")
+        network1.delete_person(deleted)
+        for people in ((person, person), (person, deleted), (person, network1.find_person("1"))):
+            with self.assertRaises(ValueError):
+                network2.delete_people(people)
+            self.assertIs(person, network2.find_person("1"))
+        assert_same_state(self, network1, network2)
+        network2.delete_people(())
+        assert_same_state(self, network1, network2)
+
+    def test_add_follows(self) -> None:
+        # Following in bulk must give the same result as following one at a time.
+        network1 = random_network(0, self.TEST_SIZE)
+        network2 = random_network(0, self.TEST_SIZE)
+        follows = SinglyLinkedList()
+        for i in range(self.TEST_SIZE):
+            for j in (0, 1, (i * 7 + 3) % self.TEST_SIZE):
+                person1 = network1.find_person(str(i))
+                person2 = network1.find_person(str(j))
+                if person1 is not person2 and not person1.is_following(person2):
+                    person1.follow(person2)
+                    follows.insert_last((str(i), str(j)))
+        network2.add_follows((network2.find_person(i), network2.find_person(j)) for i, j in follows)
+        assert_same_state(self, network1, network2)
+        self.assertEqual(network1.follow_count, network2.follow_count)
+        self.assertEqual([p.follower_count for p in people_by_popularity(network1)],
+                         [p.follower_count for p in people_by_popularity(network2)])
+
+        # Invalid batches don't make any follows.
+        person1 = network2.find_person("0")
+        person2 = network2.add_person("new")
+        network1.add_person("new")
+        deleted = network2.add_person("deleted")
+        network2.delete_person(deleted)
+        for follows in (((person1, person2), (person1, person2)), ((person2, person1), (person2, person2)),
+                        ((person2, person1), (person2, deleted)), ((person2, person1), (person1, person2),
+                                                                   (person1, network2.find_person("1")))):
+            with self.assertRaises(ValueError):
+                network2.add_follows(follows)
+            assert_same_state(self, network1, network2)
+        network2.add_follows(())
+        assert_same_state(self, network1, network2)
+
     def test_make_post(self) -> None:
         person = self._network.add_person("Bill")
         post = person.make_post("Greetings.")
@@ -131,6 +214,8 @@ class SocialNetworkTest(TestCase):
         self.assertEqual(1, post.like_count)
         self.assertIn(post, person2.liked_posts)
         self.assertTrue(person2.likes_post(post))
+        self.assertTrue(post.is_liked_by(person2))
+        self.assertFalse(post.is_liked_by(person1))
 
         with self.assertRaises(ValueError):
             person2.like_post(post)
@@ -153,6 +238,70 @@ class SocialNetworkTest(TestCase):
         self.assertNotIn(person1, person2.followers)
         self.assertNotIn(person2, person1.following)
 
+    def test_from_edges(self) -> None:
+        names = [str(i) for i in range(self.TEST_SIZE)]
+        for name in names:
+            self._network.add_person(name)
+        edges = numpy.random.default_rng(0).integers(self.TEST_SIZE, size=(self.TEST_SIZE * 5, 2))
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        for follower, followee in edges:
+            person = self._network.find_person(names[follower])
+            if not person.is_following(self._network.find_person(names[followee])):
+                person.follow(self._network.find_person(names[followee]))
+
+        hashtable_type = self._network._hashtable_type
+        network1 = SocialNetwork.from_edges(names, edges, True, hashtable_type=hashtable_type)
+        network2 = SocialNetwork.from_edges(names, [(names[f], names[g]) for f, g in edges], True,
+                                            hashtable_type=hashtable_type)
+        for network in (network1, network2):
+            self.assertEqual(self.TEST_SIZE, network.person_count)
+            self.assertEqual(self._network.follow_count, network.follow_count)
+            for person in self._network.people:
+                other = network.find_person(person.name)
+                self.assertEqual(person.following_count, other.following_count)
+                self.assertEqual(person.follower_count, other.follower_count)
+                for following in person.following:
+                    self.assertTrue(other.is_following(network.find_person(following.name)))
+                    self.assertTrue(network.find_person(following.name).is_followed_by(other))
+
+        with self.assertRaises(ValueError):
+            SocialNetwork.from_edges(names, edges)
+        with self.assertRaises(ValueError):
+            SocialNetwork.from_edges(["a", "b", "a"], [])
+        with self.assertRaises(ValueError):
+            SocialNetwork.from_edges(["a", "b"], [("a", "a")])
+        with self.assertRaises(ValueError):
+            SocialNetwork.from_edges(["a", "b"], [("a", "c")])
+        with self.assertRaises(ValueError):
+            SocialNetwork.from_edges(["a", "b"], numpy.array([[0, 2]]))
+
+    def test_totals(self) -> None:
+        people = SinglyLinkedList()
+        for i in range(20):
+            people.insert_last(self._network.add_person(str(i)))
+        for person in people:
+            for other in people:
+                if other is not person and random.random() < 0.3:
+                    person.follow(other)
+            person.make_post("post")
+        for person in people:
+            for other in people:
+                if random.random() < 0.3:
+                    person.like_post(next(iter(other.posts)))
+        person = people.peek_first()
+        for other in SinglyLinkedList(person.following):
+            person.unfollow(other)
+        self._network.delete_person(people.peek_last())
+        self.assertEqual(sum(p.following_count for p in self._network.people), self._network.follow_count)
+        self.assertEqual(sum(p.liked_post_count for p in self._network.people), self._network.like_count)
+        self.assertEqual(sum(p.like_count for p in self._network.posts), self._network.like_count)
+
+        stats = self._network.hashtable_stats()
+        self.assertEqual(0, stats.lookups)
+        network = random_network(0, 20, hashtable_type=self._network._hashtable_type, collect_stats=True)
+        stats = network.hashtable_stats()
+        self.assertGreaterEqual(stats.lookups, network.follow_count + network.like_count)
+
     def test_serialise_1(self) -> None:
         person1 = self._network.add_person("Rhys")
         person2 = self._network.add_person("Tracey")
@@ -180,3 +329,8 @@ class SocialNetworkTest(TestCase):
         for i in range(self.TEST_SIZE):
             with self.assertRaises(ValueError):
                 network.add_person(str(i))
+
+
+class OpenAddressingSocialNetworkTest(SocialNetworkTest):
+    def setUp(self) -> None:
+        self._network = SocialNetwork(hashtable_type=OpenHashTable)
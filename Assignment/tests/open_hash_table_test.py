@@ -0,0 +1,39 @@
+from .hash_table_test import HashTableTest
+from dsa import Array, OpenHashTable
+
+import random
+
+
+__all__ = [
+    "OpenHashTableTest"
+]
+
+
+# Runs all the HashTable tests against OpenHashTable, plus some specific to open addressing.
+class OpenHashTableTest(HashTableTest):
+    def setUp(self) -> None:
+        # Make sure capacity is low enough to trigger resizes.
+        self._hashtable = OpenHashTable(self.TEST_SIZE // 10)
+
+    def test_init(self) -> None:
+        for load_factor in (0, 1, 2):
+            with self.assertRaises(ValueError):
+                OpenHashTable(load_factor=load_factor)
+            with self.assertRaises(ValueError):
+                OpenHashTable(max_load_factor=load_factor)
+
+    def test_collisions(self) -> None:
+        # Keys that are all congruent modulo the capacity, so every insert and delete probes
+        # past (and wraps around) clusters.
+        hashtable = OpenHashTable(10, max_load_factor=0.9, min_load_factor=0)
+        capacity = hashtable._capacity
+        keys = Array(range(0, capacity * 8, capacity))
+        for i, key in enumerate(keys):
+            self.assertTrue(hashtable.set(key, i))
+        random.shuffle(keys)
+        for i, key in enumerate(keys):
+            del hashtable[key]
+            self.assertNotIn(key, hashtable)
+            for j in range(i + 1, len(keys)):
+                self.assertIn(keys[j], hashtable)
+        self.assertEqual(0, len(hashtable))
@@ -0,0 +1,79 @@
+from .set_test import SetTest
+from dsa import Array, OpenHashTable, OrderedSet, SinglyLinkedList
+
+from itertools import chain
+import pickle
+import random
+
+
+__all__ = [
+    "OpenAddressingOrderedSetTest",
+    "OrderedSetTest"
+]
+
+
+# Runs all the Set tests against OrderedSet, plus some for its ordering.
+class OrderedSetTest(SetTest):
+    def setUp(self) -> None:
+        # Make sure capacity is low enough to trigger resizes.
+        self._set = OrderedSet(self.TEST_SIZE // 10)
+
+    def test_order(self) -> None:
+        items = Array(random.sample(range(self.TEST_SIZE), self.TEST_SIZE))
+        for item in items:
+            self._set.add(item)
+        # Re-adding mustn't move items.
+        for item in items:
+            self.assertFalse(self._set.add(item))
+        self.assertOrder(items)
+
+        # Remove the first, last and some middle items.
+        removed = SinglyLinkedList((items[0], items[-1]))
+        for item in random.sample(range(self.TEST_SIZE), self.TEST_SIZE // 3):
+            if item not in removed:
+                removed.insert_last(item)
+        for item in removed:
+            self._set.remove(item)
+        remaining = Array(SinglyLinkedList(item for item in items if item not in removed))
+        self.assertOrder(remaining)
+
+        # Items added after removals go at the end.
+        for item in removed:
+            self.assertTrue(self._set.add(item))
+        self.assertOrder(Array(SinglyLinkedList(chain(remaining, removed))))
+
+        for item in items:
+            self._set.remove(item)
+        self.assertOrder(Array(0))
+        self._set.add(-1)
+        self.assertOrder(Array((-1,)))
+
+    def test_reserve(self) -> None:
+        self._set.reserve(self.TEST_SIZE)
+        capacity = self._set._links._capacity
+        for i in random.sample(range(self.TEST_SIZE), self.TEST_SIZE):
+            self.assertTrue(self._set.add(i))
+            self.assertEqual(capacity, self._set._links._capacity)
+        for i in range(self.TEST_SIZE):
+            self.assertIn(i, self._set)
+
+    def test_serialise_order(self) -> None:
+        items = Array(random.sample(range(self.TEST_SIZE), self.TEST_SIZE))
+        for item in items:
+            self._set.add(item)
+        self._set = pickle.loads(pickle.dumps(self._set))
+        self.assertOrder(items)
+
+    def assertOrder(self, items: Array) -> None:
+        self.assertEqual(len(items), len(self._set))
+        visited = 0
+        for expected, item in zip(items, self._set):
+            self.assertEqual(expected, item)
+            visited += 1
+        self.assertEqual(len(items), visited)
+
+
+class OpenAddressingOrderedSetTest(OrderedSetTest):
+    def setUp(self) -> None:
+        # Make sure capacity is low enough to trigger resizes.
+        self._set = OrderedSet(self.TEST_SIZE // 10, hashtable_type=OpenHashTable)
@@ -0,0 +1,148 @@
+from .util import random_network
+from dsa import Array, mergesort, SinglyLinkedList
+from network import evolve_network, people_by_popularity, PopularityIndex, posts_by_popularity, top_people, top_posts
+
+import random
+from unittest import TestCase
+
+
+__all__ = [
+    "PopularityIndexTest"
+]
+
+
+class PopularityIndexTest(TestCase):
+    TEST_SIZE = 500
+
+    def test_index(self) -> None:
+        index = PopularityIndex()
+        counts = Array(self.TEST_SIZE)
+        for i in range(self.TEST_SIZE):
+            counts[i] = random.randrange(50)
+            index.add(i, counts[i])
+        self.assertEqual(self.TEST_SIZE, len(index))
+        self.assertEqual(max(counts), index.max_count)
+        for _ in range(self.TEST_SIZE):
+            i = random.randrange(self.TEST_SIZE)
+            new_count = max(counts[i] + random.randrange(-5, 6), 0)
+            index.move(i, counts[i], new_count)
+            counts[i] = new_count
+        self.assertDescending(index, counts)
+        top = Array(SinglyLinkedList(index.top(10)))
+        self.assertEqual(10, len(top))
+        self.assertEqual(max(counts), counts[top[0]])
+
+        for i in range(0, self.TEST_SIZE, 2):
+            index.remove(i, counts[i])
+        self.assertEqual(self.TEST_SIZE // 2, len(index))
+        self.assertEqual(max(counts[i] for i in range(1, self.TEST_SIZE, 2)), index.max_count)
+        self.assertDescending(index, counts)
+        with self.assertRaises(KeyError):
+            index.remove(1, counts[1] + 1)
+        with self.assertRaises(KeyError):
+            index.remove(0, counts[0])
+
+    def test_sparse_counts(self) -> None:
+        # Counts far apart, added in any order and moved past each other.
+        index = PopularityIndex()
+        counts = Array(self.TEST_SIZE)
+        for i in range(self.TEST_SIZE):
+            counts[i] = random.randrange(10) * 100000 + random.randrange(3)
+            index.add(i, counts[i])
+        for _ in range(self.TEST_SIZE):
+            i = random.randrange(self.TEST_SIZE)
+            new_count = random.choice((counts[i] + 1, max(counts[i] - 1, 0), random.randrange(10 ** 6)))
+            index.move(i, counts[i], new_count)
+            counts[i] = new_count
+        self.assertDescending(index, counts)
+        self.assertEqual(self.TEST_SIZE, len(Array(SinglyLinkedList(index))))
+        self.assertEqual(max(counts), counts[next(index.top(1))])
+        for i in range(self.TEST_SIZE):
+            index.remove(i, counts[i])
+        self.assertEqual(0, index.max_count)
+        for _ in index:
+            self.fail()
+        with self.assertRaises(KeyError):
+            index.move(0, counts[0], 1)
+
+    def test_reserve(self) -> None:
+        index = PopularityIndex()
+        index.reserve(self.TEST_SIZE)
+        self.assertEqual(0, len(index))
+        self.assertEqual(0, index.max_count)
+        for _ in index:
+            self.fail()
+        for i in range(self.TEST_SIZE):
+            index.add(i, 0)
+        index.move(0, 0, 3)
+        self.assertEqual(self.TEST_SIZE, len(index))
+        self.assertEqual(3, index.max_count)
+        self.assertEqual(0, next(iter(index)))
+
+    def test_ties(self) -> None:
+        # Items with the same count are in the order they got that count.
+        index = PopularityIndex()
+        for i in range(5):
+            index.add(i, 1)
+        index.move(3, 1, 2)
+        index.move(1, 1, 2)
+        index.move(3, 2, 1)
+        index.add(5, 2)
+        self.assertEqual([1, 5, 0, 2, 4, 3], list(index))
+        with self.assertRaises(KeyError):
+            index.move(1, 1, 3)
+        self.assertEqual([1, 5, 0, 2, 4, 3], list(index))
+
+    def test_network(self) -> None:
+        network = random_network(random.randrange(2 ** 32), 100)
+        for _ in range(3):
+            evolve_network(network, 0.3, 0.3)
+        people = Array(network.people)
+        for i in random.sample(range(len(people)), 10):
+            network.delete_person(people[i])
+        person = next(iter(network.people))
+        for following in Array(person.following):
+            person.unfollow(following)
+
+        people = people_by_popularity(network)
+        self.assertEqual(network.person_count, len(people))
+        for p1, p2 in zip(people, people[1:]):
+            self.assertGreaterEqual(p1.follower_count, p2.follower_count)
+        posts = posts_by_popularity(network)
+        self.assertEqual(network.post_count, len(posts))
+        for p1, p2 in zip(posts, posts[1:]):
+            self.assertGreaterEqual(p1.like_count, p2.like_count)
+
+        # Ties are in the same order as a stable sort.
+        expected = Array(network.people)
+        mergesort(expected, reverse=True, key=lambda p: p.follower_count)
+        self.assertEqual(list(expected), list(people))
+        expected = Array(network.posts)
+        mergesort(expected, reverse=True, key=lambda p: p.like_count)
+        self.assertEqual(list(expected), list(posts))
+
+    def test_top(self) -> None:
+        network = random_network(random.randrange(2 ** 32), 100)
+        evolve_network(network, 0.3, 0.3)
+        people = people_by_popularity(network)
+        posts = posts_by_popularity(network)
+        for k in (0, 1, 10, network.person_count, network.person_count + 10):
+            top = top_people(network, k)
+            self.assertEqual(min(k, network.person_count), len(top))
+            for person, expected in zip(top, people):
+                self.assertEqual(expected.follower_count, person.follower_count)
+            top = top_posts(network, k)
+            self.assertEqual(min(k, network.post_count), len(top))
+            for post, expected in zip(top, posts):
+                self.assertEqual(expected.like_count, post.like_count)
+        with self.assertRaises(ValueError):
+            top_people(network, -1)
+        with self.assertRaises(ValueError):
+            top_posts(network, -1)
+
+    def assertDescending(self, index: PopularityIndex, counts: Array[int]) -> None:
+        previous = None
+        for i in index:
+            if previous is not None:
+                self.assertGreaterEqual(counts[previous], counts[i])
+            previous = i
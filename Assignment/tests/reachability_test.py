@@ -0,0 +1,98 @@
+from .util import random_network
+from dsa import Array, Set, SinglyLinkedList
+from network import CompactNetwork, possible_connections, read_network_file, SocialNetwork,\
+    strongly_connected_components
+from network_generator import linear_network
+
+import numpy
+import os
+import random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+
+__all__ = [
+    "ReachabilityTest"
+]
+
+
+class ReachabilityTest(TestCase):
+    TEST_SIZE = 80
+
+    def test_components(self) -> None:
+        # 0 <-> 1 -> 2 <-> 3 -> 4, 5 isolated.
+        offsets = numpy.array([0, 1, 3, 4, 6, 6, 6])
+        indices = numpy.array([1, 0, 2, 3, 2, 4])
+        count, component = strongly_connected_components(offsets, indices)
+        self.assertEqual(4, count)
+        self.assertEqual(component[0], component[1])
+        self.assertEqual(component[2], component[3])
+        self.assertEqual(4, len(set(component)))
+        # Reverse topological order.
+        self.assertGreater(component[1], component[2])
+        self.assertGreater(component[3], component[4])
+
+    def test_random(self) -> None:
+        for follows in (1, 3, 6):
+            network = SocialNetwork()
+            people = Array(self.TEST_SIZE)
+            for i in range(self.TEST_SIZE):
+                people[i] = network.add_person(str(i))
+            for person in people:
+                for other in random.sample(range(self.TEST_SIZE), random.randint(0, follows)):
+                    if people[other] is not person and not person.is_following(people[other]):
+                        person.follow(people[other])
+                if random.random() < 0.5:
+                    for i in range(random.randint(1, 3)):
+                        person.make_post(str(i))
+            self.assertMatchesSearch(network)
+        self.assertMatchesSearch(random_network(random.randrange(2 ** 32), self.TEST_SIZE))
+        self.assertMatchesSearch(SocialNetwork())
+
+    def test_deep_chain(self) -> None:
+        # Would exceed the recursion limit if searched recursively.
+        person_count = 5000
+        netfile, _ = linear_network(person_count)
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "netfile.txt")
+            with open(path, "w") as file:
+                file.write(netfile)
+            network = read_network_file(path)
+        for person in network.people:
+            person.make_post("post")
+        compact = CompactNetwork(network)
+        max_likes, max_following = possible_connections(compact)
+        for i, person in enumerate(compact.people):
+            # Person n follows n + 1, so can reach everyone after them.
+            after = person_count - int(person.name)
+            self.assertEqual(after, max_likes[i])
+            self.assertEqual(after, max_following[i])
+
+    def assertMatchesSearch(self, network: SocialNetwork) -> None:
+        compact = CompactNetwork(network)
+        max_likes, max_following = possible_connections(compact)
+        for i, person in enumerate(compact.people):
+            likes, following = self.search(person)
+            self.assertEqual(likes, max_likes[i])
+            self.assertEqual(following, max_following[i])
+
+    # Simple breadth first search from a person along follows.
+    @staticmethod
+    def search(person) -> tuple:
+        visited = Set()
+        visited.add(person)
+        queue = SinglyLinkedList()
+        queue.insert_last(person)
+        likes = 0
+        following = person.following_count
+        while len(queue):
+            current = queue.peek_first()
+            queue.remove_first()
+            if current is not person and current.post_count:
+                likes += current.post_count
+                if not person.is_following(current):
+                    following += 1
+            for other in current.following:
+                if visited.add(other):
+                    queue.insert_last(other)
+        return likes, following
@@ -0,0 +1,78 @@
+from .util import assert_same_state, random_network
+from network import evolve_network
+from replay import replay
+import simulation_mode
+
+from contextlib import redirect_stdout
+import glob
+import io
+import numpy
+import os
+import random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+
+__all__ = [
+    "ReplayTest"
+]
+
+
+class ReplayTest(TestCase):
+    TEST_SIZE = 40
+
+    def test_replay(self) -> None:
+        for compression in (None, "gzip"):
+            self.replay_tester(compression, False)
+
+    def test_duplicate_post_ids(self) -> None:
+        # Post ids are random, so may collide. The log mustn't rely on them.
+        self.replay_tester(None, True)
+
+    def replay_tester(self, compression, duplicate_post_ids: bool) -> None:
+        seed = random.randrange(2 ** 32)
+        random.seed(seed)
+        if duplicate_post_ids:
+            with patch("random.randrange", return_value=0):
+                network = random_network(seed, self.TEST_SIZE, compact_backend=True)
+            self.assertEqual({0}, {post._id for post in network.posts})
+        else:
+            network = random_network(seed, self.TEST_SIZE, compact_backend=True)
+        settings = {"LOGS_ENABLED": True, "STATS_ENABLED": False, "LOG_MODE": "delta", "CHECKPOINT_INTERVAL": 2,
+                    "LOG_COMPRESSION": compression, "RANDOM_SEED": seed, "EVOLUTION_WORKERS": 1,
+                    "INCREMENTAL_EVOLUTION": True}
+        with TemporaryDirectory() as directory:
+            self.run_simulation(network, directory, settings)
+            log_path, = glob.glob(os.path.join(directory, "simulation-*.txt*"))
+            self.assertGreater(len(glob.glob(os.path.join(directory, "*.snapshot"))), 1)
+
+            random.seed(seed)
+            expected = random_network(seed, self.TEST_SIZE, compact_backend=True)
+            simulation_mode.annotate_solution(expected)
+            rng = numpy.random.default_rng(seed)
+            assert_same_state(self, expected, replay(log_path, 0))
+            timestep = 0
+            done = False
+            while not done:
+                timestep += 1
+                evolve_network(expected, 0.5, 0.5, rng, incremental=True)
+                done = simulation_mode.simulation_complete(expected)
+                assert_same_state(self, expected, replay(log_path, timestep))
+            assert_same_state(self, network, expected)
+            with self.assertRaises(ValueError):
+                replay(log_path, timestep + 10)
+
+    def run_simulation(self, network, directory: str, settings) -> None:
+        saved = {name: getattr(simulation_mode, name) for name in settings}
+        working_directory = os.getcwd()
+        try:
+            for name, value in settings.items():
+                setattr(simulation_mode, name, value)
+            os.chdir(directory)
+            with redirect_stdout(io.StringIO()):
+                simulation_mode.run_simulation(network, 0.5, 0.5)
+        finally:
+            os.chdir(working_directory)
+            for name, value in saved.items():
+                setattr(simulation_mode, name, value)
@@ -0,0 +1,66 @@
+from dsa import HashTable, HysteresisPolicy, OpenHashTable, ResizePolicy, ThresholdPolicy
+
+from unittest import TestCase
+
+
+__all__ = [
+    "ResizePolicyTest"
+]
+
+
+class ResizePolicyTest(TestCase):
+    TEST_SIZE = 1000
+
+    def test_threshold(self) -> None:
+        policy = ThresholdPolicy(0.5, 2, 0.25, 0.5)
+        self.assertEqual(100, policy.grown_capacity(199, 100))
+        self.assertEqual(150, policy.grown_capacity(200, 100))
+        self.assertEqual(100, policy.shrunk_capacity(51, 100))
+        self.assertEqual(75, policy.shrunk_capacity(50, 100))
+        # Deferred removals shrink as far as repeated removals would have.
+        self.assertEqual(31, policy.shrunk_capacity(20, 100))
+        self.assertEqual(1, policy.shrunk_capacity(0, 100))
+
+    def test_hysteresis(self) -> None:
+        policy = HysteresisPolicy(0.5, 2, 0.25, 0.5)
+        self.assertEqual(100, policy.grown_capacity(199, 100))
+        self.assertEqual(160, policy.grown_capacity(200, 100))
+        self.assertEqual(100, policy.shrunk_capacity(51, 100))
+        self.assertEqual(40, policy.shrunk_capacity(50, 100))
+        self.assertEqual(16, policy.shrunk_capacity(20, 100))
+        self.assertEqual(1, policy.shrunk_capacity(0, 100))
+
+        # Without a load factor between the minimum and maximum, resizes like ThresholdPolicy.
+        for args in ((1, 1, 0.25, 0.5), (3, 2, 0.25, 0.5)):
+            policy = HysteresisPolicy(*args)
+            threshold = ThresholdPolicy(*args)
+            for size in (0, 50, 100, 150, 200, 300):
+                self.assertEqual(threshold.grown_capacity(size, 100), policy.grown_capacity(size, 100))
+                self.assertEqual(threshold.shrunk_capacity(size, 100), policy.shrunk_capacity(size, 100))
+        hashtable = HashTable(min_load_factor=3, max_load_factor=2)
+        for key in range(self.TEST_SIZE):
+            hashtable[key] = key
+        for key in range(self.TEST_SIZE):
+            del hashtable[key]
+        self.assertEqual(0, len(hashtable))
+
+    def test_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            ResizePolicy(0.5, 2, 0.25, 0.5)
+
+    def test_no_thrashing(self) -> None:
+        # Alternately adding and removing an item, from one item below the maximum load factor. Growing at the
+        # maximum load factor takes the table straight to the minimum load factor.
+        for hashtable_type, capacity, args in ((HashTable, 64, (1, 0.5, 1, 0.5, 1)),
+                                               (OpenHashTable, 60, (0.6, 0.3, 0.6, 0.5, 1))):
+            thrashing = hashtable_type(capacity, *args, resize_policy=ThresholdPolicy, collect_stats=True)
+            hysteresis = hashtable_type(capacity, *args, resize_policy=HysteresisPolicy, collect_stats=True)
+            for hashtable in (thrashing, hysteresis):
+                while (len(hashtable) + 1) / hashtable._capacity < args[2]:
+                    hashtable[len(hashtable)] = 0
+                self.assertEqual(0, hashtable.stats.resizes)
+                for _ in range(self.TEST_SIZE):
+                    hashtable[-1] = -1
+                    del hashtable[-1]
+            self.assertEqual(2 * self.TEST_SIZE, thrashing.stats.resizes)
+            self.assertEqual(2, hysteresis.stats.resizes)
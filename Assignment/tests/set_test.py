@@ -1,4 +1,4 @@
-from dsa import Set, SinglyLinkedList
+from dsa import OpenHashTable, Set, SinglyLinkedList
 
 import pickle
 import random
@@ -6,6 +6,7 @@ from unittest import TestCase
 
 
 __all__ = [
+    "OpenAddressingSetTest",
     "SetTest"
 ]
 
@@ -119,6 +120,15 @@ class SetTest(TestCase):
             visited += 1
         self.assertEqual(visited, len(items), "re-add item item count")
 
+    def test_reserve(self) -> None:
+        self._set.reserve(self.TEST_SIZE)
+        capacity = self._set._hashtable._capacity
+        for i in random.sample(range(self.TEST_SIZE), self.TEST_SIZE):
+            self.assertTrue(self._set.add(i))
+            self.assertEqual(capacity, self._set._hashtable._capacity)
+        for i in range(self.TEST_SIZE):
+            self.assertIn(i, self._set)
+
     def test_serialise(self) -> None:
         s = pickle.loads(pickle.dumps(self._set))
         self.assertEqual(0, len(s))
@@ -131,3 +141,9 @@ class SetTest(TestCase):
         self.assertEqual(self.TEST_SIZE, len(s))
         for i in random.sample(range(self.TEST_SIZE), self.TEST_SIZE):
             self.assertIn(i, s)
+
+
+class OpenAddressingSetTest(SetTest):
+    def setUp(self) -> None:
+        # Make sure capacity is low enough to trigger resizes.
+        self._set = Set(self.TEST_SIZE // 10, hashtable_type=OpenHashTable)
@@ -0,0 +1,221 @@
+from .util import assert_same_state, random_network
+from dsa import Array
+from network import evolve_network, EvolutionWorkers, SocialNetwork, TimestepChanges, top_people
+
+import numpy
+import random
+from typing import List, Tuple
+from unittest import TestCase
+
+
+__all__ = [
+    "SimulationTest"
+]
+
+
+class SimulationTest(TestCase):
+    TEST_SIZE = 60
+
+    def setUp(self) -> None:
+        self._seed = random.randrange(2 ** 32)
+
+    def test_batched_matches_scalar(self) -> None:
+        # With certain likes and follows, evolution is deterministic, so sampling modes must agree.
+        for compact_backend in (False, True):
+            scalar = random_network(self._seed, self.TEST_SIZE, compact_backend=compact_backend)
+            batched = random_network(self._seed, self.TEST_SIZE, compact_backend=compact_backend)
+            rng = numpy.random.default_rng(self._seed)
+            for _ in range(3):
+                self.assertEqual(evolve_network(scalar, 1, 1), evolve_network(batched, 1, 1, rng))
+                assert_same_state(self, scalar, batched)
+
+    def test_batched_reproducible(self) -> None:
+        for compact_backend in (False, True):
+            # Person IDs come from the random module and decide iteration order, so must match too.
+            random.seed(self._seed)
+            network1 = random_network(self._seed, self.TEST_SIZE, compact_backend=compact_backend)
+            random.seed(self._seed)
+            network2 = random_network(self._seed, self.TEST_SIZE, compact_backend=compact_backend)
+            rng1 = numpy.random.default_rng(self._seed)
+            rng2 = numpy.random.default_rng(self._seed)
+            for _ in range(3):
+                self.assertEqual(evolve_network(network1, 0.4, 0.4, rng1), evolve_network(network2, 0.4, 0.4, rng2))
+
+    def test_sharded_matches_single(self) -> None:
+        single = random_network(self._seed, self.TEST_SIZE)
+        sharded = random_network(self._seed, self.TEST_SIZE)
+        for _ in range(3):
+            self.assertEqual(evolve_network(single, 1, 1), evolve_network(sharded, 1, 1, workers=3))
+            assert_same_state(self, single, sharded)
+
+    def test_sharded_reproducible(self) -> None:
+        random.seed(self._seed)
+        network1 = random_network(self._seed, self.TEST_SIZE)
+        random.seed(self._seed)
+        network2 = random_network(self._seed, self.TEST_SIZE)
+        rng1 = numpy.random.default_rng(self._seed)
+        rng2 = numpy.random.default_rng(self._seed)
+        for _ in range(2):
+            self.assertEqual(evolve_network(network1, 0.4, 0.4, rng1, workers=2),
+                             evolve_network(network2, 0.4, 0.4, rng2, workers=2))
+            assert_same_state(self, network1, network2)
+
+    def test_evolution_workers(self) -> None:
+        # Kept workers must give the same results as workers started for each timestep, with or without
+        # incremental evolution, and reuse their shared memory while the arrays fit in it.
+        for incremental in (False, True):
+            random.seed(self._seed)
+            network1 = random_network(self._seed, self.TEST_SIZE)
+            random.seed(self._seed)
+            network2 = random_network(self._seed, self.TEST_SIZE)
+            rng1 = numpy.random.default_rng(self._seed)
+            rng2 = numpy.random.default_rng(self._seed)
+            with EvolutionWorkers(2) as workers:
+                for _ in range(4):
+                    self.assertEqual(evolve_network(network1, 0.3, 0.3, rng1, 2, incremental=incremental),
+                                     evolve_network(network2, 0.3, 0.3, rng2, workers, incremental=incremental))
+                    assert_same_state(self, network1, network2)
+                    if incremental:
+                        numpy.testing.assert_array_equal(network1.compact_view.frontier,
+                                                         network2.compact_view.frontier)
+                shared = workers._shared
+                evolve_network(network2, 0, 0, None, workers)
+                self.assertIs(shared, workers._shared)
+
+    def test_sharded_incremental_matches_single(self) -> None:
+        single = random_network(self._seed, self.TEST_SIZE)
+        sharded = random_network(self._seed, self.TEST_SIZE)
+        with EvolutionWorkers(3) as workers:
+            for _ in range(4):
+                self.assertEqual(evolve_network(single, 1, 1, incremental=True),
+                                 evolve_network(sharded, 1, 1, workers=workers, incremental=True))
+                assert_same_state(self, single, sharded)
+
+    def test_batched_distribution(self) -> None:
+        # One person following a poster with many posts: likes and follows should occur with the expected
+        # frequencies whichever way the decisions are drawn.
+        post_count = 1000
+        like_chance = 0.3
+        follow_chance = 0.5
+        for compact_backend in (False, True):
+            for rng in (None, numpy.random.default_rng(self._seed)):
+                network = SocialNetwork(compact_backend=compact_backend)
+                poster = network.add_person("poster")
+                for i in range(post_count):
+                    poster.make_post(str(i))
+                fans = 100
+                for i in range(fans):
+                    network.add_person(f"fan {i}").follow(poster)
+                new_likes, new_follows = evolve_network(network, like_chance, follow_chance, rng)
+                expected_likes = post_count * fans * like_chance
+                self.assertAlmostEqual(expected_likes, new_likes, delta=expected_likes * 0.02)
+                # Everyone already follows the poster.
+                self.assertEqual(0, new_follows)
+
+                network = SocialNetwork(compact_backend=compact_backend)
+                posters = numpy.empty(post_count, dtype=object)
+                for i in range(post_count):
+                    posters[i] = network.add_person(f"poster {i}")
+                    posters[i].make_post("hi", 2)
+                fan = network.add_person("fan")
+                for poster in posters:
+                    fan.follow(poster)
+                sharer = network.add_person("sharer")
+                sharer.follow(fan)
+                for poster in posters:
+                    fan.like_post(next(iter(poster.posts)))
+                new_likes, new_follows = evolve_network(network, like_chance, follow_chance, rng)
+                expected_likes = post_count * like_chance * 2
+                self.assertAlmostEqual(expected_likes, new_likes, delta=expected_likes * 0.1)
+                self.assertAlmostEqual(new_likes * follow_chance, new_follows, delta=new_likes * 0.1)
+
+    def test_incremental_matches_full(self) -> None:
+        # With certain likes and follows, evolution is deterministic, so incremental evolution must agree.
+        full = random_network(self._seed, self.TEST_SIZE, compact_backend=True)
+        incremental = random_network(self._seed, self.TEST_SIZE, compact_backend=True)
+        for _ in range(4):
+            self.assertEqual(evolve_network(full, 1, 1), evolve_network(incremental, 1, 1, incremental=True))
+            assert_same_state(self, full, incremental)
+
+    def test_incremental_matches_full_seeded(self) -> None:
+        # Each pair's decisions depend only on the seed and the pair, so evolving the objects or the arrays,
+        # incrementally or in shards, makes exactly the same likes and follows in the same order.
+        # (compact backend, incremental, workers) of each way of evolving.
+        modes = ((False, False, None), (True, False, None), (True, True, None), (False, True, 2))
+        networks = Array(len(modes))
+        rngs = Array(len(modes))
+        for i, (compact_backend, _, _) in enumerate(modes):
+            # Person IDs come from the random module and decide iteration order, so must match too.
+            random.seed(self._seed)
+            networks[i] = random_network(self._seed, self.TEST_SIZE, compact_backend=compact_backend)
+            rngs[i] = numpy.random.default_rng(self._seed)
+        with EvolutionWorkers(2) as workers:
+            for _ in range(5):
+                expected = None
+                for i, (_, incremental, worker_count) in enumerate(modes):
+                    changes = TimestepChanges()
+                    evolve_network(networks[i], 0.3, 0.4, rngs[i], workers if worker_count else None, changes,
+                                   incremental)
+                    if expected is None:
+                        expected = _change_names(changes)
+                        self.assertGreater(len(expected[0]), 0)
+                    else:
+                        self.assertEqual(expected, _change_names(changes))
+                        assert_same_state(self, networks[0], networks[i])
+
+    def test_incremental_saturates(self) -> None:
+        network = random_network(self._seed, self.TEST_SIZE)
+        rng = numpy.random.default_rng(self._seed)
+        timesteps = 0
+        while network.compact_view.frontier is None or network.compact_view.frontier.any():
+            evolve_network(network, 0.5, 0.5, rng, incremental=True)
+            timesteps += 1
+            self.assertLess(timesteps, 200)
+        # Once nobody is left in the frontier, nothing more can change.
+        self.assertEqual((0, 0), evolve_network(network, 1, 1))
+
+        # Changes made outside of evolution mean everyone has to be considered again.
+        evolve_network(network, 1, 1, incremental=True)
+        self.assertFalse(network.compact_view.frontier.any())
+        person = top_people(network, 1)[0]
+        person.make_post("new")
+        self.assertIsNone(network.compact_view.frontier)
+        self.assertGreater(evolve_network(network, 1, 1, incremental=True)[0], 0)
+
+    def test_frontier(self) -> None:
+        # The frontier must be the people who still have an unliked candidate post (or unfollowed poster),
+        # plus those whose neighbourhood changed.
+        network = random_network(self._seed, self.TEST_SIZE, compact_backend=True)
+        rng = numpy.random.default_rng(self._seed)
+        for _ in range(4):
+            compact = network.compact_view
+            frontier = compact.frontier
+            changes = TimestepChanges()
+            evolve_network(network, 0.3, 0.3, rng, changes=changes, incremental=True)
+            compact = network.compact_view
+            people = numpy.arange(compact.person_count) if frontier is None else numpy.flatnonzero(frontier)
+            persons, posts = compact.candidate_pairs(people)
+            settled = compact.likes.contains(persons, posts) & \
+                compact.following.contains(persons, compact.poster[posts])
+            expected = set(persons[~settled].tolist())
+            for person, _ in changes.likes:
+                expected.update(p for p in range(compact.person_count) if compact.people[p].is_following(person))
+            for person, _ in changes.follows:
+                expected.update(p for p in range(compact.person_count) if compact.people[p] is person)
+            self.assertEqual(expected, set(numpy.flatnonzero(compact.frontier).tolist()))
+
+    def test_invalid_chances(self) -> None:
+        network = random_network(self._seed, self.TEST_SIZE)
+        for chance in (-0.1, 1.1):
+            with self.assertRaises(ValueError):
+                evolve_network(network, chance, 0.5)
+            with self.assertRaises(ValueError):
+                evolve_network(network, 0.5, chance)
+        with self.assertRaises(ValueError):
+            evolve_network(network, 0.5, 0.5, workers=0)
+
+
+# Returns the names in the likes and follows of a TimestepChanges, as a tuple of (likes, follows) lists.
+def _change_names(changes: TimestepChanges) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    return ([(person.name, str(post)) for person, post in changes.likes],
+            [(person.name, followee.name) for person, followee in changes.follows])
@@ -0,0 +1,99 @@
+from .util import assert_same_state, random_network
+from network import load_snapshot, save_snapshot, Snapshot, SocialNetwork
+
+import numpy
+import os
+import random
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+
+__all__ = [
+    "SnapshotTest"
+]
+
+
+class SnapshotTest(TestCase):
+    TEST_SIZE = 100
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, "network.snapshot")
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_round_trip(self) -> None:
+        network = random_network(random.randrange(2 ** 32), self.TEST_SIZE)
+        network.find_person("0").make_post("Ünïcödé text: with colons")
+        save_snapshot(network, self._path)
+        loaded = load_snapshot(self._path)
+        assert_same_state(self, network, loaded)
+        self.assertEqual(network.like_count, loaded.like_count)
+        self.assertEqual(network.follow_count, loaded.follow_count)
+        for person in network.people:
+            other = loaded.find_person(person.name)
+            self.assertEqual(hash(person), hash(other))
+            self.assertEqual(person.follower_count, other.follower_count)
+            self.assertEqual(person.post_count, other.post_count)
+            for post, other_post in zip(person.posts, other.posts):
+                self.assertEqual(hash(post), hash(other_post))
+                self.assertEqual(post.text, other_post.text)
+                self.assertEqual(post.clickbait_factor, other_post.clickbait_factor)
+                self.assertEqual(post.like_count, other_post.like_count)
+                # Likes keep the order they were made in.
+                self.assertEqual([p.name for p in post.liked_by], [p.name for p in other_post.liked_by])
+
+    def test_snapshot_arrays(self) -> None:
+        network = random_network(random.randrange(2 ** 32), self.TEST_SIZE)
+        save_snapshot(network, self._path)
+        snapshot = Snapshot(self._path)
+        self.assertEqual(network.person_count, snapshot.person_count)
+        self.assertEqual(network.post_count, snapshot.post_count)
+        self.assertEqual(sum(p.following_count for p in network.people), len(snapshot.follows))
+        self.assertEqual(sum(p.liked_post_count for p in network.people), len(snapshot.likes))
+        for follower, followee in snapshot.follows:
+            person = network.find_person(snapshot.name(follower))
+            self.assertTrue(person.is_following(network.find_person(snapshot.name(followee))))
+
+    def test_empty(self) -> None:
+        save_snapshot(SocialNetwork(), self._path)
+        network = load_snapshot(self._path)
+        self.assertEqual(0, network.person_count)
+        self.assertEqual(0, network.post_count)
+
+    def test_invalid_file(self) -> None:
+        with open(self._path, "wb") as file:
+            file.write(b"A\nB\nA:B\n")
+        with self.assertRaises(ValueError):
+            load_snapshot(self._path)
+        with open(self._path, "wb") as file:
+            file.write(b"DSANET\x00\x00")
+        with self.assertRaises(ValueError):
+            load_snapshot(self._path)
+
+    def test_corrupt_indices(self) -> None:
+        network = random_network(random.randrange(2 ** 32), self.TEST_SIZE)
+        person = next(iter(network.people))
+        other = next(p for p in network.people if p is not person and not person.is_following(p))
+        person.follow(other)
+        person.make_post("Post")
+        other.like_post(next(iter(person.posts)))
+        save_snapshot(network, self._path)
+        snapshot = Snapshot(self._path)
+        # (array, row, column) of an index in each array of indices.
+        indices = ((snapshot.follows, 0, 0), (snapshot.follows, 0, 1), (snapshot.post_posters, 0, None),
+                   (snapshot.likes, 0, 0), (snapshot.likes, 0, 1))
+        for array, row, column in indices:
+            for value in (-1, max(snapshot.person_count, snapshot.post_count)):
+                writable = numpy.memmap(self._path, array.dtype, "r+", array.offset, array.shape)
+                position = (row,) if column is None else (row, column)
+                original = int(writable[position])
+                writable[position] = value
+                writable.flush()
+                with self.assertRaises(ValueError):
+                    load_snapshot(self._path)
+                writable[position] = original
+                writable.flush()
+                del writable
+        load_snapshot(self._path)
@@ -4,6 +4,7 @@
 from dsa import Array
 from dsa.sorting import *
 
+import numpy
 import random
 from typing import Sequence
 from unittest import TestCase
@@ -48,6 +49,13 @@ class SortingTest(TestCase):
             sorter(actual, reverse=True)
             self.assertArrayEqual(sorted(data, reverse=True), actual)
 
+        for n in range(0, self.TEST_SIZE, 7):
+            data = Array(random.choices(range(self.TEST_SIZE), k=n), numpy.int64)
+            actual = data.copy()
+            sorter(actual)
+            self.assertEqual(numpy.int64, actual.dtype)
+            self.assertArrayEqual(sorted(data), actual)
+
     def assertArrayEqual(self, arr1: Sequence, arr2: Sequence) -> None:
         self.assertEqual(len(arr1), len(arr2))
         for a, b in zip(arr1, arr2):
@@ -0,0 +1,50 @@
+from dsa import Array, SinglyLinkedList
+from network import SocialNetwork
+
+from itertools import chain
+import random
+from unittest import TestCase
+
+
+__all__ = [
+    "assert_same_state",
+    "random_network"
+]
+
+
+# Builds a network of people with random follows, posts and likes.
+# The same seed always gives the same network structure.
+def random_network(seed: int, person_count: int, **network_args) -> SocialNetwork:
+    rng = random.Random(seed)
+    network = SocialNetwork(**network_args)
+    people = Array(person_count)
+    for i in range(person_count):
+        people[i] = network.add_person(str(i))
+    for person in people:
+        for other in rng.sample(range(person_count), min(5, person_count)):
+            other = people[other]
+            if other is not person and not person.is_following(other):
+                person.follow(other)
+        for i in range(rng.randrange(3)):
+            person.make_post(f"post {i}", rng.randint(1, 2))
+    posts = Array(SinglyLinkedList(chain.from_iterable(person.posts for person in people)))
+    for person in people:
+        for i in rng.sample(range(len(posts)), min(3, len(posts))):
+            if posts[i].poster is not person:
+                person.like_post(posts[i])
+    return network
+
+
+# Asserts that two networks have the same people, follows and likes (matching people by name).
+def assert_same_state(test: TestCase, network1: SocialNetwork, network2: SocialNetwork) -> None:
+    test.assertEqual(network1.person_count, network2.person_count)
+    test.assertEqual(network1.post_count, network2.post_count)
+    for person1 in network1.people:
+        person2 = network2.find_person(person1.name)
+        test.assertEqual(person1.following_count, person2.following_count)
+        test.assertEqual(person1.liked_post_count, person2.liked_post_count)
+        for following in person1.following:
+            test.assertTrue(person2.is_following(network2.find_person(following.name)))
+        for post in person1.liked_posts:
+            test.assertTrue(any(p.text == post.text and p.poster.name == post.poster.name
+                                for p in person2.liked_posts))